@@ -0,0 +1,10 @@
+# benchmarks/__init__.py
+"""
+Performance benchmarks; run from the repo root with python -m benchmarks.<name>.
+
+    run             end-to-end suite on synthetic corpora (see run.py)
+    corpus          deterministic collected_reviews.csv generator, 1k .. 10M rows
+    standins        offline DDGS / image-server stand-ins for src.fetch
+    harness         sandbox, latency/RSS recorder and results-file format
+    bench_*         focused micro-benchmarks for single components
+"""
@@ -0,0 +1,114 @@
+# benchmarks/bench_api.py
+"""
+Load test for the HTTP/JSON service (src/api.py): p50/p99 latency and
+requests/second per endpoint. Run from the repo root:
+
+    python -m benchmarks.bench_api                          # in-process server on a free port
+    python -m benchmarks.bench_api --url http://host:8765   # an already running service
+
+Each client thread keeps one HTTP/1.1 connection open. With --etag the
+clients replay the last ETag they saw, so repeat reads measure 304s.
+/trending and /info are left out by default since they may hit the network.
+"""
+import argparse, http.client, statistics, threading, time
+from urllib.parse import urlsplit, quote
+from concurrent.futures import ThreadPoolExecutor
+
+from src.storage import get_store
+
+def _percentile(values, pct):
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))]
+
+def _client(host, port, paths, requests_per_client, use_etag, latencies, statuses, lock):
+    conn = http.client.HTTPConnection(host, port, timeout=30)
+    etags = {}
+    mine, codes = [], {}
+    for i in range(requests_per_client):
+        path = paths[i % len(paths)]
+        headers = {"If-None-Match": etags[path]} if use_etag and path in etags else {}
+        t = time.perf_counter()
+        conn.request("GET", path, headers=headers)
+        resp = conn.getresponse()
+        resp.read()
+        mine.append(time.perf_counter() - t)
+        codes[resp.status] = codes.get(resp.status, 0) + 1
+        if resp.getheader("ETag"):
+            etags[path] = resp.getheader("ETag")
+    conn.close()
+    with lock:
+        latencies.extend(mine)
+        for k, v in codes.items():
+            statuses[k] = statuses.get(k, 0) + v
+
+def run(url, paths, clients=8, requests_per_client=200, use_etag=False):
+    """Returns {"requests", "seconds", "rps", "p50_ms", "p99_ms", "mean_ms", "statuses"}."""
+    parts = urlsplit(url)
+    latencies, statuses, lock = [], {}, threading.Lock()
+    t = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        for f in [pool.submit(_client, parts.hostname, parts.port or 80, paths,
+                              requests_per_client, use_etag, latencies, statuses, lock)
+                  for _ in range(clients)]:
+            f.result()
+    elapsed = time.perf_counter() - t
+    return {
+        "requests": len(latencies),
+        "seconds": round(elapsed, 3),
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(1000 * _percentile(latencies, 50), 2),
+        "p99_ms": round(1000 * _percentile(latencies, 99), 2),
+        "mean_ms": round(1000 * statistics.fmean(latencies), 2) if latencies else float("nan"),
+        "statuses": statuses,
+    }
+
+def _default_products(limit=5):
+    df = get_store().read_analyzed(columns=["product"])
+    return df["product"].value_counts().index[:limit].tolist() or ["test phone"]
+
+def main():
+    ap = argparse.ArgumentParser(description="Load-test the URA HTTP API")
+    ap.add_argument("--url", help="base URL of a running service (default: start one in-process)")
+    ap.add_argument("--clients", type=int, default=8)
+    ap.add_argument("--requests", type=int, default=200, help="requests per client per scenario")
+    ap.add_argument("--products", nargs="*", help="product names to query (default: most-analyzed)")
+    ap.add_argument("--etag", action="store_true", help="also run each scenario with If-None-Match")
+    ap.add_argument("--network", action="store_true", help="include /trending (may call DuckDuckGo)")
+    args = ap.parse_args()
+
+    server = None
+    url = args.url
+    if not url:
+        from src.api import make_server
+        server = make_server(port=0, quiet=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    products = args.products or _default_products()
+    scenarios = {
+        "health": ["/health"],
+        "summary": [f"/products/{quote(p)}" for p in products],
+        "reviews": [f"/products/{quote(p)}/reviews?page={n}&size=20" for p in products for n in (1, 2)],
+    }
+    if args.network:
+        scenarios["trending"] = ["/trending?limit=8"]
+
+    print(f"{url}  clients={args.clients}  requests/client={args.requests}")
+    print(f"{'scenario':<16}{'rps':>10}{'p50 ms':>10}{'p99 ms':>10}  statuses")
+    try:
+        for name, paths in scenarios.items():
+            # One untimed pass warms the index and any caches
+            run(url, paths, clients=1, requests_per_client=len(paths))
+            for etag in ([False, True] if args.etag else [False]):
+                r = run(url, paths, args.clients, args.requests, etag)
+                label = name + (" (etag)" if etag else "")
+                print(f"{label:<16}{r['rps']:>10}{r['p50_ms']:>10}{r['p99_ms']:>10}  {r['statuses']}")
+    finally:
+        if server:
+            server.shutdown()
+            server.server_close()
+
+if __name__ == "__main__":
+    main()
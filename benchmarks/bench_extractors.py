@@ -0,0 +1,91 @@
+# benchmarks/bench_extractors.py
+"""
+Pages/second and peak memory of each extractor backend vs the old
+full BeautifulSoup parse. Run from the repo root:
+
+    python -m benchmarks.bench_extractors                      # synthetic pages
+    python -m benchmarks.bench_extractors --fixtures saved/    # <domain>__*.html files
+
+Peak memory comes from tracemalloc, which only sees Python allocations;
+lxml's C-side tree is not counted.
+"""
+import argparse, glob, os, random, time, tracemalloc
+from bs4 import BeautifulSoup
+from src.extractors import get_extractor, registered_domains, Extractor
+
+BACKENDS = ["stream", "lxml", "strainer"]
+
+def _synthetic_page(extractor: Extractor, reviews: int = 60, noise: int = 400, seed: int = 0):
+    """A page with `reviews` matching nodes buried in `noise` unrelated blocks."""
+    rng = random.Random(seed)
+    words = "battery camera display lag heating value great poor build price".split()
+    blocks = [f'<div class="c{i % 7}"><a href="/x{i}">link {i}</a><span>{" ".join(rng.choices(words, k=12))}</span></div>'
+              for i in range(noise)]
+    for i in range(reviews):
+        sel = extractor.selectors[0]
+        attrs = ""
+        if sel.attr:
+            attrs += f' {sel.attr[0]}="{sel.attr[1]}"'
+        if sel.class_:
+            attrs += f' class="{sel.class_} extra"'
+        node = f"<{sel.tag}{attrs}>Review {i}: {' '.join(rng.choices(words, k=40))}</{sel.tag}>"
+        if sel.within:
+            w = sel.within
+            wattrs = f' {w.attr[0]}="{w.attr[1]}"' if w.attr else (f' class="{w.class_}"' if w.class_ else "")
+            node = f"<{w.tag}{wattrs}>{node}</{w.tag}>"
+        blocks.insert(rng.randrange(len(blocks) + 1), node)
+    return "<html><head><title>t</title></head><body>" + "".join(blocks) + "</body></html>"
+
+def _pages(fixtures: str | None):
+    """[(domain, html)] from a fixture dir, or one synthetic page per registered domain."""
+    if fixtures:
+        out = []
+        for path in sorted(glob.glob(os.path.join(fixtures, "*.html"))):
+            domain = os.path.basename(path).split("__")[0]
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                out.append((domain, f.read()))
+        return out
+    return [(d, _synthetic_page(get_extractor(f"https://{d}/", "stream"))) for d in registered_domains()]
+
+def _full_parse(extractor, html):
+    """The previous approach: a whole html.parser tree, then a search."""
+    soup = BeautifulSoup(html, "html.parser")
+    sel = extractor.selectors[0]
+    attrs = {sel.attr[0]: sel.attr[1]} if sel.attr else {}
+    return [n.get_text(strip=True) for n in soup.find_all(sel.tag, attrs, class_=sel.class_)]
+
+def _measure(fn, html, repeat):
+    tracemalloc.start()
+    t = time.perf_counter()
+    for _ in range(repeat):
+        fn(html)
+    dt = time.perf_counter() - t
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return repeat / dt, peak / 1024
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--fixtures", default=None, help="directory of <domain>__<name>.html files")
+    ap.add_argument("--repeat", type=int, default=20)
+    args = ap.parse_args()
+
+    print(f"{'domain':<16} {'backend':<10} {'pages/s':>10} {'peak KiB':>10} {'reviews':>8}")
+    for domain, html in _pages(args.fixtures):
+        base = get_extractor(f"https://{domain}/", "stream")
+        if base is None:
+            print(f"{domain:<16} (no extractor registered)")
+            continue
+        runs = [("full-bs4", lambda h, e=base: _full_parse(e, h))]
+        for b in BACKENDS:
+            try:
+                runs.append((b, get_extractor(f"https://{domain}/", b).extract))
+            except ImportError:
+                print(f"{domain:<16} {b:<10} (not installed)")
+        for name, fn in runs:
+            found = len(fn(html))
+            rate, peak = _measure(fn, html, args.repeat)
+            print(f"{domain:<16} {name:<10} {rate:>10.1f} {peak:>10.0f} {found:>8}")
+
+if __name__ == "__main__":
+    main()
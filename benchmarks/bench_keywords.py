@@ -0,0 +1,55 @@
+# benchmarks/bench_keywords.py
+"""
+Throughput of the compiled KeywordMatcher vs the old per-keyword
+substring scans. Run from the repo root:
+
+    python -m benchmarks.bench_keywords --rows 200000
+
+Every row gets a unique suffix, so match_series cannot lean on repeated
+texts (it matches each distinct text once); --dups keeps the repeats.
+"""
+import argparse, os, time
+import pandas as pd
+from src.analyze_reviews import _PROS, _CONS, INPUT_PATH
+from src.keywords import KeywordMatcher
+from benchmarks.corpus import iter_rows
+
+def _legacy_pros(text): return [w for w in _PROS if w in str(text).lower()]
+def _legacy_cons(text): return [w for w in _CONS if w in str(text).lower()]
+
+def _corpus(rows: int, dups: bool = False) -> pd.Series:
+    if os.path.exists(INPUT_PATH):
+        base = pd.read_csv(INPUT_PATH)["Review"].dropna().astype(str).tolist()
+    else:
+        base = [r[3] for chunk in iter_rows(min(rows, 20_000)) for r in chunk]
+    reps = rows // len(base) + 1
+    reviews = pd.Series((base * reps)[:rows])
+    return reviews if dups else reviews + " #" + pd.Series(range(rows)).astype(str)
+
+def _timed(label, rows, fn):
+    t = time.perf_counter()
+    fn()
+    dt = time.perf_counter() - t
+    print(f"{label:<28} {dt:8.3f}s  {rows / dt:12,.0f} reviews/s")
+    return dt
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=100_000)
+    ap.add_argument("--dups", action="store_true", help="keep repeated review texts")
+    args = ap.parse_args()
+
+    reviews = _corpus(args.rows, args.dups)
+    matcher = KeywordMatcher(_PROS, _CONS)
+    print(f"{args.rows:,} reviews, {len(_PROS)} pros / {len(_CONS)} cons keywords")
+
+    legacy = _timed("substring scans (legacy)", args.rows,
+                    lambda: (reviews.apply(_legacy_pros), reviews.apply(_legacy_cons)))
+    single = _timed("KeywordMatcher.match", args.rows,
+                    lambda: reviews.apply(matcher.match))
+    vector = _timed("KeywordMatcher.match_series", args.rows,
+                    lambda: matcher.match_series(reviews))
+    print(f"speedup: {legacy / single:.2f}x per-row, {legacy / vector:.2f}x series")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# benchmarks/bench_memory.py
+"""
+Memory held by the analyzed table as the usual DataFrame (read_analyzed)
+vs CompactReviews, on a synthetic analyzed CSV. Each layout is loaded in
+a fresh process. "held" is the loaded object's own size (deep
+memory_usage / memory_bytes), "peak" the tracemalloc peak while loading. Run from
+the repo root:
+
+    python -m benchmarks.bench_memory --rows 500k
+"""
+import argparse, os, tempfile, time, tracemalloc
+from multiprocessing import get_context
+import pandas as pd
+
+from benchmarks.corpus import parse_size, write_corpus
+
+
+def _analyzed_csv(rows: int, path: str):
+    """Analyzed-table CSV for a synthetic corpus; keywords come from the real matcher."""
+    from src.analyze_reviews import _MATCHER, _PROS, _CONS, _IMPROVEMENTS, _RULES
+    from src.keywords import from_masks
+    from src.storage import CsvStore
+    collected = path + ".collected.csv"
+    write_corpus(collected, rows)
+    store = CsvStore(collected, path)
+    moods = ["Positive", "Negative", "Neutral"]
+    for chunk in pd.read_csv(collected, chunksize=100_000):
+        pros, cons = _MATCHER.match_masks(chunk["Review"])
+        store.append_analyzed(pd.DataFrame({
+            "product": chunk["Product"], "review": chunk["Review"],
+            "sentiment": [moods[i % 3] for i in range(len(chunk))],
+            "pros": from_masks(pros, _PROS), "cons": from_masks(cons, _CONS),
+            "improvements": from_masks(_RULES.apply(cons), _IMPROVEMENTS),
+            "verdict": "Mixed",
+        }))
+    os.remove(collected)
+    return store
+
+def _measure(layout: str, path: str, include_text: bool):
+    from src.storage import CsvStore
+    from src.compact import CompactReviews, COLUMNS
+    store = CsvStore(analyzed_path=path)
+    tracemalloc.start()
+    t = time.perf_counter()
+    if layout == "dataframe":
+        obj = store.read_analyzed(columns=[c for c in COLUMNS if include_text or c != "review"])
+    else:
+        obj = CompactReviews.from_store(store, include_text=include_text)
+    dt = time.perf_counter() - t
+    _, peak = tracemalloc.get_traced_memory()
+    held = obj.memory_usage(deep=True).sum() if layout == "dataframe" else obj.memory_bytes()
+    return len(obj), held, peak, dt
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", default="200k", help="analyzed rows (k/m suffixes)")
+    ap.add_argument("--no-text", action="store_true", help="leave out the review text column")
+    args = ap.parse_args()
+    rows = parse_size(args.rows)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "analyzed.csv")
+        _analyzed_csv(rows, path)
+        print(f"{rows:,} analyzed rows, {os.path.getsize(path) / 2**20:,.1f} MiB on disk"
+              f"{', without review text' if args.no_text else ''}")
+        print(f"{'layout':<16}{'held':>12}{'peak':>12}{'load':>10}")
+        results = {}
+        ctx = get_context("spawn")
+        for layout in ("dataframe", "compact"):
+            with ctx.Pool(1) as pool:
+                n, held, peak, dt = pool.apply(_measure, (layout, path, not args.no_text))
+            results[layout] = held
+            print(f"{layout:<16}{held / 2**20:>10.1f} MiB{peak / 2**20:>8.1f} MiB{dt:>9.2f}s")
+        print(f"compact holds {results['dataframe'] / max(results['compact'], 1):.1f}x less")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+# benchmarks/bench_sentiment.py
+"""
+Speed of each sentiment backend and how often the fast one agrees with
+TextBlob. Run from the repo root:
+
+    python -m benchmarks.bench_sentiment --rows 20000 --sample 2000
+
+Throughput is measured on --rows reviews (the collected corpus repeated),
+agreement on a random --sample of distinct collected reviews.
+"""
+import argparse, time
+from src.analyze_reviews import sentiment_agreement, _store
+from src.sentiment_backends import get_backend, _BACKENDS
+
+def _corpus(rows: int):
+    try:
+        base = _store().read_collected(columns=["Review"])["Review"].dropna().astype(str).tolist()
+    except Exception:
+        base = []
+    base = base or ["Great camera and battery, but heating issues and slow charging."]
+    return (base * (rows // len(base) + 1))[:rows]
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=20_000)
+    ap.add_argument("--sample", type=int, default=2000)
+    ap.add_argument("--batch", type=int, default=256, help="texts per polarities() call")
+    args = ap.parse_args()
+
+    texts = _corpus(args.rows)
+    print(f"{args.rows:,} reviews, batches of {args.batch}")
+    speeds = {}
+    for kind in _BACKENDS:
+        scorer = get_backend(kind)
+        scorer.warm()
+        t = time.perf_counter()
+        for i in range(0, len(texts), args.batch):
+            scorer.polarities(texts[i:i + args.batch])
+        dt = time.perf_counter() - t
+        speeds[kind] = args.rows / dt
+        print(f"{kind:<12} {dt:8.3f}s  {speeds[kind]:12,.0f} reviews/s")
+    print(f"lexicon speed-up: {speeds['lexicon'] / speeds['textblob']:.1f}x")
+
+    r = sentiment_agreement(sample=args.sample)
+    print(f"\nLabel agreement with textblob on {r['n']:,} reviews: {100 * r['rate']:.2f}%")
+    for (ref, cand), n in sorted(r["confusion"].items()):
+        if ref != cand:
+            print(f"  textblob {ref:<8} -> lexicon {cand:<8} {n}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# benchmarks/bench_startup.py
+"""
+Cold-start cost of the desktop app: import time of the modules behind
+each screen and time-to-first-frame of the home window, each measured
+in fresh interpreters. Run from the repo root:
+
+    python -m benchmarks.bench_startup --runs 5 --top 10
+
+Time-to-first-frame needs a display (or xvfb-run); without one it is
+reported as skipped. --top lists the slowest imports under home_ui
+from `python -X importtime`.
+"""
+import argparse, os, subprocess, sys, statistics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULES = ["src.ui.home_ui", "src.fetch", "src.analyze_reviews", "src.ui.review_ui"]
+
+_IMPORT = """
+import time
+t = time.perf_counter()
+import {module}
+print(time.perf_counter() - t)
+"""
+
+# Process start -> home window laid out and painted once. The window is torn
+# down with os._exit so the background trending fetch is not waited on.
+_FIRST_FRAME = """
+import time, os
+t = time.perf_counter()
+import tkinter as tk
+from src.ui.home_ui import build_home_ui
+try:
+    root = tk.Tk()
+except tk.TclError:
+    print("nodisplay")
+    os._exit(0)
+build_home_ui(root)
+root.update()
+print(time.perf_counter() - t)
+os._exit(0)
+"""
+
+
+def _python(code: str, *flags):
+    out = subprocess.run([sys.executable, *flags, "-c", code], cwd=ROOT,
+                         capture_output=True, text=True, timeout=120)
+    if out.returncode:
+        raise RuntimeError(out.stderr.strip().splitlines()[-1] if out.stderr else "failed")
+    return out
+
+def _median(code: str, runs: int):
+    samples = []
+    for _ in range(runs):
+        value = _python(code).stdout.strip().splitlines()[-1]
+        if value == "nodisplay":
+            return None
+        samples.append(float(value))
+    return statistics.median(samples)
+
+def _slowest_imports(module: str, top: int):
+    """(cumulative seconds, package) for the `top` slowest imports of `module`."""
+    err = _python(f"import {module}", "-X", "importtime").stderr
+    rows = []
+    for line in err.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = [p.strip() for p in line[len("import time:"):].split("|")]
+        # Only top-level imports; nested ones are included in their parent's time
+        if not name.startswith(" "):
+            rows.append((int(cumulative) / 1e6, name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=5, help="fresh interpreters per measurement")
+    ap.add_argument("--top", type=int, default=0, help="also list the N slowest imports under home_ui")
+    args = ap.parse_args()
+
+    print(f"median of {args.runs} fresh interpreters")
+    baseline = _median(_IMPORT.format(module="os"), args.runs)
+    for module in MODULES:
+        dt = _median(_IMPORT.format(module=module), args.runs) - baseline
+        print(f"import {module:<24} {dt * 1000:9.1f} ms")
+
+    frame = _median(_FIRST_FRAME, args.runs)
+    if frame is None:
+        print(f"{'time to first frame':<31} skipped (no display)")
+    else:
+        print(f"{'time to first frame':<31} {frame * 1000:9.1f} ms")
+
+    if args.top:
+        print("\nslowest imports under src.ui.home_ui:")
+        for seconds, name in _slowest_imports("src.ui.home_ui", args.top):
+            print(f"  {name:<34} {seconds * 1000:9.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+# benchmarks/corpus.py
+"""
+Deterministic synthetic corpora shaped like data/collected_reviews.csv
+(Product, Site, URL, Review). The same (rows, seed) always produces the
+same file, so runs on different commits measure the same input.
+
+    python -m benchmarks.corpus 100k /tmp/collected_100k.csv
+
+Sizes accept k/m suffixes (1k .. 10m). Rows are generated and written in
+chunks, so memory stays flat at any size.
+"""
+import argparse, csv, os
+import numpy as np
+
+from src.fetch import TRUSTED_SITES, _BRANDS
+
+CHUNK_ROWS = 100_000
+
+_OPENERS = ["", "Dec 31, 2024 · ", "Review: ", "User opinion: ", "Verified buyer: ", "Update: "]
+_SUBJECTS = ["the phone", "this device", "the camera", "the battery", "the display",
+             "build quality", "the software", "performance", "charging", "the speaker"]
+_POSITIVE = ["good", "great", "excellent", "easy to use", "really useful", "fast",
+             "very comfortable", "good value", "amazing", "reliable"]
+_NEGATIVE = ["bad", "slow", "poor", "difficult", "hard to use", "expensive", "a problem",
+             "the worst", "laggy", "heating up", "overpriced", "buggy", "not good"]
+_NEUTRAL = ["okay", "average", "as expected", "similar to last year", "fine for the price"]
+_FILLER = ["Overall", "Honestly", "After two weeks", "For daily use", "Compared to rivals", "So far"]
+
+
+def parse_size(text) -> int:
+    """'1k' -> 1000, '10m' -> 10_000_000, '2500' -> 2500."""
+    text = str(text).strip().lower().replace("_", "")
+    mult = {"k": 1_000, "m": 1_000_000}.get(text[-1:], 1)
+    return int(float(text[:-1] if mult > 1 else text) * mult)
+
+
+def product_names(count: int, seed: int = 0):
+    """`count` distinct brand + model names."""
+    rng = np.random.default_rng(seed)
+    names, seen = [], set()
+    while len(names) < count:
+        brand = _BRANDS[rng.integers(len(_BRANDS))]
+        name = f"{brand} {rng.choice(['', 'Galaxy ', 'Pro ', 'Note ', 'Edge '])}{rng.integers(1, 100)}" \
+               f"{rng.choice(['', ' Pro', ' Plus', ' Ultra', ' Lite', ' 5G'])}".replace("  ", " ")
+        if name in seen:
+            name = f"{name} v{len(names)}"
+        seen.add(name)
+        names.append(name)
+    return names
+
+
+def titles(count: int, seed: int = 0):
+    """Search-result titles like the ones trending discovery parses."""
+    rng = np.random.default_rng(seed)
+    models = product_names(max(50, count // 20), seed)
+    shapes = ["{m} review: {a}", "{m} - Full phone specifications - GSMArena.com",
+              "Best phones of 2025 | {m} vs {m2}", "{m} hands-on — {a}", "Why the {m} is {a}"]
+    out = []
+    for _ in range(count):
+        shape = shapes[rng.integers(len(shapes))]
+        out.append(shape.format(m=models[rng.integers(len(models))],
+                                m2=models[rng.integers(len(models))],
+                                a=_POSITIVE[rng.integers(len(_POSITIVE))]))
+    return out
+
+
+def _review(rng):
+    parts = [_OPENERS[rng.integers(len(_OPENERS))]]
+    for _ in range(rng.integers(1, 4)):
+        mood = rng.random()
+        pool = _POSITIVE if mood < 0.55 else (_NEGATIVE if mood < 0.8 else _NEUTRAL)
+        parts.append(f"{_FILLER[rng.integers(len(_FILLER))]}, {_SUBJECTS[rng.integers(len(_SUBJECTS))]} "
+                     f"is {pool[rng.integers(len(pool))]}. ")
+    return "".join(parts).strip()
+
+
+def iter_rows(rows: int, seed: int = 0, products: int | None = None, dup_rate: float = 0.02):
+    """
+    Yields lists of [Product, Site, URL, Review] rows, CHUNK_ROWS at a time.
+    About dup_rate of the rows repeat an earlier URL (tracking params added)
+    so dedup has work to do; review texts also repeat, as real snippets do.
+    """
+    products = products or max(10, rows // 200)
+    names = product_names(products, seed)
+    rng = np.random.default_rng(seed + 1)
+    # A bounded pool of review texts keeps generation fast at 10M rows
+    texts = [_review(rng) for _ in range(min(rows, 50_000))]
+    done = 0
+    while done < rows:
+        n = min(CHUNK_ROWS, rows - done)
+        prod = rng.integers(len(names), size=n)
+        site = rng.integers(len(TRUSTED_SITES), size=n)
+        text = rng.integers(len(texts), size=n)
+        dup = rng.random(n) < dup_rate
+        chunk = []
+        for i in range(n):
+            row_id = done + i
+            if dup[i] and row_id:
+                row_id = int(rng.integers(row_id))
+                url_tail = f"?utm_source=bench&ref={i}"
+            else:
+                url_tail = ""
+            domain = TRUSTED_SITES[site[i]]
+            url = f"https://www.{domain}/reviews/{row_id}{url_tail}"
+            chunk.append([names[prod[i]], domain, url, texts[text[i]]])
+        done += n
+        yield chunk
+
+
+def write_corpus(path: str, rows: int, seed: int = 0, products: int | None = None,
+                 dup_rate: float = 0.02):
+    """Writes a collected_reviews.csv-shaped file; returns `path`."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["Product", "Site", "URL", "Review"])
+        for chunk in iter_rows(rows, seed, products, dup_rate):
+            w.writerows(chunk)
+    return path
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Write a synthetic collected_reviews.csv")
+    ap.add_argument("size", help="row count, e.g. 1k, 250k, 10m")
+    ap.add_argument("path")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--products", type=int, help="distinct products (default rows/200)")
+    ap.add_argument("--dup-rate", type=float, default=0.02)
+    args = ap.parse_args()
+    rows = parse_size(args.size)
+    write_corpus(args.path, rows, args.seed, args.products, args.dup_rate)
+    print(f"✅ Wrote {rows:,} rows to {args.path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+# benchmarks/harness.py
+"""
+Shared plumbing for benchmarks/run.py: a sandboxed data directory, an
+op recorder with latency percentiles, peak-RSS measurement and the
+results file format.
+
+A results file is JSON:
+
+    {"run": {"started", "commit", "python", "platform", "args"},
+     "results": [{"bench", "size", "items", "ops", "seconds",
+                  "throughput", "p50_ms", "p90_ms", "p99_ms", "peak_rss_mb"}]}
+"""
+import json, os, platform, subprocess, sys, time
+from contextlib import contextmanager
+
+import numpy as np
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+# ---------- Sandbox ----------
+@contextmanager
+def sandbox(root: str):
+    """Points every data file URA writes at `root` for the duration."""
+    import src.storage as storage, src.fetch as fetch, src.analyze_reviews as ar
+    import src.sentiment_cache as sentiment_cache, src.aggregates as aggregates
+    import src.image_cache as image_cache
+
+    os.makedirs(os.path.join(root, "image_cache"), exist_ok=True)
+    patches = [
+        (storage, "COLLECTED_CSV", os.path.join(root, "collected_reviews.csv")),
+        (storage, "ANALYZED_CSV", os.path.join(root, "analyzed_reviews.csv")),
+        (storage, "PARQUET_DIR", os.path.join(root, "parquet")),
+        (fetch, "COLLECTED_PATH", os.path.join(root, "collected_reviews.csv")),
+        (fetch, "COLLECTED_INDEX_PATH", os.path.join(root, "collected_index.sqlite")),
+        (fetch, "TRENDING_CACHE_PATH", os.path.join(root, "trending_cache.json")),
+        (ar, "INPUT_PATH", os.path.join(root, "collected_reviews.csv")),
+        (ar, "OUTPUT_PATH", os.path.join(root, "analyzed_reviews.csv")),
+        (ar, "STATE_PATH", os.path.join(root, "analyze_state.json")),
+        (ar, "INDEX_PATH", os.path.join(root, "analyzed_index.sqlite")),
+        (sentiment_cache, "CACHE_PATH", os.path.join(root, "sentiment_cache.sqlite")),
+        (aggregates, "AGG_PATH", os.path.join(root, "product_aggregates.sqlite")),
+        (image_cache, "CACHE_DIR", os.path.join(root, "image_cache")),
+    ]
+    saved = [(mod, name, getattr(mod, name)) for mod, name, _ in patches]
+    for mod, name, value in patches:
+        setattr(mod, name, value)
+    try:
+        yield root
+    finally:
+        for mod, name, value in saved:
+            setattr(mod, name, value)
+
+
+# ---------- Memory ----------
+def _reset_peak_rss():
+    """Linux lets a process reset its high-water mark; elsewhere the peak is process-wide."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+def _peak_rss_mb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import resource   # Unix only
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+# ---------- Recording ----------
+class Recorder:
+    """Times the measured region of a benchmark, one latency sample per op."""
+    def __init__(self):
+        self.latencies = []
+        self.items = 0
+        self.seconds = 0.0
+        self.peak_rss_mb = None
+
+    @contextmanager
+    def measure(self):
+        """Wraps the whole measured region (setup outside it is not counted)."""
+        _reset_peak_rss()
+        t = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.seconds += time.perf_counter() - t
+            self.peak_rss_mb = _peak_rss_mb()
+
+    @contextmanager
+    def op(self, items: int = 1):
+        t = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.latencies.append(time.perf_counter() - t)
+            self.items += items
+
+    def result(self, bench: str, size: int):
+        lat = np.array(self.latencies) * 1000 if self.latencies else np.array([np.nan])
+        return {
+            "bench": bench, "size": size, "items": self.items, "ops": len(self.latencies),
+            "seconds": round(self.seconds, 4),
+            "throughput": round(self.items / self.seconds, 1) if self.seconds else None,
+            "p50_ms": round(float(np.percentile(lat, 50)), 3),
+            "p90_ms": round(float(np.percentile(lat, 90)), 3),
+            "p99_ms": round(float(np.percentile(lat, 99)), 3),
+            "peak_rss_mb": round(self.peak_rss_mb, 1) if self.peak_rss_mb else None,
+        }
+
+
+# ---------- Results files ----------
+def run_info(args: dict):
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, cwd=os.path.dirname(__file__)).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {"started": time.strftime("%Y-%m-%dT%H:%M:%S"), "commit": commit,
+            "python": platform.python_version(), "platform": platform.platform(), "args": args}
+
+def save_results(run: dict, results: list, path: str | None = None):
+    """Writes a results file (default benchmarks/results/<time>-<commit>.json); returns its path."""
+    if path is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = run["started"].replace(":", "").replace("-", "")
+        path = os.path.join(RESULTS_DIR, f"{stamp}-{run['commit'] or 'nocommit'}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"run": run, "results": results}, f, indent=1)
+    return path
+
+def load_results(path: str):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def compare(base: dict, new: dict):
+    """Rows of (bench, size, base throughput, new throughput, ratio, base p99, new p99, rss delta)."""
+    index = {(r["bench"], r["size"]): r for r in base["results"]}
+    rows = []
+    for r in new["results"]:
+        b = index.get((r["bench"], r["size"]))
+        if not b:
+            continue
+        ratio = (r["throughput"] / b["throughput"]) if b["throughput"] and r["throughput"] else None
+        rss = (r["peak_rss_mb"] - b["peak_rss_mb"]) if r["peak_rss_mb"] and b["peak_rss_mb"] else None
+        rows.append((r["bench"], r["size"], b["throughput"], r["throughput"], ratio,
+                     b["p99_ms"], r["p99_ms"], rss))
+    return rows
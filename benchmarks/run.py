@@ -0,0 +1,224 @@
+# benchmarks/run.py
+"""
+End-to-end benchmark suite on synthetic corpora, fully offline.
+
+    python -m benchmarks.run --sizes 1k,10k,100k
+    python -m benchmarks.run --sizes 1m --only ingest,dedup,aggregate --sentiment lexicon
+    python -m benchmarks.run compare benchmarks/results/A.json benchmarks/results/B.json
+
+Benchmarks (items are corpus rows unless noted):
+
+    ingest        save_reviews into an empty store, one op per 50-row search batch
+    dedup         the same batches again; every row is a duplicate
+    search        fetch_and_save_reviews against FakeDDGS (items: products)
+    product_info  fetch_product_info against FakeDDGS + a local image server,
+                  cold then warm image cache (items: calls)
+    analyze       analyze_reviews over the whole corpus, one op
+    analyze_product  analyze_reviews(product) for up to 20 products
+    streaming     analyze_reviews_streaming in 50k-row chunks
+    aggregate     aggregate table rebuild + product_summary per product
+    titles        _extract_models_from_title (items: titles, op per 1000)
+
+Each benchmark runs in a fresh process with its own sandboxed data dir,
+so peak RSS is per benchmark and never touches data/. Results are
+written to benchmarks/results/ (see harness.py for the format).
+"""
+import argparse, multiprocessing, os, shutil, tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from benchmarks.corpus import parse_size, write_corpus, titles
+from benchmarks.harness import Recorder, sandbox, run_info, save_results, load_results, compare
+
+BENCHES = ["ingest", "dedup", "search", "product_info", "analyze", "analyze_product",
+           "streaming", "aggregate", "titles"]
+BATCH = 50          # rows per simulated search result
+SAMPLE_PRODUCTS = 20
+
+
+def _batches(corpus_path):
+    """(product, [{"url", "snippet"}]) batches of at most BATCH rows, in file order."""
+    for chunk in pd.read_csv(corpus_path, chunksize=100_000):
+        for product, group in chunk.groupby("Product", sort=False):
+            recs = [{"url": u, "snippet": s} for u, s in zip(group["URL"], group["Review"])]
+            for i in range(0, len(recs), BATCH):
+                yield product, recs[i:i + BATCH]
+
+def _products(corpus_path, n=SAMPLE_PRODUCTS):
+    return pd.read_csv(corpus_path, usecols=["Product"], nrows=200_000)["Product"].drop_duplicates().head(n).tolist()
+
+def _ingest(corpus_path, rec=None):
+    from src.fetch import save_reviews
+    for product, batch in _batches(corpus_path):
+        if rec:
+            with rec.op(len(batch)):
+                save_reviews(product, batch)
+        else:
+            save_reviews(product, batch)
+
+
+# ---------- Benchmarks ----------
+def bench_ingest(rec, corpus, opts):
+    with rec.measure():
+        _ingest(corpus, rec)
+
+def bench_dedup(rec, corpus, opts):
+    _ingest(corpus)
+    with rec.measure():
+        _ingest(corpus, rec)
+
+def bench_search(rec, corpus, opts):
+    from benchmarks.standins import offline
+    from src.fetch import fetch_and_save_reviews
+    with offline(latency=opts["latency"]):
+        with rec.measure():
+            for product in _products(corpus, 50):
+                with rec.op():
+                    fetch_and_save_reviews(product)
+
+def bench_product_info(rec, corpus, opts):
+    from benchmarks.standins import offline
+    from src.fetch import fetch_product_info
+    products = _products(corpus, 10)
+    with offline(latency=opts["latency"]):
+        with rec.measure():
+            for _ in range(2):   # cold, then served from the image cache
+                for product in products:
+                    with rec.op():
+                        fetch_product_info(product)
+
+def _collected(corpus):
+    import src.analyze_reviews as ar
+    shutil.copy(corpus, ar.INPUT_PATH)
+
+def bench_analyze(rec, corpus, opts):
+    from src.analyze_reviews import analyze_reviews
+    _collected(corpus)
+    rows = sum(1 for _ in open(corpus, encoding="utf-8")) - 1
+    with rec.measure():
+        with rec.op(rows):
+            analyze_reviews(workers=opts["workers"], sentiment_backend=opts["sentiment"])
+
+def bench_analyze_product(rec, corpus, opts):
+    from src.analyze_reviews import analyze_reviews
+    _collected(corpus)
+    with rec.measure():
+        for product in _products(corpus):
+            with rec.op():
+                analyze_reviews(product, sentiment_backend=opts["sentiment"])
+
+def bench_streaming(rec, corpus, opts):
+    from src.analyze_reviews import analyze_reviews_streaming
+    _collected(corpus)
+    with rec.measure():
+        with rec.op():
+            summary = analyze_reviews_streaming(workers=opts["workers"],
+                                                sentiment_backend=opts["sentiment"])
+    rec.items = summary["rows"]
+
+def bench_aggregate(rec, corpus, opts):
+    import src.analyze_reviews as ar
+    from src import aggregates
+    from src.storage import get_store
+    _collected(corpus)
+    ar.analyze_reviews(workers=opts["workers"], sentiment_backend=opts["sentiment"])
+    rows = sum(1 for _ in open(ar.OUTPUT_PATH, encoding="utf-8")) - 1
+    path = ar.aggregates_path()
+    with rec.measure():
+        with rec.op(rows):
+            aggregates.rebuild(get_store(), path)
+        for product in _products(corpus):
+            with rec.op(0):
+                ar.product_summary(product)
+
+def bench_titles(rec, corpus, opts):
+    from src.fetch import _extract_models_from_title
+    sample = titles(min(opts["size"], 1_000_000))
+    with rec.measure():
+        for i in range(0, len(sample), 1000):
+            part = sample[i:i + 1000]
+            with rec.op(len(part)):
+                for t in part:
+                    _extract_models_from_title(t)
+
+
+# ---------- Runner ----------
+def _run_one(name, size, corpus, opts):
+    """Child-process entry point: one benchmark in its own sandbox."""
+    work = tempfile.mkdtemp(prefix=f"ura-bench-{name}-")
+    try:
+        with sandbox(work):
+            rec = Recorder()
+            globals()[f"bench_{name}"](rec, corpus, dict(opts, size=size))
+            return rec.result(name, size)
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+def run(sizes, only=None, opts=None, log=print):
+    opts = {"workers": 1, "sentiment": None, "latency": 0.0, **(opts or {})}
+    corpora = tempfile.mkdtemp(prefix="ura-bench-corpus-")
+    ctx = multiprocessing.get_context("spawn")
+    results = []
+    try:
+        for size in sizes:
+            corpus = write_corpus(os.path.join(corpora, f"collected_{size}.csv"), size)
+            for name in only or BENCHES:
+                with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+                    try:
+                        r = pool.submit(_run_one, name, size, corpus, opts).result()
+                    except Exception as e:
+                        log(f"❌ {name} @ {size:,}: {e!r}")
+                        continue
+                results.append(r)
+                log(_fmt(r))
+    finally:
+        shutil.rmtree(corpora, ignore_errors=True)
+    return results
+
+def _fmt(r):
+    tp = f"{r['throughput']:,.0f}/s" if r["throughput"] else "-"
+    rss = f"{r['peak_rss_mb']:.0f} MB" if r["peak_rss_mb"] else "-"
+    return (f"{r['bench']:<16}{r['size']:>11,}{tp:>14}{r['p50_ms']:>11.2f}{r['p90_ms']:>11.2f}"
+            f"{r['p99_ms']:>11.2f}{rss:>10}")
+
+def _print_compare(base_path, new_path):
+    rows = compare(load_results(base_path), load_results(new_path))
+    print(f"{'bench':<16}{'size':>11}{'base/s':>12}{'new/s':>12}{'ratio':>8}{'base p99':>10}{'new p99':>10}{'ΔRSS MB':>9}")
+    for bench, size, b, n, ratio, bp, np_, rss in rows:
+        print(f"{bench:<16}{size:>11,}{b or 0:>12,.0f}{n or 0:>12,.0f}"
+              f"{(f'{ratio:.2f}x' if ratio else '-'):>8}{bp:>10.2f}{np_:>10.2f}"
+              f"{(f'{rss:+.0f}' if rss is not None else '-'):>9}")
+
+def main():
+    ap = argparse.ArgumentParser(description="URA benchmark suite")
+    ap.add_argument("cmd", nargs="?", default="run", choices=["run", "compare"])
+    ap.add_argument("files", nargs="*", help="compare: BASE.json NEW.json")
+    ap.add_argument("--sizes", default="1k,10k", help="comma-separated corpus sizes, e.g. 1k,100k,10m")
+    ap.add_argument("--only", help=f"comma-separated subset of {','.join(BENCHES)}")
+    ap.add_argument("--sentiment", help="sentiment backend for the analysis benchmarks")
+    ap.add_argument("--workers", type=int, default=1, help="analyze_reviews workers")
+    ap.add_argument("--latency", type=float, default=0.0, help="simulated seconds per search call")
+    ap.add_argument("--out", help="results file (default benchmarks/results/<time>-<commit>.json)")
+    args = ap.parse_args()
+
+    if args.cmd == "compare":
+        if len(args.files) != 2:
+            ap.error("compare needs BASE.json and NEW.json")
+        _print_compare(*args.files)
+        return
+
+    sizes = [parse_size(s) for s in args.sizes.split(",") if s.strip()]
+    only = [b.strip() for b in args.only.split(",")] if args.only else None
+    unknown = set(only or []) - set(BENCHES)
+    if unknown:
+        ap.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+    opts = {"workers": args.workers, "sentiment": args.sentiment, "latency": args.latency}
+
+    print(f"{'bench':<16}{'size':>11}{'throughput':>14}{'p50 ms':>11}{'p90 ms':>11}{'p99 ms':>11}{'peak RSS':>10}")
+    results = run(sizes, only, opts)
+    path = save_results(run_info(vars(args)), results, args.out)
+    print(f"\n📄 Results: {path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+# benchmarks/standins.py
+"""
+Offline stand-ins for the network, so benchmarks measure URA's own code:
+
+    FakeDDGS       drop-in for ddgs.DDGS (.text / .images), deterministic
+                   results per query and an optional per-call latency
+    image_server() local HTTP server that returns a small PNG for any path
+    offline()      routes src.search to FakeDDGS (no disk cache) and
+                   image downloads to the local server
+
+    with offline(latency=0.05):
+        fetch_and_save_reviews("Pixel 9")      # search_product_reviews
+        fetch_product_info("Pixel 9")          # buy link, images, thumbnails
+"""
+import hashlib, threading, time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from urllib.parse import quote
+
+from PIL import Image
+
+from src import search
+from src.fetch import TRUSTED_SITES
+from benchmarks.corpus import _POSITIVE, _NEGATIVE, _SUBJECTS
+
+
+def _digest(*parts) -> int:
+    return int(hashlib.sha1("|".join(map(str, parts)).encode("utf-8")).hexdigest()[:12], 16)
+
+
+class FakeDDGS:
+    """Context manager with ddgs.DDGS's text()/images() surface."""
+    latency = 0.0          # seconds slept per call, like a real round trip
+    image_base = "http://127.0.0.1:9/img"
+    calls = 0
+    _lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def _wait(self):
+        with FakeDDGS._lock:
+            FakeDDGS.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def text(self, query, max_results=20, **kwargs):
+        self._wait()
+        out = []
+        for i in range(max_results):
+            h = _digest(query, i)
+            site = TRUSTED_SITES[h % len(TRUSTED_SITES)]
+            out.append({
+                "title": f"{query.split(' reviews')[0]} review: {_POSITIVE[h % len(_POSITIVE)]}",
+                "href": f"https://www.{site}/{quote(query)}/{h % 100_000}",
+                "body": f"{_SUBJECTS[h % len(_SUBJECTS)]} is {_POSITIVE[h % len(_POSITIVE)]}, "
+                        f"but {_SUBJECTS[(h >> 8) % len(_SUBJECTS)]} is {_NEGATIVE[h % len(_NEGATIVE)]}.",
+            })
+        return out
+
+    def images(self, query, max_results=3, **kwargs):
+        self._wait()
+        return [{"image": f"{self.image_base}/{_digest(query, i)}.png"} for i in range(max_results)]
+
+
+class _ImageHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    body = b""
+    delay = 0.0
+
+    def do_GET(self):
+        if self.delay:
+            time.sleep(self.delay)
+        self.send_response(200)
+        self.send_header("Content-Type", "image/png")
+        self.send_header("Content-Length", str(len(self.body)))
+        self.send_header("ETag", '"bench"')
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, *args):
+        pass
+
+
+@contextmanager
+def image_server(size=(640, 480), delay: float = 0.0):
+    """Serves one PNG of `size` for every GET, `delay` seconds late; yields the base URL."""
+    buf = BytesIO()
+    Image.new("RGB", size, (90, 140, 200)).save(buf, "PNG")
+    handler = type("BenchImageHandler", (_ImageHandler,), {"body": buf.getvalue(), "delay": delay})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}/img"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@contextmanager
+def offline(latency: float = 0.0, image_delay: float = 0.0):
+    """
+    Points searches at FakeDDGS (and images at a local server answering
+    `image_delay` seconds late) for the duration. The search cache is off,
+    so every run pays for its queries; coalescing of concurrent identical
+    queries still applies.
+    """
+    with image_server(delay=image_delay) as base:
+        fake = type("BenchDDGS", (FakeDDGS,), {"latency": latency, "image_base": base})
+        backend, cache = search.set_backend(fake), search.set_cache(None)
+        try:
+            yield fake
+        finally:
+            search.set_backend(backend)
+            search.set_cache(cache)
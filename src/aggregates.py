@@ -0,0 +1,204 @@
+# src/aggregates.py
+"""
+Per-product summary table, maintained as analyzed rows are appended.
+
+    data/product_aggregates.sqlite    product key -> sentiment counts,
+                                      pros/cons/improvement counters,
+                                      verdict, last-updated time
+
+analyze_reviews folds every row it appends into this table, so a screen
+reads one row per product instead of reducing the analyzed corpus.
+rebuild() recomputes it from the analyzed store if it ever drifts.
+"""
+import os, json, time, sqlite3
+from collections import Counter
+from contextlib import closing
+
+from src.keywords import to_masks, bit_counts
+from src.storage import product_key, record_txn, txn_committed
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
+os.makedirs(DATA_DIR, exist_ok=True)
+
+AGG_PATH = os.path.join(DATA_DIR, "product_aggregates.sqlite")
+
+SENTIMENTS = ("Positive", "Negative", "Neutral")
+_COUNTERS = ("pros", "cons", "improvements")
+
+def build_verdict(counts) -> str:
+    """Verdict line for a {sentiment: count} mapping."""
+    total = int(sum(counts.values()) or 1)
+    pos = int(counts.get("Positive", 0))
+    neg = int(counts.get("Negative", 0))
+    pos_pct = round(100*pos/total, 1)
+    neg_pct = round(100*neg/total, 1)
+    mood = "Mostly Positive" if pos_pct >= 55 else ("Mostly Negative" if neg_pct >= 55 else "Mixed")
+    return f"{mood} — {pos_pct}% Positive, {neg_pct}% Negative, {round(100-pos_pct-neg_pct,1)}% Neutral"
+
+# ---------- Reduce ----------
+def _empty(product):
+    return {"product": product, "reviews": 0,
+            "sentiment_counts": dict.fromkeys(SENTIMENTS, 0),
+            **{c: {} for c in _COUNTERS}}
+
+def _vocab():
+    # analyze_reviews imports this module, so its vocabularies are looked up late
+    from src.analyze_reviews import _PROS, _CONS, _RULES
+    return _PROS, _CONS, _RULES
+
+def _merge(counts, new, vocab):
+    """Adds {keyword: n} `new` into `counts`; most frequent first, ties in vocabulary order."""
+    merged = Counter(counts)
+    merged.update(new)
+    rank = {w: i for i, w in enumerate(vocab)}
+    return dict(sorted(merged.items(), key=lambda kv: (-kv[1], rank.get(kv[0], len(rank)))))
+
+def _encode(df):
+    """
+    product, sentiment and pros/cons as bitmasks, encoded once per batch
+    before it is split by product. Improvements are not read: their counts
+    follow from the cons masks through the compiled rules.
+    """
+    pros_vocab, cons_vocab, _ = _vocab()
+    out = df[["product", "sentiment"]].copy()
+    out["pros"] = to_masks(df["pros"], pros_vocab)
+    out["cons"] = to_masks(df["cons"], cons_vocab)
+    return out
+
+def _fold(summary, encoded):
+    """Adds rows of an _encode()d frame into `summary` in place."""
+    pros_vocab, cons_vocab, rules = _vocab()
+    summary["reviews"] += len(encoded)
+    for label, n in encoded["sentiment"].value_counts(sort=False).items():
+        summary["sentiment_counts"][label] = summary["sentiment_counts"].get(label, 0) + int(n)
+    pros, cons = encoded["pros"].to_numpy(), encoded["cons"].to_numpy()
+    summary["pros"] = _merge(summary["pros"], bit_counts(pros, pros_vocab), pros_vocab)
+    summary["cons"] = _merge(summary["cons"], bit_counts(cons, cons_vocab), cons_vocab)
+    summary["improvements"] = _merge(summary["improvements"], rules.counts(cons), rules.outputs)
+    summary["verdict"] = build_verdict(summary["sentiment_counts"])
+    return summary
+
+def summarize(df, product=None):
+    """Same shape as get() for an in-memory analyzed DataFrame (no table involved)."""
+    if df is None or df.empty:
+        return None
+    product = product or str(df["product"].iloc[0])
+    summary = _fold(_empty(product), _encode(df))
+    summary["updated_at"] = time.time()
+    return summary
+
+# ---------- Table ----------
+def _connect(path):
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute("CREATE TABLE IF NOT EXISTS products (key TEXT PRIMARY KEY, product TEXT, "
+                 "summary TEXT NOT NULL, updated_at REAL NOT NULL)")
+    conn.execute("CREATE INDEX IF NOT EXISTS products_updated ON products (updated_at)")
+    conn.execute("CREATE TABLE IF NOT EXISTS meta (k TEXT PRIMARY KEY, v TEXT)")
+    return conn
+
+def _built(conn):
+    return conn.execute("SELECT 1 FROM meta WHERE k = 'built'").fetchone() is not None
+
+def open_table(store, path: str | None = None):
+    """
+    Opens the aggregate table, building it from `store`'s analyzed rows the
+    first time so products analyzed before it existed are included.
+    """
+    conn = _connect(path or AGG_PATH)
+    try:
+        if not _built(conn):
+            _rebuild(conn, store)
+    except BaseException:
+        conn.close()
+        raise
+    return conn
+
+def _load(conn, key):
+    row = conn.execute("SELECT summary FROM products WHERE key = ?", (key,)).fetchone()
+    return json.loads(row[0]) if row else None
+
+def _put(conn, key, summary):
+    summary["updated_at"] = time.time()
+    conn.execute("INSERT OR REPLACE INTO products VALUES (?, ?, ?, ?)",
+                 (key, summary["product"], json.dumps(summary), summary["updated_at"]))
+
+def update(conn, analyzed, txn: str | None = None):
+    """
+    Folds newly appended analyzed rows into their products' rows (caller
+    commits). `txn` is the store batch they came from, see catch_up.
+    """
+    if txn:
+        record_txn(conn, txn)
+    if analyzed is None or analyzed.empty:
+        return
+    keys = analyzed["product"].map(product_key)
+    for key, group in _encode(analyzed).groupby(keys, sort=False):
+        summary = _load(conn, key) or _empty(str(group["product"].iloc[-1]))
+        _put(conn, key, _fold(summary, group))
+
+def catch_up(conn, store, txn: str):
+    """
+    After a crash between the analyzed-store commit of batch `txn` and the
+    aggregate update, rebuilds the table (a no-op if the update made it).
+    """
+    if not txn_committed(conn, txn):
+        _rebuild(conn, store)
+        record_txn(conn, txn)
+        conn.commit()
+
+def _rebuild(conn, store):
+    """
+    Recomputes every row in one transaction, marked 'built' on commit. A
+    failed read of the store rolls back and raises, so the table is never
+    left empty or partial (and open_table retries the build).
+    """
+    try:
+        conn.execute("DELETE FROM products")
+        summaries = {}
+        for chunk in store.iter_analyzed(["product", "sentiment", "pros", "cons"]):
+            keys = chunk["product"].map(product_key)
+            for key, group in _encode(chunk).groupby(keys, sort=False):
+                summary = summaries.setdefault(key, _empty(str(group["product"].iloc[-1])))
+                _fold(summary, group)
+        for key, summary in summaries.items():
+            _put(conn, key, summary)
+        conn.execute("INSERT OR REPLACE INTO meta VALUES ('built', '1')")
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+
+def rebuild(store, path: str | None = None):
+    """Recomputes every product's row from the analyzed store."""
+    with closing(_connect(path or AGG_PATH)) as conn:
+        _rebuild(conn, store)
+
+# ---------- Reads ----------
+def get(product: str, path: str | None = None):
+    """
+    {"product", "reviews", "sentiment_counts", "pros", "cons",
+    "improvements", "verdict", "updated_at"} for one product, or None.
+    Keyword counters are {keyword: count}, most frequent first.
+    """
+    path = path or AGG_PATH
+    if not os.path.exists(path):
+        return None
+    with closing(_connect(path)) as conn:
+        return _load(conn, product_key(product))
+
+def latest(path: str | None = None):
+    """Summary of the most recently updated product, or None."""
+    path = path or AGG_PATH
+    if not os.path.exists(path):
+        return None
+    with closing(_connect(path)) as conn:
+        row = conn.execute("SELECT summary FROM products ORDER BY updated_at DESC LIMIT 1").fetchone()
+    return json.loads(row[0]) if row else None
+
+def version(path: str | None = None):
+    """Changes whenever any product row is written; cheap enough to poll."""
+    path = path or AGG_PATH
+    if not os.path.exists(path):
+        return None
+    with closing(_connect(path)) as conn:
+        return tuple(conn.execute("SELECT COUNT(*), MAX(updated_at) FROM products").fetchone())
@@ -1,109 +1,407 @@
 # src/analyze_reviews.py
-import os, json, ast
+import os, json, ast, io, csv, hashlib, sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing
+from functools import partial
 import pandas as pd
-from textblob import TextBlob
+from src import sentiment_cache
+from src.sentiment_backends import get_backend, agreement
+from src.keywords import KeywordMatcher, MaskRules, from_masks
+from src.storage import CsvStore, get_store, product_key, record_txn, txn_committed
+from src import aggregates, metrics
+from src.aggregates import build_verdict
+from src.row_index import records, prefix_state, prefix_unchanged
 
 DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
 os.makedirs(DATA_DIR, exist_ok=True)
 
 INPUT_PATH  = os.path.join(DATA_DIR, "collected_reviews.csv")
 OUTPUT_PATH = os.path.join(DATA_DIR, "analyzed_reviews.csv")
+STATE_PATH  = os.path.join(DATA_DIR, "analyze_state.json")
+INDEX_PATH  = os.path.join(DATA_DIR, "analyzed_index.sqlite")
 
-def _ensure_analyzed_file():
-    if not os.path.exists(OUTPUT_PATH):
-        with open(OUTPUT_PATH, "w", encoding="utf-8", newline="") as f:
-            pd.DataFrame(columns=[
-                "product","review","sentiment","pros","cons","improvements","verdict"
-            ]).to_csv(f, index=False)
-
-def _sentiment(text: str):
-    blob = TextBlob(str(text))
-    p = blob.sentiment.polarity
-    if p > 0.1:  return "Positive"
-    if p < -0.1: return "Negative"
+_POS_THRESHOLD = 0.1
+_NEG_THRESHOLD = -0.1
+
+# Cached labels are only valid for this scorer + thresholds
+def _sentiment_version(scorer):
+    return f"{scorer.name}|{_POS_THRESHOLD}|{_NEG_THRESHOLD}"
+
+SENTIMENT_VERSION = _sentiment_version(get_backend())
+
+def _label(polarity: float):
+    if polarity > _POS_THRESHOLD:  return "Positive"
+    if polarity < _NEG_THRESHOLD: return "Negative"
     return "Neutral"
 
+# ---------- Batch scoring ----------
+PARALLEL_MIN_ROWS = 2000   # below this, pool start-up costs more than it saves
+DEFAULT_CHUNK_SIZE = 256
+
+def _warm_worker(backend):
+    """Pool initializer: loads the scorer's lexicon once per worker process."""
+    get_backend(backend).warm()
+
+def _score_chunk(texts, backend=None):
+    return [_label(p) for p in get_backend(backend).polarities(texts)]
+
+def _score_all(texts, workers: int | None = 1, chunk_size: int = DEFAULT_CHUNK_SIZE,
+               backend: str | None = None):
+    """
+    Labels for `texts`, in order. With workers > 1 (None = all cores) and
+    enough rows, chunks are scored on a ProcessPoolExecutor; otherwise serial.
+    """
+    texts = list(texts)
+    metrics.count("analyze.texts_scored", len(texts))
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(texts) < max(PARALLEL_MIN_ROWS, 2 * chunk_size):
+        return _score_chunk(texts, backend)
+
+    chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+    workers = min(workers, len(chunks))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_warm_worker,
+                             initargs=(backend,)) as pool:
+        # map() yields in submission order, so row order matches the serial path
+        parts = pool.map(partial(_score_chunk, backend=backend), chunks)
+        return [lbl for part in parts for lbl in part]
+
+def _sentiments(reviews: pd.Series, use_cache: bool = True,
+                workers: int | None = 1, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                backend: str | None = None):
+    """Sentiment labels for `reviews`, served from the on-disk cache where possible."""
+    scorer = get_backend(backend)
+    score = partial(_score_all, workers=workers, chunk_size=chunk_size, backend=scorer.kind)
+    if use_cache:
+        # Each scorer keeps its own cache file, so switching does not wipe the other
+        path = None
+        if scorer.kind != "textblob":
+            path = sentiment_cache.CACHE_PATH.replace(".sqlite", f".{scorer.kind}.sqlite")
+        labels = sentiment_cache.cached_sentiments(reviews.tolist(), score,
+                                                   _sentiment_version(scorer), path)
+    else:
+        labels = score(reviews.tolist())
+    return pd.Series(labels, index=reviews.index, dtype=object)
+
 _PROS = ["good","great","excellent","easy","useful","fast","quality","comfortable","battery","camera","display","value"]
 _CONS = ["bad","slow","poor","difficult","hard","expensive","problem","issue","worst","lag","heating","overpriced","bug"]
 
-def _pros(text): return [w for w in _PROS if w in str(text).lower()]
-def _cons(text): return [w for w in _CONS if w in str(text).lower()]
+_MATCHER = KeywordMatcher(_PROS, _CONS)
 
-def _improvements(cons_list):
-    cons_set = set(cons_list or [])
-    sugg = []
-    if {"slow","lag"} & cons_set:        sugg.append("Improve performance/speed.")
-    if {"expensive","overpriced"} & cons_set: sugg.append("Reduce price / add offers.")
-    if {"heating"} & cons_set:          sugg.append("Thermal optimization.")
-    if {"bug","issue","problem"} & cons_set:  sugg.append("Stability fixes.")
-    if {"poor","bad","worst"} & cons_set:     sugg.append("Quality/reliability improvements.")
-    return list(dict.fromkeys(sugg))
+# (cons that trigger it, suggestion), in output order
+_IMPROVEMENT_RULES = [
+    ({"slow","lag"},             "Improve performance/speed."),
+    ({"expensive","overpriced"}, "Reduce price / add offers."),
+    ({"heating"},                "Thermal optimization."),
+    ({"bug","issue","problem"},  "Stability fixes."),
+    ({"poor","bad","worst"},     "Quality/reliability improvements."),
+]
+_IMPROVEMENTS = [sugg for _, sugg in _IMPROVEMENT_RULES]
+_RULES = MaskRules(_IMPROVEMENT_RULES, _CONS)   # the same rules as tests on cons bitmasks
 
 def _build_verdict(sent_counts: pd.Series):
-    total = int(sent_counts.sum() or 1)
-    pos = int(sent_counts.get("Positive", 0))
-    neg = int(sent_counts.get("Negative", 0))
-    neu = int(sent_counts.get("Neutral",  0))
-    pos_pct = round(100*pos/total, 1)
-    neg_pct = round(100*neg/total, 1)
-    mood = "Mostly Positive" if pos_pct >= 55 else ("Mostly Negative" if neg_pct >= 55 else "Mixed")
-    return f"{mood} — {pos_pct}% Positive, {neg_pct}% Negative, {round(100-pos_pct-neg_pct,1)}% Neutral"
+    return build_verdict(sent_counts.to_dict())
+
+# ---------- Incremental state ----------
+def _load_state():
+    try:
+        with open(STATE_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
 
-def analyze_reviews(product_filter: str | None = None):
+def _save_state(state: dict):
+    tmp = STATE_PATH + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp, STATE_PATH)
+
+def _read_new_rows():
     """
-    Reads collected_reviews.csv, optionally filters by product,
-    computes per-review fields + a unified verdict, returns analyzed df,
-    and appends new rows to analyzed_reviews.csv (dedup on product+review).
+    Reads only the rows appended to INPUT_PATH since the last watermark.
+    Falls back to a full read when the processed prefix no longer matches
+    (file rewritten, truncated or replaced). Returns (df, new_state).
     """
-    if not os.path.exists(INPUT_PATH):
-        raise FileNotFoundError(f"{INPUT_PATH} not found! Run Day 1 first to collect reviews.")
+    state = _load_state()
+    with open(INPUT_PATH, "rb") as f:
+        header = f.readline()
+        end = os.fstat(f.fileno()).st_size
+        offset = state.get("offset", 0)
+        if not prefix_unchanged(f, offset, header, end, state):
+            offset = len(header)
 
-    df = pd.read_csv(INPUT_PATH)
-    if df.empty:
-        return pd.DataFrame()
+        f.seek(offset)
+        data = f.read(end - offset)
+        # Only consume complete records: a concurrent writer may be mid-row,
+        # and a quoted review can span several lines
+        cut = 0
+        for start, length, _ in records(data, offset):
+            cut = start + length - offset
+        chunk = data[:cut]
+        new_offset = offset + cut
+        new_state = {"offset": new_offset, **prefix_state(f, new_offset, header)}
+
+    names = next(csv.reader([header.decode("utf-8")]))
+    if not chunk.strip():
+        return pd.DataFrame(columns=names), new_state
+    df = pd.read_csv(io.BytesIO(chunk), header=None, names=names)
+    return df, new_state
+
+# ---------- Dedup index ----------
+def _row_key(product, review):
+    return hashlib.sha1(f"{product}||{review}".encode("utf-8")).hexdigest()
+
+# ---------- Storage ----------
+def _store():
+    """The configured backend; the CSV one follows this module's paths."""
+    store = get_store()
+    if isinstance(store, CsvStore):
+        store = CsvStore(INPUT_PATH, OUTPUT_PATH)
+    return store
+
+def _backend_path(path, store):
+    """Side tables of non-CSV backends get their own file."""
+    if store.name == "csv":
+        return path
+    return path.replace(".sqlite", f".{store.name}.sqlite")
+
+def _index_path(store):
+    return _backend_path(INDEX_PATH, store)
+
+def _open_aggregates(store):
+    return aggregates.open_table(store, _backend_path(aggregates.AGG_PATH, store))
+
+def aggregates_path():
+    """Aggregate table of the configured backend, built on first use."""
+    store = _store()
+    path = _backend_path(aggregates.AGG_PATH, store)
+    with closing(aggregates.open_table(store, path)):
+        return path
+
+def product_summary(product: str | None = None):
+    """
+    Stored aggregate row for `product` (the most recently updated product
+    when None) under the configured backend, or None. See aggregates.get.
+    """
+    path = aggregates_path()
+    return aggregates.get(product, path) if product else aggregates.latest(path)
 
-    # Normalize column names
+def _open_index(store):
+    """
+    Opens the on-disk (product, review) key index, seeding it from the
+    analyzed store the first time so existing rows stay deduped. The seed
+    commits together with its 'seeded' marker, so a failed seed raises
+    and is retried on the next open instead of leaving an empty index.
+    """
+    conn = sqlite3.connect(_index_path(store))
+    try:
+        conn.execute("CREATE TABLE IF NOT EXISTS analyzed_keys (key TEXT PRIMARY KEY)")
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (k TEXT PRIMARY KEY, v TEXT)")
+        if conn.execute("SELECT 1 FROM meta WHERE k = 'seeded'").fetchone() is None:
+            for chunk in store.iter_analyzed(["product", "review"]):
+                conn.executemany(
+                    "INSERT OR IGNORE INTO analyzed_keys VALUES (?)",
+                    ((_row_key(p, r),) for p, r in zip(chunk["product"], chunk["review"]))
+                )
+            conn.execute("INSERT OR REPLACE INTO meta VALUES ('seeded', '1')")
+            conn.commit()
+    except BaseException:
+        conn.rollback()
+        conn.close()
+        raise
+    return conn
+
+def _filter_new(conn, analyzed: pd.DataFrame):
+    """Returns the rows of `analyzed` whose key is not yet indexed, and indexes them."""
+    keys = [_row_key(p, r) for p, r in
+            zip(analyzed["product"].astype(str), analyzed["review"].astype(str))]
+    seen, mask = set(), []
+    for k in keys:
+        is_new = k not in seen and conn.execute(
+            "SELECT 1 FROM analyzed_keys WHERE key = ?", (k,)
+        ).fetchone() is None
+        seen.add(k)
+        mask.append(is_new)
+    new_keys = [(k,) for k, m in zip(keys, mask) if m]
+    conn.executemany("INSERT OR IGNORE INTO analyzed_keys VALUES (?)", new_keys)
+    return analyzed[mask]
+
+def _normalize_input(df: pd.DataFrame, product_filter: str | None):
+    """Lower-cases column names, checks them and applies the product filter."""
     df.columns = df.columns.str.strip().str.lower()   # product, site, url, review
 
     if "review" not in df.columns or "product" not in df.columns:
         raise ValueError("Input CSV must have 'Product' and 'Review' columns.")
 
     if product_filter:
-        df = df[df["product"].str.lower() == product_filter.lower()]
+        df = df[df["product"].map(product_key) == product_key(product_filter)]
+    return df
 
-    if df.empty:
-        return pd.DataFrame()
-
-    # Per-review fields
+def _score_frame(df: pd.DataFrame, use_cache: bool, workers, chunk_size: int,
+                 backend: str | None = None):
+    """Per-review fields (everything but the verdict) for normalized input rows."""
     analyzed = pd.DataFrame({
         "product": df["product"],
         "review": df["review"]
     })
-    analyzed["sentiment"]    = analyzed["review"].apply(_sentiment)
-    analyzed["pros"]         = analyzed["review"].apply(_pros)
-    analyzed["cons"]         = analyzed["review"].apply(_cons)
-    analyzed["improvements"] = analyzed["cons"].apply(_improvements)
+    with metrics.span("analyze.sentiment"):
+        analyzed["sentiment"] = _sentiments(analyzed["review"], use_cache, workers, chunk_size, backend)
+    with metrics.span("analyze.keywords"):
+        pros, cons = _MATCHER.match_masks(analyzed["review"])
+        analyzed["pros"] = pd.Series(from_masks(pros, _PROS), index=analyzed.index, dtype=object)
+        analyzed["cons"] = pd.Series(from_masks(cons, _CONS), index=analyzed.index, dtype=object)
+    with metrics.span("analyze.improvements"):
+        # One vectorized mask test per rule for the whole batch
+        analyzed["improvements"] = pd.Series(from_masks(_RULES.apply(cons), _IMPROVEMENTS),
+                                             index=analyzed.index, dtype=object)
+    metrics.count("analyze.rows", len(analyzed))
+    return analyzed
+
+def _persist(store, conn, agg, analyzed: pd.DataFrame):
+    """
+    Appends rows not yet in the analyzed store and folds them into the
+    aggregates, all under the store's write lock. The key-index commit is
+    the batch's commit record; if a crash or error came after it but
+    before the aggregates commit, the next writer session reports the batch
+    as recovered and the aggregates are rebuilt.
+    """
+    with store.writer("analyzed", committed=lambda txn: txn_committed(conn, txn)) as writer:
+        if writer.recovered and writer.recovered["committed"]:
+            aggregates.catch_up(agg, store, writer.recovered["txn"])
+        with metrics.span("analyze.persist"):
+            to_append = _filter_new(conn, analyzed)
+            txn = writer.append(to_append)
+            if txn:
+                record_txn(conn, txn)
+            conn.commit()
+        with metrics.span("analyze.aggregates"):
+            aggregates.update(agg, to_append, txn)
+            agg.commit()
+    return to_append
+
+@metrics.timed("analyze.total")
+def analyze_reviews(product_filter: str | None = None, incremental: bool = False,
+                    use_cache: bool = True, workers: int | None = 1,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE, sentiment_backend: str | None = None):
+    """
+    Reads collected_reviews.csv, optionally filters by product,
+    computes per-review fields + a unified verdict, returns analyzed df,
+    and appends new rows to analyzed_reviews.csv (dedup on product+review).
+    Both tables go through the storage backend picked by $URA_STORAGE.
+    Appended rows are also folded into the per-product aggregate table
+    (aggregates.py).
+
+    With incremental=True only rows appended since the last incremental
+    run are read and scored; all of them are persisted (so the watermark
+    can advance) and the product_filter is applied to the returned df.
+
+    Sentiment labels come from the review-text cache (sentiment_cache.py)
+    unless use_cache=False; only unseen texts are scored, by the backend
+    named by sentiment_backend / $URA_SENTIMENT (sentiment_backends.py).
+    workers > 1 (None = all cores) scores them in chunk_size batches on a
+    process pool; small inputs stay serial. Output is identical either way.
+    """
+    store = _store()
+    if store.name == "csv" and not os.path.exists(INPUT_PATH):
+        raise FileNotFoundError(f"{INPUT_PATH} not found! Run Day 1 first to collect reviews.")
+
+    new_state = None
+    with metrics.span("analyze.read"):
+        if incremental:
+            if store.name != "csv":
+                raise ValueError("incremental=True tracks the CSV input; set URA_STORAGE=csv")
+            df, new_state = _read_new_rows()
+        else:
+            # Product reads touch only that product's rows: the CSV backend
+            # seeks through its byte-range index, parquet prunes partitions
+            df = store.read_collected(product_filter)
+    if df.empty:
+        if new_state:
+            _save_state(new_state)
+        return pd.DataFrame()
+
+    df = _normalize_input(df, None if incremental else product_filter)
+    if df.empty:
+        return pd.DataFrame()
+
+    analyzed = _score_frame(df, use_cache, workers, chunk_size, sentiment_backend)
 
     # Single verdict for the analyzed set
     verdict = _build_verdict(analyzed["sentiment"].value_counts())
     analyzed["verdict"] = verdict
 
-    # Persist with dedupe on (product, review)
-    _ensure_analyzed_file()
-    try:
-        existing = pd.read_csv(OUTPUT_PATH)
-        if not existing.empty:
-            key = existing[["product","review"]].astype(str).agg("||".join, axis=1)
-            existing_keys = set(key.tolist())
-        else:
-            existing_keys = set()
-    except Exception:
-        existing_keys = set()
+    # Persist with dedupe on (product, review) against the on-disk key index
+    with closing(_open_index(store)) as conn, closing(_open_aggregates(store)) as agg:
+        _persist(store, conn, agg, analyzed)
+
+    if new_state:
+        _save_state(new_state)
+
+    if product_filter and incremental:
+        analyzed = analyzed[analyzed["product"].map(product_key) == product_key(product_filter)].copy()
+        if not analyzed.empty:
+            analyzed["verdict"] = _build_verdict(analyzed["sentiment"].value_counts())
+
+    return analyzed
+
+def analyze_product(product: str, use_cache: bool = True, workers: int | None = 1,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE, sentiment_backend: str | None = None):
+    """
+    Analyzes the collected rows of one product (matched on product_key, so
+    case and punctuation do not matter) and returns only those rows. Cost
+    depends on that product's rows, not on how many others are stored.
+    """
+    if not str(product or "").strip():
+        raise ValueError("product must be a non-empty name")
+    return analyze_reviews(product, use_cache=use_cache, workers=workers,
+                           chunk_size=chunk_size, sentiment_backend=sentiment_backend)
 
-    mask_new = ~analyzed.astype(str)[["product","review"]].agg("||".join, axis=1).isin(existing_keys)
-    to_append = analyzed[mask_new]
+@metrics.timed("analyze.total")
+def analyze_reviews_streaming(product_filter: str | None = None, chunk_rows: int = 50_000,
+                              use_cache: bool = True, workers: int | None = 1,
+                              chunk_size: int = DEFAULT_CHUNK_SIZE, sentiment_backend: str | None = None):
+    """
+    Bounded-memory variant of analyze_reviews for inputs larger than RAM.
+    Reads the collected store chunk_rows rows at a time, scores each chunk,
+    and appends its new rows to the analyzed store before reading the next.
+    Sentiment counts accumulate across chunks. Each appended row carries
+    the verdict as of its chunk; the returned summary has the final one:
+    {"rows", "appended", "sentiment_counts", "verdict"}.
+    """
+    store = _store()
+    if store.name == "csv" and not os.path.exists(INPUT_PATH):
+        raise FileNotFoundError(f"{INPUT_PATH} not found! Run Day 1 first to collect reviews.")
 
-    if not to_append.empty:
-        to_append.to_csv(OUTPUT_PATH, mode="a", header=not os.path.getsize(OUTPUT_PATH), index=False)
+    counts = pd.Series(dtype="int64")
+    rows = appended = 0
+    with closing(_open_index(store)) as conn, closing(_open_aggregates(store)) as agg:
+        for chunk in metrics.timed_iter("analyze.read", store.iter_collected(product_filter, chunk_rows)):
+            df = _normalize_input(chunk, product_filter)
+            if df.empty:
+                continue
+            analyzed = _score_frame(df, use_cache, workers, chunk_size, sentiment_backend)
+            counts = counts.add(analyzed["sentiment"].value_counts(), fill_value=0)
+            analyzed["verdict"] = _build_verdict(counts)
 
-    return analyzed
\ No newline at end of file
+            to_append = _persist(store, conn, agg, analyzed)
+            rows += len(analyzed)
+            appended += len(to_append)
+
+    return {
+        "rows": rows,
+        "appended": appended,
+        "sentiment_counts": {k: int(v) for k, v in counts.items()},
+        "verdict": _build_verdict(counts),
+    }
+
+def sentiment_agreement(texts=None, candidate: str = "lexicon", reference: str = "textblob",
+                        sample: int | None = 2000, seed: int = 0):
+    """
+    Label agreement between two sentiment backends on `texts` (default: a
+    random sample of the collected reviews). See sentiment_backends.agreement.
+    """
+    if texts is None:
+        texts = _store().read_collected(columns=["Review"])["Review"].astype(str)
+    texts = pd.Series(list(texts), dtype=object)
+    if sample and len(texts) > sample:
+        texts = texts.sample(sample, random_state=seed)
+    return agreement(texts.tolist(), _label, candidate, reference)
@@ -0,0 +1,214 @@
+# src/api.py
+"""
+Read-mostly HTTP/JSON service over URA's data, for embedding in other tools.
+
+    python -m src.api --port 8765
+
+    GET  /health
+    GET  /trending?limit=8
+    GET  /products/<name>                      aggregate summary (aggregates.py)
+    GET  /products/<name>/reviews?page=1&size=20[&sentiment=Positive]
+    GET  /products/<name>/info                 buy link + image URLs
+    POST /products/<name>/analyze[?fetch=1]    (re)analyze, optionally fetching first
+    GET  /metrics                              Prometheus text (with URA_METRICS=1)
+
+Analyzed rows are held in memory behind a product-key index and reloaded
+only when the aggregate table changes. Every 200 response carries an
+ETag; a matching If-None-Match gets an empty 304.
+"""
+import json, hashlib, threading, time, argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs, unquote
+
+from src import aggregates, metrics
+from src.analyze_reviews import analyze_product, aggregates_path
+from src.fetch import get_trending_products, fetch_product_info, fetch_and_save_reviews
+from src.storage import get_store, product_key
+
+REVIEW_COLUMNS = ["product", "review", "sentiment", "pros", "cons"]
+CHECK_INTERVAL = 2.0   # seconds between data-version checks
+MAX_PAGE_SIZE = 200
+
+
+class ReviewIndex:
+    """Analyzed rows in memory, grouped by product key; reloads when the data changes."""
+    def __init__(self, check_interval: float = CHECK_INTERVAL):
+        self.check_interval = check_interval
+        self.lock = threading.Lock()
+        self.version = None
+        self.checked = 0.0
+        self.rows = {}        # product key -> list of row dicts, in file order
+        self.summaries = {}   # product key -> aggregate row
+
+    def _current(self):
+        """Reloads if the aggregate table moved on since the last load."""
+        now = time.monotonic()
+        if now - self.checked < self.check_interval:
+            return
+        with self.lock:
+            if now - self.checked < self.check_interval:
+                return
+            version = aggregates.version(aggregates_path())
+            if version != self.version:
+                self._load()
+                self.version = version
+            self.checked = time.monotonic()
+
+    def _load(self):
+        df = get_store().read_analyzed(columns=REVIEW_COLUMNS)
+        rows = {}
+        for record, key in zip(df.to_dict("records"), df["product"].map(product_key)):
+            rows.setdefault(key, []).append(record)
+        self.rows, self.summaries = rows, {}
+
+    def invalidate(self):
+        self.checked = 0.0
+
+    def summary(self, product: str):
+        self._current()
+        key = product_key(product)
+        if key not in self.summaries:
+            self.summaries[key] = aggregates.get(product, aggregates_path())
+        return self.summaries[key]
+
+    def reviews(self, product: str, page: int, size: int, sentiment: str | None = None):
+        self._current()
+        rows = self.rows.get(product_key(product), [])
+        if sentiment:
+            rows = [r for r in rows if r["sentiment"] == sentiment]
+        start = (page - 1) * size
+        return {"product": product, "page": page, "size": size, "total": len(rows),
+                "reviews": [{k: r[k] for k in ("review", "sentiment", "pros", "cons")}
+                            for r in rows[start:start + size]]}
+
+
+def _int(query, name, default, lo=1, hi=None):
+    try:
+        val = int(query.get(name, [default])[0])
+    except ValueError:
+        raise _HTTPError(400, f"{name} must be an integer")
+    return max(lo, min(val, hi) if hi else val)
+
+
+class _HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive for API clients
+    disable_nagle_algorithm = True  # headers and body go out as separate writes
+    index: ReviewIndex = None
+    analyze_lock = threading.Lock()
+    quiet = False
+
+    # ---------- Routes ----------
+    def _route(self, method):
+        parts = urlsplit(self.path)
+        query = parse_qs(parts.query)
+        segs = [unquote(s) for s in parts.path.strip("/").split("/") if s]
+
+        if method == "GET" and segs == ["health"]:
+            return {"status": "ok"}
+        if method == "GET" and segs == ["trending"]:
+            return {"products": get_trending_products(limit=_int(query, "limit", 8, hi=50))}
+        if len(segs) < 2 or segs[0] != "products":
+            raise _HTTPError(404, "not found")
+
+        product, rest = segs[1], segs[2:]
+        if method == "GET" and not rest:
+            summary = self.index.summary(product)
+            if summary is None:
+                raise _HTTPError(404, f"no analysis for {product!r}")
+            return summary
+        if method == "GET" and rest == ["reviews"]:
+            return self.index.reviews(product, _int(query, "page", 1),
+                                      _int(query, "size", 20, hi=MAX_PAGE_SIZE),
+                                      query.get("sentiment", [None])[0])
+        if method == "GET" and rest == ["info"]:
+            info = fetch_product_info(product, max_images=_int(query, "images", 3, hi=10))
+            return {"name": info["name"], "buy_url": info["buy_url"], "images": info["images"]}
+        if method == "POST" and rest == ["analyze"]:
+            with self.analyze_lock:
+                if query.get("fetch", ["0"])[0] not in ("0", ""):
+                    fetch_and_save_reviews(product)
+                df = analyze_product(product)
+            self.index.invalidate()
+            return {"product": product, "analyzed": len(df), "summary": self.index.summary(product)}
+        if rest in ([], ["reviews"], ["info"], ["analyze"]):
+            raise _HTTPError(405, "method not allowed")
+        raise _HTTPError(404, "not found")
+
+    # ---------- Plumbing ----------
+    def _respond(self, method):
+        try:
+            status, payload = 200, self._route(method)
+        except _HTTPError as e:
+            status, payload = e.status, {"error": str(e)}
+        except Exception as e:
+            status, payload = 500, {"error": repr(e)}
+
+        body = json.dumps(payload, default=str).encode("utf-8")
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        if status == 200 and method == "GET" and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if status == 200:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if urlsplit(self.path).path == "/metrics":
+            body = metrics.prometheus_text().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        self._respond("GET")
+
+    def do_POST(self):
+        # Drain any body so the kept-alive connection stays in sync
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        self._respond("POST")
+
+    def log_message(self, fmt, *args):
+        if not self.quiet:
+            super().log_message(fmt, *args)
+
+
+def make_server(host: str = "127.0.0.1", port: int = 8765, quiet: bool = False):
+    """A ready-to-serve ThreadingHTTPServer (port 0 picks a free port)."""
+    handler = type("URAHandler", (Handler,), {"index": ReviewIndex(), "quiet": quiet})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    ap = argparse.ArgumentParser(description="URA HTTP/JSON API")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--quiet", action="store_true", help="no per-request log lines")
+    args = ap.parse_args()
+    server = make_server(args.host, args.port, args.quiet)
+    print(f"🌐 URA API on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
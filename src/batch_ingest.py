@@ -0,0 +1,176 @@
+# src/batch_ingest.py
+"""
+Headless nightly ingestion for many products.
+
+    python -m src.batch_ingest products.txt --workers 8 --rate 2 --per-host 4
+
+products.txt holds one product per line (or a CSV with a Product column).
+Searches run concurrently under a global rate limit and a per-host cap,
+failed searches are retried with exponential backoff, and every result is
+written by one writer thread so appends never interleave. Finished
+products are checkpointed; rerunning the same command resumes.
+"""
+import os, csv, json, time, random, threading, argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlsplit
+
+from src.fetch import search_product_reviews, save_reviews, DATA_DIR
+
+CHECKPOINT_PATH = os.path.join(DATA_DIR, "batch_checkpoint.json")
+SEARCH_HOST = "duckduckgo.com"
+
+
+class RateLimiter:
+    """Token bucket shared by all workers: at most `rate` calls/second, bursts of `burst`."""
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        if self.rate <= 0:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class HostLimiter:
+    """Caps concurrent requests per host."""
+    def __init__(self, per_host: int):
+        self.per_host = per_host
+        self.sems = {}
+        self.lock = threading.Lock()
+
+    def slot(self, url_or_host: str):
+        host = urlsplit(url_or_host).hostname or url_or_host
+        with self.lock:
+            if host not in self.sems:
+                self.sems[host] = threading.BoundedSemaphore(self.per_host)
+            return self.sems[host]
+
+
+def read_products(path: str):
+    """Product names from a plain list or a CSV with a Product column, deduped in order."""
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        first = f.readline()
+        f.seek(0)
+        if first.strip().lower().split(",")[0].strip('"') == "product":
+            names = [row.get("Product") or row.get("product") or "" for row in csv.DictReader(f)]
+        else:
+            names = [line for line in f]
+    names = [n.strip() for n in names if n.strip() and not n.lstrip().startswith("#")]
+    return list(dict.fromkeys(names))
+
+
+def _load_checkpoint(path: str):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"done": {}}
+
+def _save_checkpoint(path: str, state: dict):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+
+
+def _search_with_retry(product, max_results, limiter, hosts, retries, backoff):
+    for attempt in range(retries + 1):
+        limiter.acquire()
+        try:
+            with hosts.slot(SEARCH_HOST):
+                return search_product_reviews(product, max_results=max_results)
+        except Exception:
+            if attempt == retries:
+                raise
+            # Exponential backoff with jitter so workers don't retry in lockstep
+            time.sleep(backoff * (2 ** attempt) * (0.5 + random.random()))
+
+
+def run_batch(products, workers: int = 8, rate: float = 2.0, per_host: int = 4,
+              retries: int = 3, backoff: float = 1.0, max_results: int = 50,
+              checkpoint: str | None = CHECKPOINT_PATH, log=print):
+    """
+    Fetches and saves reviews for `products`. Returns {"saved", "skipped",
+    "failed", "resumed"}. Products already in the checkpoint are skipped.
+    """
+    state = _load_checkpoint(checkpoint) if checkpoint else {"done": {}}
+    todo = [p for p in products if p not in state["done"]]
+    summary = {"saved": 0, "skipped": 0, "failed": [], "resumed": len(products) - len(todo)}
+
+    limiter = RateLimiter(rate, burst=workers)
+    hosts = HostLimiter(per_host)
+    # One writer thread: save_reviews calls (and checkpoint writes) never overlap
+    writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ura-writer")
+
+    def write(product, results):
+        saved, skipped = save_reviews(product, results)
+        summary["saved"] += saved
+        summary["skipped"] += skipped
+        state["done"][product] = {"saved": saved, "found": len(results), "at": time.time()}
+        if checkpoint:
+            _save_checkpoint(checkpoint, state)
+        log(f"✅ {product}: {saved} saved, {skipped} skipped")
+
+    writes = []
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ura-batch") as pool:
+        futures = {pool.submit(_search_with_retry, p, max_results, limiter, hosts, retries, backoff): p
+                   for p in todo}
+        for f in as_completed(futures):
+            product = futures[f]
+            try:
+                results = f.result()
+            except Exception as e:
+                summary["failed"].append(product)
+                log(f"❌ {product}: {e}")
+                continue
+            writes.append(writer.submit(write, product, results))
+
+    for w in writes:
+        try:
+            w.result()
+        except Exception as e:
+            log(f"❌ write failed: {e}")
+    writer.shutdown()
+    return summary
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Fetch and save reviews for many products")
+    ap.add_argument("products", help="file with one product per line, or a CSV with a Product column")
+    ap.add_argument("--workers", type=int, default=8)
+    ap.add_argument("--rate", type=float, default=2.0, help="max searches per second (0 = unlimited)")
+    ap.add_argument("--per-host", type=int, default=4, help="max concurrent requests per host")
+    ap.add_argument("--retries", type=int, default=3)
+    ap.add_argument("--backoff", type=float, default=1.0, help="base backoff in seconds")
+    ap.add_argument("--max-results", type=int, default=50)
+    ap.add_argument("--checkpoint", default=CHECKPOINT_PATH)
+    ap.add_argument("--fresh", action="store_true", help="ignore and overwrite an existing checkpoint")
+    args = ap.parse_args()
+
+    if args.fresh and os.path.exists(args.checkpoint):
+        os.remove(args.checkpoint)
+
+    products = read_products(args.products)
+    summary = run_batch(products, workers=args.workers, rate=args.rate, per_host=args.per_host,
+                        retries=args.retries, backoff=args.backoff,
+                        max_results=args.max_results, checkpoint=args.checkpoint)
+    print(f"Done: {summary['saved']} saved, {summary['skipped']} skipped, "
+          f"{summary['resumed']} resumed from checkpoint, {len(summary['failed'])} failed")
+    if summary["failed"]:
+        print("Failed: " + ", ".join(summary["failed"]))
+
+if __name__ == "__main__":
+    main()
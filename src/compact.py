@@ -0,0 +1,177 @@
+# src/compact.py
+"""
+Compact in-memory form of the analyzed table, for holding large corpora.
+
+    column        DataFrame layout            CompactReviews
+    product       str object per row          int32 code -> products
+    site          str object per row          int32 code -> sites (when present)
+    sentiment     str object per row          int8  (SENTIMENTS index, -1 unknown)
+    pros / cons   list of str per row         uint16 bitmask over _PROS / _CONS
+    improvements  list of str per row         uint8 bitmask over _IMPROVEMENTS
+    verdict       str object per row          int32 code -> verdicts
+    review        str object per row          one UTF-8 buffer + int64 offsets
+
+    reviews = CompactReviews.from_store()              # streams the analyzed store
+    rows = reviews.rows_for("Pixel 9")                 # product_key match
+    df = reviews.to_frame(rows)                        # back to the usual layout
+
+Keywords outside the fixed vocabularies are dropped when encoding.
+Memory comparison: python -m benchmarks.bench_memory
+"""
+import numpy as np
+import pandas as pd
+
+from src.analyze_reviews import _PROS, _CONS, _IMPROVEMENTS
+from src.keywords import mask_dtype, to_masks, from_masks, bit_counts
+from src.storage import get_store, product_key
+
+SENTIMENTS = ["Negative", "Neutral", "Positive"]
+_SENTIMENT_CODES = {s: i for i, s in enumerate(SENTIMENTS)}
+COLUMNS = ["product", "review", "sentiment", "pros", "cons", "improvements", "verdict"]
+
+
+# ---------- Encoding helpers ----------
+class _Dictionary:
+    """Append-only string dictionary: value <-> dense int code."""
+    def __init__(self):
+        self.values = []
+        self._codes = {}
+
+    def encode(self, series: pd.Series):
+        codes, uniques = pd.factorize(series.astype(str), sort=False)
+        lookup = np.empty(len(uniques), dtype=np.int32)
+        for i, value in enumerate(uniques):
+            code = self._codes.get(value)
+            if code is None:
+                code = self._codes[value] = len(self.values)
+                self.values.append(value)
+            lookup[i] = code
+        return lookup[codes] if len(codes) else np.empty(0, dtype=np.int32)
+
+def _encode_text(series: pd.Series):
+    parts = [s.encode("utf-8") for s in series.astype(str)]
+    lengths = np.fromiter(map(len, parts), dtype=np.int64, count=len(parts))
+    return b"".join(parts), lengths
+
+
+# ---------- Store ----------
+class CompactReviews:
+    """Analyzed rows as dictionary codes, int8 sentiment and keyword bitmasks."""
+    def __init__(self):
+        self._products, self._sites, self._verdicts = _Dictionary(), _Dictionary(), _Dictionary()
+        self.product = np.empty(0, dtype=np.int32)
+        self.site = None
+        self.sentiment = np.empty(0, dtype=np.int8)
+        self.pros = np.empty(0, dtype=mask_dtype(_PROS))
+        self.cons = np.empty(0, dtype=mask_dtype(_CONS))
+        self.improvements = np.empty(0, dtype=mask_dtype(_IMPROVEMENTS))
+        self.verdict = np.empty(0, dtype=np.int32)
+        self.text = None                                   # uint8 UTF-8 buffer
+        self.offsets = np.zeros(1, dtype=np.int64)         # review i is text[offsets[i]:offsets[i+1]]
+
+    # ---- Building ----
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, include_text: bool = True):
+        return cls()._extend([df], include_text)
+
+    @classmethod
+    def from_store(cls, store=None, product: str | None = None, include_text: bool = True,
+                   chunksize: int = 200_000):
+        """
+        Loads the analyzed table of `store` (default: the configured one)
+        chunk by chunk, so the wide DataFrame never exists in full.
+        """
+        store = store or get_store()
+        columns = COLUMNS if include_text else [c for c in COLUMNS if c != "review"]
+        if product:
+            chunks = [store.read_analyzed(product, columns=columns)]
+        else:
+            chunks = store.iter_analyzed(columns, chunksize)
+        return cls()._extend(chunks, include_text)
+
+    def _extend(self, chunks, include_text: bool):
+        parts = {k: [getattr(self, k)] for k in
+                 ("product", "sentiment", "pros", "cons", "improvements", "verdict")}
+        sites, texts, lengths = [], [], []
+        for df in chunks:
+            if df is None or df.empty:
+                continue
+            df = df.rename(columns=str.lower)
+            parts["product"].append(self._products.encode(df["product"]))
+            parts["sentiment"].append(
+                df["sentiment"].map(_SENTIMENT_CODES).fillna(-1).to_numpy(dtype=np.int8))
+            parts["pros"].append(to_masks(df["pros"], _PROS))
+            parts["cons"].append(to_masks(df["cons"], _CONS))
+            parts["improvements"].append(to_masks(df["improvements"], _IMPROVEMENTS))
+            parts["verdict"].append(self._verdicts.encode(df["verdict"]))
+            if "site" in df.columns:
+                sites.append(self._sites.encode(df["site"]))
+            if include_text:
+                buf, n = _encode_text(df["review"])
+                texts.append(buf)
+                lengths.append(n)
+        for k, arrays in parts.items():
+            setattr(self, k, np.concatenate(arrays))
+        if sites:
+            self.site = np.concatenate(([self.site] if self.site is not None else []) + sites)
+        if include_text and texts:
+            old = [] if self.text is None else [self.text.tobytes()]
+            self.text = np.frombuffer(b"".join(old + texts), dtype=np.uint8)
+            self.offsets = np.concatenate([self.offsets,
+                                           self.offsets[-1] + np.cumsum(np.concatenate(lengths))])
+        return self
+
+    # ---- Access ----
+    def __len__(self):
+        return len(self.product)
+
+    @property
+    def products(self):
+        return self._products.values
+
+    def rows_for(self, product: str) -> np.ndarray:
+        """Row indices whose product_key matches `product`."""
+        key = product_key(product)
+        codes = [i for i, p in enumerate(self._products.values) if product_key(p) == key]
+        return np.flatnonzero(np.isin(self.product, codes))
+
+    def review(self, i: int) -> str:
+        if self.text is None:
+            raise ValueError("loaded with include_text=False")
+        return self.text[self.offsets[i]:self.offsets[i + 1]].tobytes().decode("utf-8")
+
+    def to_frame(self, rows=None) -> pd.DataFrame:
+        """The usual analyzed DataFrame (lists for keywords) for `rows` (default all)."""
+        rows = np.arange(len(self)) if rows is None else np.asarray(rows)
+        names = np.array(self._products.values + [""], dtype=object)
+        verdicts = np.array(self._verdicts.values + [""], dtype=object)
+        sentiments = np.array(SENTIMENTS + [""], dtype=object)   # -1 -> ""
+        out = {"product": names[self.product[rows]]}
+        if self.text is not None:
+            out["review"] = [self.review(i) for i in rows]
+        out["sentiment"] = sentiments[self.sentiment[rows]]
+        out["pros"] = from_masks(self.pros[rows], _PROS)
+        out["cons"] = from_masks(self.cons[rows], _CONS)
+        out["improvements"] = from_masks(self.improvements[rows], _IMPROVEMENTS)
+        out["verdict"] = verdicts[self.verdict[rows]]
+        if self.site is not None:
+            out["site"] = np.array(self._sites.values + [""], dtype=object)[self.site[rows]]
+        return pd.DataFrame(out)
+
+    def keyword_counts(self, rows=None) -> dict:
+        """{"pros", "cons", "improvements": {keyword: count}} over `rows` (default all)."""
+        rows = slice(None) if rows is None else np.asarray(rows)
+        return {"pros": bit_counts(self.pros[rows], _PROS),
+                "cons": bit_counts(self.cons[rows], _CONS),
+                "improvements": bit_counts(self.improvements[rows], _IMPROVEMENTS)}
+
+    def memory_bytes(self) -> int:
+        """Bytes held by the arrays and dictionaries (strings counted at UTF-8 size + overhead)."""
+        arrays = [self.product, self.sentiment, self.pros, self.cons, self.improvements,
+                  self.verdict, self.offsets]
+        total = sum(a.nbytes for a in arrays)
+        total += self.site.nbytes if self.site is not None else 0
+        total += self.text.nbytes if self.text is not None else 0
+        for d in (self._products, self._sites, self._verdicts):
+            total += sum(len(v.encode("utf-8")) + 49 for v in d.values) * 2   # list + dict refs
+        return total
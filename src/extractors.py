@@ -0,0 +1,197 @@
+# src/extractors.py
+"""
+Per-site review extractors for scrapper.py, keyed by domain.
+
+Each site registers one or more Selectors (tag + attribute/class/id, and
+optionally an enclosing container). Three interchangeable backends run
+the same selectors:
+
+    stream   incremental html.parser feed; no DOM at all (no deps)
+    lxml     compiled XPath over lxml.html (default when lxml is installed)
+    strainer BeautifulSoup limited by a SoupStrainer to the matching nodes
+
+Domains with no registered extractor are skipped by the scraper, so their
+pages are never downloaded or parsed for nothing.
+"""
+from dataclasses import dataclass
+from functools import lru_cache
+from html.parser import HTMLParser
+from importlib.util import find_spec
+from urllib.parse import urlsplit
+
+# Checked without importing: lxml is only loaded once an lxml Extractor is built
+DEFAULT_BACKEND = "lxml" if find_spec("lxml") else "stream"
+
+
+@dataclass(frozen=True)
+class Selector:
+    tag: str
+    attr: tuple | None = None          # (name, value) exact match
+    class_: str | None = None          # one class token
+    within: "Selector | None" = None   # enclosing container, any depth
+
+    def matches(self, tag, attrs):
+        if tag != self.tag:
+            return False
+        attrs = dict(attrs)
+        if self.attr and attrs.get(self.attr[0]) != self.attr[1]:
+            return False
+        if self.class_ and self.class_ not in (attrs.get("class") or "").split():
+            return False
+        return True
+
+    def xpath(self):
+        conds = []
+        if self.attr:
+            conds.append(f'@{self.attr[0]}="{self.attr[1]}"')
+        if self.class_:
+            conds.append(f'contains(concat(" ", normalize-space(@class), " "), " {self.class_} ")')
+        step = self.tag + "".join(f"[{c}]" for c in conds)
+        return (self.within.xpath() if self.within else "") + "//" + step
+
+
+def _clean(parts):
+    """Same text as BeautifulSoup's get_text(strip=True)."""
+    return "".join(p.strip() for p in parts)
+
+
+# ---------- stream backend ----------
+class StreamParser(HTMLParser):
+    """Feed it chunks as they download; pop_reviews() returns finished matches."""
+    def __init__(self, selectors):
+        super().__init__(convert_charrefs=True)
+        self.selectors = selectors
+        self.open = []          # [selector, depth, parts] for matches in progress
+        self.containers = {}    # container selector -> open depth
+        self.reviews = []
+
+    def _inside(self, sel):
+        return sel.within is None or self.containers.get(sel.within, 0) > 0
+
+    def handle_starttag(self, tag, attrs):
+        for cont, depth in list(self.containers.items()):
+            if depth and tag == cont.tag:
+                self.containers[cont] = depth + 1
+        for m in self.open:
+            if tag == m[0].tag:
+                m[1] += 1
+        for sel in self.selectors:
+            if sel.within and sel.within.matches(tag, attrs) and not self.containers.get(sel.within):
+                self.containers[sel.within] = 1
+            if self._inside(sel) and sel.matches(tag, attrs) and not any(m[0] is sel for m in self.open):
+                self.open.append([sel, 1, []])
+
+    def handle_endtag(self, tag):
+        for m in list(self.open):
+            if tag == m[0].tag:
+                m[1] -= 1
+                if not m[1]:
+                    self.open.remove(m)
+                    text = _clean(m[2])
+                    if text:
+                        self.reviews.append(text)
+        for cont, depth in list(self.containers.items()):
+            if depth and tag == cont.tag:
+                self.containers[cont] = depth - 1
+
+    def handle_data(self, data):
+        for m in self.open:
+            m[2].append(data)
+
+    def pop_reviews(self):
+        out, self.reviews = self.reviews, []
+        return out
+
+
+# ---------- extractor ----------
+class Extractor:
+    """Runs a site's selectors with the chosen backend."""
+    def __init__(self, selectors, backend=DEFAULT_BACKEND):
+        self.selectors = tuple(selectors)
+        self.backend = backend
+        if backend == "lxml":
+            from lxml import etree, html   # optional dependency
+            self._parse = html.fromstring
+            self._xpath = etree.XPath(" | ".join(s.xpath() for s in self.selectors))
+        elif backend not in ("stream", "strainer"):
+            raise ValueError(f"Unknown extractor backend {backend!r}")
+
+    @property
+    def streaming(self):
+        return self.backend == "stream"
+
+    def parser(self):
+        """Incremental parser (stream backend only)."""
+        return StreamParser(self.selectors)
+
+    def extract(self, html: str):
+        """Review texts from a whole page, in document order."""
+        if self.backend == "stream":
+            p = self.parser()
+            p.feed(html)
+            p.close()
+            return p.pop_reviews()
+        if self.backend == "lxml":
+            root = self._parse(html)
+            return [t for t in (_clean(n.itertext()) for n in self._xpath(root)) if t]
+        return self._extract_strainer(html)
+
+    def _extract_strainer(self, html):
+        from bs4 import BeautifulSoup, SoupStrainer
+        out = []
+        for sel in self.selectors:
+            # Only the outermost matching nodes are materialized
+            only = SoupStrainer(*_bs4_args(sel.within or sel))
+            soup = BeautifulSoup(html, "html.parser", parse_only=only)
+            out += [t for t in (n.get_text(strip=True) for n in soup.find_all(*_bs4_args(sel))) if t]
+        return out
+
+
+def _bs4_args(sel):
+    attrs = {}
+    if sel.attr:
+        attrs[sel.attr[0]] = sel.attr[1]
+    if sel.class_:
+        # bs4 passes the raw "a b" string while parsing and single tokens in find_all
+        attrs["class"] = lambda c, want=sel.class_: c is not None and want in c.split()
+    return sel.tag, attrs
+
+
+# ---------- registry ----------
+_REGISTRY = {}
+
+def register(domain: str, *selectors: Selector):
+    """Registers (or replaces) the selectors used for `domain` and its subdomains."""
+    _REGISTRY[domain.lower()] = tuple(selectors)
+
+def registered_domains():
+    return sorted(_REGISTRY)
+
+@lru_cache(maxsize=None)
+def _extractor(selectors: tuple, backend: str):
+    # Keyed by the selectors themselves, so register() replacing a domain's
+    # selectors never serves a stale one. Extractors hold no per-page state
+    # (lxml's XPath serializes concurrent calls), so threads share them.
+    return Extractor(selectors, backend)
+
+def get_extractor(url: str, backend: str = DEFAULT_BACKEND):
+    """
+    Extractor for the registered domain of `url`, or None if the site is
+    unsupported. One instance is built per (selectors, backend) and
+    reused, so the lxml XPath is compiled once, not per page.
+    """
+    host = (urlsplit(url).hostname or url).lower()
+    parts = host.split(".")
+    for i in range(len(parts) - 1):
+        sels = _REGISTRY.get(".".join(parts[i:]))
+        if sels:
+            return _extractor(sels, backend)
+    return None
+
+
+register("amazon.in", Selector("span", attr=("data-hook", "review-body")))
+register("amazon.com", Selector("span", attr=("data-hook", "review-body")))
+register("flipkart.com", Selector("div", class_="ZmyHeo"))
+register("gsmarena.com", Selector("p", class_="uopin"))
+register("techradar.com", Selector("p", within=Selector("div", attr=("id", "article-body"))))
+register("tomsguide.com", Selector("p", within=Selector("div", attr=("id", "article-body"))))
@@ -1,10 +1,14 @@
 # src/fetch.py
-from ddgs import DDGS
-import csv, os, re, random, json
+import os, re, random, json, time, sqlite3, threading, argparse
 from collections import Counter
+from contextlib import closing
+from concurrent.futures import ThreadPoolExecutor, wait
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
 import requests
-from io import BytesIO
-from PIL import Image, ImageTk   # ✅ Needed for product images
+import pandas as pd
+from PIL import ImageTk   # ✅ Needed for product images
+from src.storage import CsvStore, COLLECTED_COLUMNS, get_store, record_txn, txn_committed
+from src import image_cache, metrics, search
 
 TRUSTED_SITES = [
     "flipkart.com", "gsmarena.com", "techradar.com", "tomsguide.com",
@@ -15,41 +19,164 @@ TRUSTED_SITES = [
 DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
 os.makedirs(DATA_DIR, exist_ok=True)
 COLLECTED_PATH = os.path.join(DATA_DIR, "collected_reviews.csv")
+COLLECTED_INDEX_PATH = os.path.join(DATA_DIR, "collected_index.sqlite")
+TRENDING_CACHE_PATH = os.path.join(DATA_DIR, "trending_cache.json")
 
-def _ensure_collected_file():
-    if not os.path.exists(COLLECTED_PATH):
-        with open(COLLECTED_PATH, "w", encoding="utf-8", newline="") as f:
-            csv.writer(f).writerow(["Product", "Site", "URL", "Review"])
+# Shared pool for network fan-out (searches, image downloads)
+_fetch_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="ura-fetch")
 
+def _store():
+    """The configured backend; the CSV one follows COLLECTED_PATH."""
+    store = get_store()
+    if isinstance(store, CsvStore):
+        store = CsvStore(collected_path=COLLECTED_PATH)
+    return store
+
+@metrics.timed("fetch.search_product_reviews")
 def search_product_reviews(product_name: str, max_results: int = 50):
     query = f"{product_name} reviews"
     results = []
-    with DDGS() as ddgs:
-        for r in ddgs.text(query, max_results=max_results):
-            url = r.get("href") or r.get("url")
-            snippet = (r.get("body") or "").replace("\n", " ").strip()
-            if url and any(site in url for site in TRUSTED_SITES):
-                results.append({"url": url, "snippet": snippet})
+    for r in search.text(query, max_results=max_results):
+        url = r.get("href") or r.get("url")
+        snippet = (r.get("body") or "").replace("\n", " ").strip()
+        if url and any(site in url for site in TRUSTED_SITES):
+            results.append({"url": url, "snippet": snippet})
     return results
 
+# ---------- Collected index ----------
+_TRACKING_PARAMS = {"gclid", "fbclid", "dclid", "msclkid", "igshid", "mc_cid", "mc_eid",
+                    "ref", "ref_", "ref_src", "_encoding", "psc", "spm"}
+
+def normalize_url(url: str) -> str:
+    """
+    Dedup key for a review URL: lowercased scheme/host, default port,
+    fragment and tracking params (utm_*, gclid, ref, ...) removed.
+    A URL urlsplit cannot parse (bad port, broken IPv6 host) is keyed
+    by its stripped, lowercased text.
+    """
+    raw = str(url).strip()
+    try:
+        parts = urlsplit(raw)
+        port = parts.port
+    except ValueError:
+        return raw.lower()
+    host = (parts.hostname or "").lower()
+    if port and not (parts.scheme, port) in {("http", 80), ("https", 443)}:
+        host = f"{host}:{port}"
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+             if not k.lower().startswith("utm_") and k.lower() not in _TRACKING_PARAMS]
+    return urlunsplit((parts.scheme.lower(), host, parts.path or "/", urlencode(query), ""))
+
+def _collected_index_path(store):
+    if store.name == "csv":
+        return COLLECTED_INDEX_PATH
+    return COLLECTED_INDEX_PATH.replace(".sqlite", f".{store.name}.sqlite")
+
+def _connect_collected_index(store):
+    conn = sqlite3.connect(_collected_index_path(store), timeout=30)
+    conn.execute("CREATE TABLE IF NOT EXISTS product_counts (product TEXT PRIMARY KEY, n INTEGER NOT NULL)")
+    conn.execute("CREATE TABLE IF NOT EXISTS urls (key TEXT PRIMARY KEY) WITHOUT ROWID")
+    conn.execute("CREATE TABLE IF NOT EXISTS meta (k TEXT PRIMARY KEY, v TEXT)")
+    return conn
+
+def _seeded(conn):
+    return conn.execute("SELECT 1 FROM meta WHERE k = 'seeded'").fetchone() is not None
+
+def _seed_collected_index(conn, store):
+    """
+    Fills both index tables with one scan of the collected store. Call it
+    under the store's write lock. The tables and the 'seeded' marker are
+    committed together, so a failed scan leaves the index unseeded (the
+    next open retries) instead of empty and trusted.
+    """
+    try:
+        conn.execute("DELETE FROM product_counts")
+        conn.execute("DELETE FROM urls")
+        df = store.read_collected(columns=["Product", "URL"])
+        products = df["Product"].dropna().astype(str)
+        conn.executemany("INSERT OR REPLACE INTO product_counts VALUES (?, ?)",
+                         Counter(p for p in products if p).items())
+        conn.executemany("INSERT OR IGNORE INTO urls VALUES (?)",
+                         ((normalize_url(u),) for u in df["URL"].dropna().astype(str)))
+        conn.execute("INSERT OR REPLACE INTO meta VALUES ('seeded', '1')")
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+
+def _open_collected_index(store):
+    """
+    Opens the index over the collected store: per-product row counts and
+    the set of normalized URLs. Seeded with one scan the first time; after
+    that save_reviews keeps it in sync with each append.
+    """
+    conn = _connect_collected_index(store)
+    try:
+        if not _seeded(conn):
+            # Under the write lock, so no batch lands between the scan and the marker
+            with store.writer("collected", committed=lambda txn: txn_committed(conn, txn)):
+                if not _seeded(conn):
+                    _seed_collected_index(conn, store)
+    except BaseException:
+        conn.close()
+        raise
+    return conn
+
+def rebuild_collected_index():
+    """Regenerates the collected index from the store; returns (products, urls)."""
+    store = _store()
+    path = _collected_index_path(store)
+    if os.path.exists(path):
+        os.remove(path)
+    with closing(_open_collected_index(store)) as conn:
+        return (conn.execute("SELECT COUNT(*) FROM product_counts").fetchone()[0],
+                conn.execute("SELECT COUNT(*) FROM urls").fetchone()[0])
+
+def _bump_product_count(conn, product_name: str, n: int):
+    if n:
+        conn.execute("INSERT INTO product_counts VALUES (?, ?) "
+                     "ON CONFLICT(product) DO UPDATE SET n = n + excluded.n", (product_name, n))
+
+def _top_collected_products(limit: int):
+    with closing(_open_collected_index(_store())) as conn:
+        rows = conn.execute("SELECT product FROM product_counts ORDER BY n DESC, rowid LIMIT ?",
+                            (limit,)).fetchall()
+    return [p for (p,) in rows]
+
+@metrics.timed("fetch.save_reviews")
 def save_reviews(product_name: str, results: list[dict]):
-    _ensure_collected_file()
-    existing = set()
-    with open(COLLECTED_PATH, "r", encoding="utf-8") as f:
-        for row in csv.DictReader(f):
-            existing.add(row["URL"])
-
-    saved, skipped = 0, 0
-    with open(COLLECTED_PATH, "a", encoding="utf-8", newline="") as f:
-        w = csv.writer(f)
+    """
+    Appends results whose normalized URL is not in the collected index.
+    Each check is one indexed lookup, so cost tracks the batch, not the corpus.
+    The check, the append and the index update happen under the store's
+    write lock, so concurrent savers (threads or processes) never both
+    append the same URL; the index commit is the batch's commit record.
+    """
+    store = _store()
+    with closing(_connect_collected_index(store)) as conn, \
+            store.writer("collected", committed=lambda txn: txn_committed(conn, txn)) as writer:
+        if not _seeded(conn):
+            _seed_collected_index(conn, store)
+        rows, keys, skipped = [], set(), 0
         for r in results:
-            if r["url"] in existing:
+            key = normalize_url(r["url"])
+            if key in keys or conn.execute("SELECT 1 FROM urls WHERE key = ?", (key,)).fetchone():
                 skipped += 1
                 continue
+            keys.add(key)
             site = next((s for s in TRUSTED_SITES if s in r["url"]), "Unknown")
-            w.writerow([product_name, site, r["url"], r["snippet"]])
-            saved += 1
-    return saved, skipped
+            rows.append([product_name, site, r["url"], r["snippet"]])
+
+        with metrics.span("fetch.append_collected"):
+            txn = writer.append(pd.DataFrame(rows, columns=COLLECTED_COLUMNS))
+        conn.executemany("INSERT OR IGNORE INTO urls VALUES (?)", ((k,) for k in keys))
+        _bump_product_count(conn, product_name, len(rows))
+        if txn:
+            record_txn(conn, txn)
+        conn.commit()
+    metrics.count("fetch.reviews_saved", len(rows))
+    metrics.count("fetch.reviews_skipped", skipped)
+    return len(rows), skipped
 
 def fetch_and_save_reviews(product_name: str, max_results: int = 50):
     results = search_product_reviews(product_name, max_results=max_results)
@@ -74,48 +201,104 @@ def _extract_models_from_title(title: str):
             out.append(t.strip())
     return out
 
-def get_trending_products(limit: int = 8):
+TRENDING_QUERIES = [
+    "best smartphones 2025",
+    "trending phones 2025",
+    "top phones 2025 gsmarena",
+    "best phones review roundup"
+]
+TRENDING_TTL = 6 * 3600  # seconds; older lists are served while a refresh runs
+TRENDING_TIMEOUT = 15    # seconds to wait for the searches on a cold cache
+
+_trending_lock = threading.Lock()
+_trending_refreshing = False
+
+def _search_titles(query: str):
+    return [r.get("title") or "" for r in search.text(query, max_results=20)]
+
+def _discover_trending():
+    """Runs TRENDING_QUERIES concurrently and returns the merged, deduped model list."""
+    futures = [_fetch_pool.submit(_search_titles, q) for q in TRENDING_QUERIES]
+    wait(futures, timeout=TRENDING_TIMEOUT)
+
+    candidates = []
+    # Merge in query order so the ranking matches the sequential version
+    for f in futures:
+        if f.done() and f.exception() is None:
+            for t in f.result():
+                if t:
+                    candidates += _extract_models_from_title(t)
+
+    seen, models = set(), []
+    for m in candidates:
+        k = m.lower()
+        if k not in seen:
+            seen.add(k)
+            models.append(m)
+    return models
+
+def _load_trending_cache():
     try:
-        titles = []
-        queries = [
-            "best smartphones 2025",
-            "trending phones 2025",
-            "top phones 2025 gsmarena",
-            "best phones review roundup"
-        ]
-        with DDGS() as ddgs:
-            for q in queries:
-                for r in ddgs.text(q, max_results=20):
-                    t = r.get("title") or ""
-                    if t:
-                        titles.append(t)
-
-        candidates = []
-        for t in titles:
-            candidates += _extract_models_from_title(t)
-
-        seen, models = set(), []
-        for m in candidates:
-            k = m.lower()
-            if k not in seen:
-                seen.add(k)
-                models.append(m)
-
-        if models:
-            return models[:limit]
+        with open(TRENDING_CACHE_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _refresh_trending():
+    """Re-runs discovery and rewrites the cache; keeps the old list if search fails."""
+    models = _discover_trending()
+    if models:
+        tmp = TRENDING_CACHE_PATH + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"fetched_at": time.time(), "models": models}, f)
+        os.replace(tmp, TRENDING_CACHE_PATH)
+    return models
 
+def _refresh_trending_in_background():
+    """Starts at most one background refresh at a time."""
+    global _trending_refreshing
+    with _trending_lock:
+        if _trending_refreshing:
+            return
+        _trending_refreshing = True
+
+    def run():
+        global _trending_refreshing
+        try:
+            _refresh_trending()
+        except Exception:
+            pass
+        finally:
+            with _trending_lock:
+                _trending_refreshing = False
+
+    _fetch_pool.submit(run)
+
+def get_trending_products(limit: int = 8):
+    """
+    Trending model names. Served from a TTL cache (stale entries trigger a
+    background refresh); a cold cache runs the searches concurrently. When
+    search finds nothing, falls back to the most-collected products.
+    """
+    models = []
+    try:
+        cache = _load_trending_cache()
+        if cache and cache.get("models"):
+            models = cache["models"]
+            if time.time() - cache.get("fetched_at", 0) >= TRENDING_TTL:
+                _refresh_trending_in_background()
+        else:
+            models = _refresh_trending()
     except Exception:
         pass
 
+    if models:
+        return models[:limit]
+
     try:
-        _ensure_collected_file()
-        counts = Counter()
-        with open(COLLECTED_PATH, "r", encoding="utf-8") as f:
-            for row in csv.DictReader(f):
-                if row.get("Product"):
-                    counts[row["Product"]] += 1
-        if counts:
-            return [p for p, _ in counts.most_common(limit)]
+        top = _top_collected_products(limit)
+        if top:
+            return top
     except Exception:
         pass
 
@@ -126,50 +309,139 @@ def get_trending_products(limit: int = 8):
     return fallback[:limit]
 
 # ---------- Product Info ----------
-def get_product_info(product_name: str, max_images: int = 3):
+IMAGE_TIMEOUT = 5          # per-request timeout for image downloads
+PRODUCT_INFO_DEADLINE = 8  # seconds; get_product_info returns what finished by then
+
+_session_lock = threading.Lock()
+_session = None
+
+def _http():
+    """Process-wide requests.Session so image downloads reuse connections."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=16, pool_maxsize=16)
+            _session.mount("http://", adapter)
+            _session.mount("https://", adapter)
+        return _session
+
+@metrics.timed("fetch.buy_url_search")
+def _find_buy_url(product_name: str):
+    for r in search.text(f"{product_name} buy site:amazon.in OR site:flipkart.com", max_results=5):
+        u = r.get("href") or r.get("url")
+        if u and ("amazon" in u or "flipkart" in u):
+            return u
+    return None
+
+@metrics.timed("fetch.image_search")
+def _find_image_urls(query: str, max_images: int):
+    return [r["image"] for r in search.images(query, max_results=max_images) if r.get("image")]
+
+@metrics.timed("fetch.image_download")
+def _download_thumbnail(url: str):
+    """200x200 PIL thumbnail for `url`, via the on-disk image cache (worker thread)."""
+    return image_cache.load_thumbnail(url, _http(), timeout=IMAGE_TIMEOUT)
+
+def _result(future, deadline: float, default=None):
+    try:
+        return future.result(timeout=max(0.0, deadline - time.monotonic()))
+    except Exception:
+        future.cancel()
+        return default
+
+def _thumbnails(urls: list[str], deadline: float):
+    """Loads `urls` in parallel; returns (urls, thumbnails) that finished, in input order."""
+    futures = [_fetch_pool.submit(_download_thumbnail, u) for u in urls]
+    wait(futures, timeout=max(0.0, deadline - time.monotonic()))
+    done = []
+    for u, f in zip(urls, futures):
+        if f.done() and not f.cancelled() and f.exception() is None:
+            done.append((u, f.result()))
+        else:
+            f.cancel()
+    return [u for u, _ in done], [img for _, img in done]
+
+def _search_thumbnails(query: str, max_images: int, deadline: float):
+    urls = _result(_fetch_pool.submit(_find_image_urls, query, max_images), deadline, [])
+    return _thumbnails(urls, deadline)
+
+@metrics.timed("fetch.product_info")
+def fetch_product_info(product_name: str, max_images: int = 3,
+                       deadline: float = PRODUCT_INFO_DEADLINE):
     """
-    Fetch product info: images + a Best Buy shopping link.
-    Tries DuckDuckGo first, then fallback to GSMArena / Amazon / Flipkart.
-    Returns dict with name, buy_url, images.
+    Thread-safe half of get_product_info: returns name, buy_url,
+    "thumbnails" as PIL images and "images", the URLs they were loaded
+    from (same order), creating no Tk objects, so it can run off the Tk
+    main thread.
+
+    The buy-link search and the image search + downloads run concurrently
+    on a shared thread pool; whatever has not finished `deadline` seconds
+    after the call is dropped (buy_url None / fewer images).
+    Image URLs, the buy link and thumbnails are cached on disk
+    (image_cache.py), so a warm call needs no network at all.
     """
-    images, buy_url = [], None
-
-    with DDGS() as ddgs:
-        # --- Best Buy link ---
-        for r in ddgs.text(f"{product_name} buy site:amazon.in OR site:flipkart.com", max_results=5):
-            u = r.get("href") or r.get("url")
-            if u and ("amazon" in u or "flipkart" in u):
-                buy_url = u
-                break
-
-        # --- Try DuckDuckGo Images ---
-        for r in ddgs.images(product_name, max_results=max_images):
-            if r.get("image"):
-                try:
-                    img_data = requests.get(r["image"], timeout=5).content
-                    img = Image.open(BytesIO(img_data))
-                    img.thumbnail((200, 200))
-                    images.append(ImageTk.PhotoImage(img))
-                except Exception:
-                    pass
+    deadline_at = time.monotonic() + deadline
+
+    buy_future = None
+    cached = image_cache.get_product(product_name)
+    if cached and cached["max_images"] >= max_images:
+        # A buy link that timed out last time is searched again
+        if not cached["buy_url"]:
+            buy_future = _fetch_pool.submit(_find_buy_url, product_name)
+        urls, thumbs = _thumbnails(cached["images"][:max_images], deadline_at)
+        if thumbs:
+            buy_url = cached["buy_url"] or _result(buy_future, deadline_at)
+            metrics.count("fetch.product_info_cache_hits")
+            return {"name": product_name, "buy_url": buy_url, "thumbnails": thumbs, "images": urls}
+
+    # The cached thumbnails failed to load: keep any buy-link search already running
+    if buy_future is None:
+        buy_future = _fetch_pool.submit(_find_buy_url, product_name)
 
+    urls, thumbs = _search_thumbnails(product_name, max_images, deadline_at)
     # --- Fallback: GSMArena ---
-    if not images:
+    if not thumbs:
+        urls, thumbs = _search_thumbnails(f"{product_name} site:gsmarena.com", max_images, deadline_at)
+
+    buy_url = _result(buy_future, deadline_at)
+    if thumbs:
+        image_cache.put_product(product_name, urls, buy_url, max_images)
+    return {"name": product_name, "buy_url": buy_url, "thumbnails": thumbs, "images": urls}
+
+def to_photo_images(thumbnails):
+    """PIL thumbnails -> ImageTk.PhotoImage list. Must run on the Tk thread."""
+    images = []
+    for img in thumbnails:
         try:
-            for r in ddgs.images(f"{product_name} site:gsmarena.com", max_results=max_images):
-                if r.get("image"):
-                    try:
-                        img_data = requests.get(r["image"], timeout=5).content
-                        img = Image.open(BytesIO(img_data))
-                        img.thumbnail((200, 200))
-                        images.append(ImageTk.PhotoImage(img))
-                    except Exception:
-                        pass
+            images.append(ImageTk.PhotoImage(img))
         except Exception:
             pass
+    return images
 
+@metrics.timed("fetch.get_product_info")
+def get_product_info(product_name: str, max_images: int = 3,
+                     deadline: float = PRODUCT_INFO_DEADLINE):
+    """
+    Fetch product info: images + a Best Buy shopping link.
+    Tries DuckDuckGo first, then fallback to GSMArena / Amazon / Flipkart.
+    Returns dict with name, buy_url, images (see fetch_product_info).
+    """
+    info = fetch_product_info(product_name, max_images, deadline)
     return {
-        "name": product_name,
-        "buy_url": buy_url,
-        "images": images
+        "name": info["name"],
+        "buy_url": info["buy_url"],
+        "images": to_photo_images(info["thumbnails"])
     }
+
+def main():
+    ap = argparse.ArgumentParser(description="URA fetch tools")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("rebuild-index", help="regenerate the URL / product-count index from the collected store")
+    args = ap.parse_args()
+    if args.cmd == "rebuild-index":
+        products, urls = rebuild_collected_index()
+        print(f"✅ Indexed {urls} URLs across {products} products")
+
+if __name__ == "__main__":
+    main()
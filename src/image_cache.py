@@ -0,0 +1,142 @@
+# src/image_cache.py
+"""
+On-disk cache of product image thumbnails.
+
+    data/image_cache/index.sqlite       url -> thumbnail file + validators
+    data/image_cache/<sha1(url)>.png    200x200 thumbnail, already decoded/resized
+
+Products map to the image URLs (and buy link) found for them, so a warm
+get_product_info needs neither a search nor a download. Entries older
+than TTL are revalidated with If-None-Match / If-Modified-Since; a 304
+only refreshes the timestamp. Total thumbnail size is capped with LRU
+eviction.
+"""
+import os, json, time, hashlib, sqlite3, threading
+from contextlib import closing
+from io import BytesIO
+from PIL import Image
+from src.storage import product_key
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
+CACHE_DIR = os.path.join(DATA_DIR, "image_cache")
+os.makedirs(CACHE_DIR, exist_ok=True)
+
+THUMB_SIZE   = (200, 200)
+TTL          = 7 * 24 * 3600      # seconds before a thumbnail is revalidated
+PRODUCT_TTL  = 24 * 3600          # seconds before a product's image list is searched again
+MAX_BYTES    = 64 * 1024 * 1024   # total thumbnail bytes kept on disk
+
+_lock = threading.Lock()
+
+def _connect():
+    conn = sqlite3.connect(os.path.join(CACHE_DIR, "index.sqlite"), timeout=30)
+    conn.execute("CREATE TABLE IF NOT EXISTS thumbs (url TEXT PRIMARY KEY, file TEXT, etag TEXT, "
+                 "last_modified TEXT, fetched_at REAL, used REAL, size INTEGER)")
+    conn.execute("CREATE TABLE IF NOT EXISTS products "
+                 "(key TEXT PRIMARY KEY, images TEXT, buy_url TEXT, max_images INTEGER, fetched_at REAL)")
+    return conn
+
+def _file_for(url: str) -> str:
+    return os.path.join(CACHE_DIR, hashlib.sha1(url.encode("utf-8")).hexdigest() + ".png")
+
+def _open_thumb(path: str):
+    try:
+        img = Image.open(path)
+        img.load()
+        return img
+    except Exception:
+        return None
+
+def _store_thumb(url: str, resp, now: float):
+    img = Image.open(BytesIO(resp.content))
+    img.thumbnail(THUMB_SIZE)
+    if img.mode not in ("RGB", "RGBA", "L", "LA", "P"):
+        img = img.convert("RGBA")
+    path = _file_for(url)
+    img.save(path, "PNG")
+    with _lock, closing(_connect()) as conn:
+        conn.execute("INSERT OR REPLACE INTO thumbs VALUES (?, ?, ?, ?, ?, ?, ?)",
+                     (url, os.path.basename(path), resp.headers.get("ETag"),
+                      resp.headers.get("Last-Modified"), now, now, os.path.getsize(path)))
+        _evict(conn)
+        conn.commit()
+    return img
+
+def _evict(conn, max_bytes: int | None = None):
+    """Deletes least-recently-used thumbnails until the total fits max_bytes."""
+    max_bytes = MAX_BYTES if max_bytes is None else max_bytes
+    total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM thumbs").fetchone()[0]
+    if total <= max_bytes:
+        return
+    for url, file, size in conn.execute("SELECT url, file, size FROM thumbs ORDER BY used").fetchall():
+        try:
+            os.remove(os.path.join(CACHE_DIR, file))
+        except OSError:
+            pass
+        conn.execute("DELETE FROM thumbs WHERE url = ?", (url,))
+        total -= size or 0
+        if total <= max_bytes:
+            break
+
+def load_thumbnail(url: str, session, timeout: float = 5):
+    """
+    Returns a THUMB_SIZE PIL image for `url`, from disk when fresh, after
+    a conditional GET when stale, or by downloading it on a miss.
+    """
+    now = time.time()
+    with closing(_connect()) as conn:
+        row = conn.execute("SELECT file, etag, last_modified, fetched_at FROM thumbs WHERE url = ?",
+                           (url,)).fetchone()
+    cached = _open_thumb(os.path.join(CACHE_DIR, row[0])) if row else None
+
+    if cached is not None and now - row[3] < TTL:
+        with _lock, closing(_connect()) as conn:
+            conn.execute("UPDATE thumbs SET used = ? WHERE url = ?", (now, url))
+            conn.commit()
+        return cached
+
+    headers = {}
+    if cached is not None:
+        if row[1]: headers["If-None-Match"] = row[1]
+        if row[2]: headers["If-Modified-Since"] = row[2]
+    resp = session.get(url, timeout=timeout, headers=headers)
+
+    if resp.status_code == 304 and cached is not None:
+        with _lock, closing(_connect()) as conn:
+            conn.execute("UPDATE thumbs SET fetched_at = ?, used = ? WHERE url = ?", (now, now, url))
+            conn.commit()
+        return cached
+
+    resp.raise_for_status()
+    return _store_thumb(url, resp, now)
+
+def get_product(product_name: str):
+    """
+    Cached {'images': [...urls], 'buy_url', 'max_images'} for a product, or
+    None if missing/stale. max_images is the limit the URLs were searched with.
+    """
+    with closing(_connect()) as conn:
+        row = conn.execute("SELECT images, buy_url, max_images, fetched_at FROM products WHERE key = ?",
+                           (product_key(product_name),)).fetchone()
+    if not row or time.time() - row[3] >= PRODUCT_TTL:
+        return None
+    return {"images": json.loads(row[0]), "buy_url": row[1], "max_images": row[2]}
+
+def put_product(product_name: str, image_urls: list[str], buy_url: str | None, max_images: int):
+    with _lock, closing(_connect()) as conn:
+        conn.execute("INSERT OR REPLACE INTO products VALUES (?, ?, ?, ?, ?)",
+                     (product_key(product_name), json.dumps(image_urls), buy_url,
+                      max_images, time.time()))
+        conn.commit()
+
+def clear():
+    """Removes every cached thumbnail and product entry."""
+    with _lock, closing(_connect()) as conn:
+        for (file,) in conn.execute("SELECT file FROM thumbs").fetchall():
+            try:
+                os.remove(os.path.join(CACHE_DIR, file))
+            except OSError:
+                pass
+        conn.execute("DELETE FROM thumbs")
+        conn.execute("DELETE FROM products")
+        conn.commit()
@@ -0,0 +1,131 @@
+# src/keywords.py
+import re
+import numpy as np
+import pandas as pd
+from src.storage import _parse_list
+
+class KeywordMatcher:
+    """
+    Finds pros and cons keywords in one regex pass per review.
+    Matches whole words (plus a plural s/es) in the lowercased text, so
+    "bug" hits "bugs" but not "debugging" and "hard" skips "hardware".
+    Results keep vocabulary order, as the old substring scans did.
+    """
+    def __init__(self, pros, cons):
+        self.pros = list(dict.fromkeys(w.lower() for w in pros))
+        self.cons = list(dict.fromkeys(w.lower() for w in cons))
+        words = sorted(set(self.pros) | set(self.cons), key=len, reverse=True)
+        # The first-letter lookahead lets the engine skip most word starts cheaply
+        first = "".join(sorted({re.escape(w[0]) for w in words}))
+        self.pattern = re.compile(
+            r"\b(?=[" + first + r"])(" + "|".join(map(re.escape, words)) + r")(?:e?s)?\b"
+        )
+        self._pro_bits = {w: 1 << i for i, w in enumerate(self.pros)}
+        self._con_bits = {w: 1 << i for i, w in enumerate(self.cons)}
+
+    def _split(self, found):
+        hits = set(found)
+        return [w for w in self.pros if w in hits], [w for w in self.cons if w in hits]
+
+    def _masks(self, text):
+        p = c = 0
+        for w in self.pattern.findall(text):
+            p |= self._pro_bits.get(w, 0)
+            c |= self._con_bits.get(w, 0)
+        return p, c
+
+    def match(self, text):
+        """Returns (pros, cons) keyword lists for one review."""
+        return self._split(self.pattern.findall(str(text).lower()))
+
+    def match_series(self, reviews: pd.Series):
+        """
+        Vectorized form of match(): returns (pros, cons) Series aligned to
+        `reviews`. Built from match_masks(), so rows with the same hits
+        share one (read-only) list.
+        """
+        pros, cons = self.match_masks(reviews)
+        return (pd.Series(from_masks(pros, self.pros), index=reviews.index, dtype=object),
+                pd.Series(from_masks(cons, self.cons), index=reviews.index, dtype=object))
+
+    def match_masks(self, reviews: pd.Series):
+        """
+        (pros, cons) bitmask arrays for `reviews`, bit i set when
+        self.pros[i] / self.cons[i] was found. from_masks() turns them back
+        into the lists match_series() returns. Repeated texts are matched once.
+        """
+        codes, texts = pd.factorize(reviews.astype(str).str.lower())
+        pros = np.zeros(len(texts), dtype=mask_dtype(self.pros))
+        cons = np.zeros(len(texts), dtype=mask_dtype(self.cons))
+        for row, text in enumerate(texts):
+            pros[row], cons[row] = self._masks(text)
+        if len(codes) == len(texts):
+            return pros, cons      # all distinct (factorize keeps first-seen order)
+        return pros[codes], cons[codes]
+
+
+# ---------- Bitmasks ----------
+def mask_dtype(vocab):
+    """Smallest unsigned dtype with a bit per vocabulary entry."""
+    for dtype in (np.uint8, np.uint16, np.uint32, np.uint64):
+        if len(vocab) <= 8 * np.dtype(dtype).itemsize:
+            return dtype
+    raise ValueError(f"{len(vocab)} keywords do not fit a 64-bit mask")
+
+def to_masks(cells: pd.Series, vocab) -> np.ndarray:
+    """
+    Bitmask per keyword-list cell, bit i set when vocab[i] is in the list.
+    Cells are lists, arrays (parquet) or their repr (the CSV backend).
+    Words outside `vocab` are dropped.
+    """
+    dtype = mask_dtype(vocab)
+    values = cells.to_numpy(dtype=object)
+    if pd.api.types.infer_dtype(values, skipna=False) in ("string", "empty"):
+        # CSV repr: one vectorized substring test per keyword, no literal_eval
+        text = pd.Series(values, dtype=object)
+        masks = np.zeros(len(values), dtype=dtype)
+        for i, word in enumerate(vocab):
+            masks[text.str.contains(f"'{word}'", regex=False).to_numpy(dtype=bool)] |= dtype(1 << i)
+        return masks
+    bits = {w: 1 << i for i, w in enumerate(vocab)}
+    return np.fromiter((sum(bits.get(w, 0) for w in set(_parse_list(v) if isinstance(v, str) else
+                                                         (v if v is not None else ())))
+                        for v in values), dtype=dtype, count=len(values))
+
+def from_masks(masks: np.ndarray, vocab):
+    """
+    Keyword list per mask, in vocabulary order. Each distinct mask is
+    decoded once; every row gets its own copy of that list.
+    """
+    uniques, inverse = np.unique(masks, return_inverse=True)
+    decoded = [[w for i, w in enumerate(vocab) if int(m) >> i & 1] for m in uniques]
+    return [list(decoded[i]) for i in inverse.ravel()]
+
+def bit_counts(masks: np.ndarray, vocab) -> dict:
+    """{keyword: rows with its bit set} for keywords that occur, most frequent first."""
+    counts = [(int(np.count_nonzero(masks & masks.dtype.type(1 << i))), w) for i, w in enumerate(vocab)]
+    # Stable sort: ties keep vocabulary order
+    return {w: n for n, w in sorted(counts, key=lambda c: -c[0]) if n}
+
+class MaskRules:
+    """
+    (trigger keywords, output) rules compiled to mask tests over `vocab`:
+    a rule fires for a row when any trigger bit is set in its mask.
+    """
+    def __init__(self, rules, vocab):
+        bits = {w: 1 << i for i, w in enumerate(vocab)}
+        dtype = mask_dtype(vocab)
+        self.outputs = [out for _, out in rules]
+        self.triggers = [dtype(sum(bits[w] for w in set(triggers))) for triggers, _ in rules]
+
+    def apply(self, masks: np.ndarray) -> np.ndarray:
+        """Per row, a mask over self.outputs of the rules that fire."""
+        dtype = mask_dtype(self.outputs)
+        out = np.zeros(len(masks), dtype=dtype)
+        for r, trigger in enumerate(self.triggers):
+            out[(masks & trigger) != 0] |= dtype(1 << r)
+        return out
+
+    def counts(self, masks: np.ndarray) -> dict:
+        """{output: rows it fires for}, most frequent first."""
+        return bit_counts(self.apply(masks), self.outputs)
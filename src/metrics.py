@@ -0,0 +1,256 @@
+# src/metrics.py
+"""
+Opt-in timing spans and counters.
+
+    URA_METRICS=1 python main.py          # or metrics.enable() at runtime
+
+    with metrics.span("analyze.sentiment"):   ...
+    @metrics.timed("fetch.save_reviews")
+    metrics.count("fetch.reviews_saved", n)
+
+    run = metrics.start_run("analyze")     # e.g. one Analyze click
+    ...
+    run.finish()                           # appends a breakdown to data/metrics.jsonl
+
+Spans feed per-name totals and latency histograms for the whole process;
+a run is the delta of those between start_run and finish, across every
+thread, so work on fetch pools and the Tk thread lands in the same report.
+Export with prometheus_text() (also served by the API at /metrics) or
+read the runs back with:  python -m src.metrics report
+
+Disabled (the default), span() returns a shared no-op and timed()
+functions add one flag check per call.
+"""
+import os, json, time, threading, argparse
+from functools import wraps
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
+os.makedirs(DATA_DIR, exist_ok=True)
+
+METRICS_PATH = os.path.join(DATA_DIR, "metrics.jsonl")
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)  # seconds
+
+_enabled = os.environ.get("URA_METRICS", "").lower() in ("1", "true", "yes", "on")
+_lock = threading.Lock()
+_spans = {}      # name -> [count, total_seconds, max_seconds, bucket counts...]
+_counters = {}   # name -> value
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+def disable():
+    global _enabled
+    _enabled = False
+
+def enabled() -> bool:
+    return _enabled
+
+def reset():
+    with _lock:
+        _spans.clear()
+        _counters.clear()
+
+
+# ---------- Recording ----------
+def _observe(name: str, seconds: float):
+    with _lock:
+        s = _spans.get(name)
+        if s is None:
+            s = _spans[name] = [0, 0.0, 0.0] + [0] * len(BUCKETS)
+        s[0] += 1
+        s[1] += seconds
+        s[2] = max(s[2], seconds)
+        for i, le in enumerate(BUCKETS):
+            if seconds <= le:
+                s[3 + i] += 1
+                break
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        _observe(self.name, time.perf_counter() - self.start)
+        return False
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NOOP = _NoSpan()
+
+def span(name: str):
+    """Context manager timing one occurrence of `name`."""
+    return _Span(name) if _enabled else _NOOP
+
+def timed(name: str):
+    """Decorator: every call of the function is a `name` span."""
+    def deco(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with _Span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return deco
+
+def timed_iter(name: str, iterable):
+    """Yields from `iterable`, timing each step (e.g. reading the next chunk) as `name`."""
+    if not _enabled:
+        yield from iterable
+        return
+    it = iter(iterable)
+    while True:
+        with _Span(name):
+            try:
+                item = next(it)
+            except StopIteration:
+                return
+        yield item
+
+def count(name: str, n: float = 1):
+    if _enabled and n:
+        with _lock:
+            _counters[name] = _counters.get(name, 0) + n
+
+
+# ---------- Snapshots & runs ----------
+def snapshot():
+    """{"spans": {name: {"count", "total_ms", "max_ms"}}, "counters": {...}}"""
+    with _lock:
+        return {
+            "spans": {k: {"count": v[0], "total_ms": round(1000 * v[1], 3), "max_ms": round(1000 * v[2], 3)}
+                      for k, v in _spans.items()},
+            "counters": dict(_counters),
+        }
+
+class Run:
+    """One user-visible operation; finish() records what happened since start_run."""
+    def __init__(self, name):
+        self.name = name
+        self.started = time.time()
+        self._t = time.perf_counter()
+        self._base = snapshot() if _enabled else None
+        self.report = None
+
+    def finish(self, path: str | None = None, **extra):
+        """Returns the breakdown (None when disabled) and appends it to the metrics file."""
+        if self._base is None or self.report is not None:
+            return self.report
+        wall_ms = 1000 * (time.perf_counter() - self._t)
+        now = snapshot()
+        spans = {}
+        for name, s in now["spans"].items():
+            b = self._base["spans"].get(name, {"count": 0, "total_ms": 0.0})
+            n = s["count"] - b["count"]
+            if n:
+                total = round(s["total_ms"] - b["total_ms"], 3)
+                spans[name] = {"count": n, "total_ms": total,
+                               "share": round(total / wall_ms, 4) if wall_ms else None}
+        counters = {k: v - self._base["counters"].get(k, 0) for k, v in now["counters"].items()
+                    if v != self._base["counters"].get(k, 0)}
+        self.report = {"run": self.name, "started": self.started, "wall_ms": round(wall_ms, 3),
+                       "spans": dict(sorted(spans.items(), key=lambda kv: -kv[1]["total_ms"])),
+                       "counters": counters, **extra}
+        try:
+            with _lock, open(path or METRICS_PATH, "a", encoding="utf-8") as f:
+                f.write(json.dumps(self.report) + "\n")
+        except OSError:
+            pass
+        return self.report
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.finish()
+        return False
+
+def start_run(name: str):
+    return Run(name)
+
+
+# ---------- Export ----------
+def _label(value: str):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def prometheus_text():
+    """Process-wide spans and counters in the Prometheus text exposition format."""
+    with _lock:
+        spans = {k: list(v) for k, v in _spans.items()}
+        counters = dict(_counters)
+    lines = ["# HELP ura_span_seconds Time spent in instrumented spans.",
+             "# TYPE ura_span_seconds histogram"]
+    for name, s in sorted(spans.items()):
+        lbl = f'span="{_label(name)}"'
+        cumulative = 0
+        for i, le in enumerate(BUCKETS):
+            cumulative += s[3 + i]
+            lines.append(f'ura_span_seconds_bucket{{{lbl},le="{le}"}} {cumulative}')
+        lines.append(f'ura_span_seconds_bucket{{{lbl},le="+Inf"}} {s[0]}')
+        lines.append(f"ura_span_seconds_sum{{{lbl}}} {s[1]:.6f}")
+        lines.append(f"ura_span_seconds_count{{{lbl}}} {s[0]}")
+    lines += ["# HELP ura_events_total Instrumented event counters.",
+              "# TYPE ura_events_total counter"]
+    for name, v in sorted(counters.items()):
+        lines.append(f'ura_events_total{{name="{_label(name)}"}} {v}')
+    return "\n".join(lines) + "\n"
+
+def write_prometheus(path: str):
+    """Writes prometheus_text() atomically (e.g. for a node_exporter textfile collector)."""
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(prometheus_text())
+    os.replace(tmp, path)
+
+
+# ---------- Reports ----------
+def load_runs(path: str | None = None, name: str | None = None):
+    try:
+        with open(path or METRICS_PATH, "r", encoding="utf-8") as f:
+            runs = [json.loads(line) for line in f if line.strip()]
+    except OSError:
+        return []
+    return [r for r in runs if not name or r["run"] == name]
+
+def format_run(report: dict) -> str:
+    when = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(report["started"]))
+    lines = [f"{report['run']} @ {when}: {report['wall_ms'] / 1000:.2f}s wall"]
+    for name, s in report["spans"].items():
+        share = f"{100 * s['share']:5.1f}%" if s.get("share") is not None else "    -"
+        lines.append(f"  {name:<36}{s['count']:>6}x {s['total_ms']:>11.1f} ms {share}")
+    for name, v in report["counters"].items():
+        lines.append(f"  {name:<36}{v:>6}")
+    return "\n".join(lines)
+
+def main():
+    ap = argparse.ArgumentParser(description="URA metrics")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    r = sub.add_parser("report", help="per-run breakdowns from the metrics file")
+    r.add_argument("--last", type=int, default=5)
+    r.add_argument("--run", help="only runs with this name")
+    r.add_argument("--path", default=METRICS_PATH)
+    args = ap.parse_args()
+    if args.cmd == "report":
+        runs = load_runs(args.path, args.run)[-args.last:]
+        if not runs:
+            print("No runs recorded. Set URA_METRICS=1 to record them.")
+        for report in runs:
+            print(format_run(report) + "\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+# src/row_index.py
+"""
+Product -> byte-range index over a CSV table, so a per-product read
+seeks straight to that product's rows instead of parsing the whole file.
+
+    data/collected_reviews.csv  ->  data/collected_reviews.rows.sqlite
+
+    ranges(pid, start, length)    runs of consecutive rows of one product
+    products(pid, key)            normalized product key (storage.product_key)
+    meta                          indexed_bytes, header, tail_hash
+
+The index catches up on every read: only bytes appended since the last
+sync are scanned, so keeping it current costs the new rows, whoever
+wrote them. If the indexed prefix changed (file rewritten, truncated or
+replaced) it is rebuilt from scratch.
+"""
+import os, io, csv, hashlib, sqlite3
+from contextlib import closing
+import pandas as pd
+from src.storage import product_key
+
+_HASH_WINDOW = 4096        # bytes before the watermark that must be unchanged
+_SCAN_BYTES = 16 << 20     # bytes parsed per step while catching up
+
+
+def index_path(csv_path: str) -> str:
+    return os.path.splitext(csv_path)[0] + ".rows.sqlite"
+
+def _connect(csv_path: str):
+    conn = sqlite3.connect(index_path(csv_path), timeout=30, isolation_level=None)
+    conn.execute("CREATE TABLE IF NOT EXISTS meta (k TEXT PRIMARY KEY, v TEXT)")
+    conn.execute("CREATE TABLE IF NOT EXISTS products (pid INTEGER PRIMARY KEY, key TEXT UNIQUE NOT NULL)")
+    conn.execute("CREATE TABLE IF NOT EXISTS ranges (pid INTEGER NOT NULL, start INTEGER NOT NULL, "
+                 "length INTEGER NOT NULL, PRIMARY KEY (pid, start)) WITHOUT ROWID")
+    return conn
+
+
+# ---------- Watermarks ----------
+def tail_hash(f, offset: int):
+    """sha1 of the bytes just before `offset` — detects rewrites/truncation."""
+    start = max(0, offset - _HASH_WINDOW)
+    f.seek(start)
+    return hashlib.sha1(f.read(offset - start)).hexdigest()
+
+def prefix_state(f, offset: int, header: bytes) -> dict:
+    """{"header", "tail_hash"} recorded with a watermark at `offset`, see prefix_unchanged."""
+    return {"header": header.decode("utf-8", errors="replace"), "tail_hash": tail_hash(f, offset)}
+
+def prefix_unchanged(f, offset: int, header: bytes, end: int, saved: dict) -> bool:
+    """
+    True if the first `offset` bytes of `f` (header line `header`, `end`
+    bytes long) still match the prefix_state() saved with them, i.e. the
+    file was only appended to since.
+    """
+    return (len(header) <= offset <= end
+            and saved.get("header") == header.decode("utf-8", errors="replace")
+            and saved.get("tail_hash") == tail_hash(f, offset))
+
+
+# ---------- Scanning ----------
+def records(data: bytes, base: int):
+    """
+    (offset, length, row) for each complete CSV record in `data`, which
+    starts on a record boundary at file offset `base`. A record is
+    complete once it ends in a newline outside quotes.
+    """
+    # The piece after the last newline is dropped: a writer may be mid-row
+    lines = [line + b"\n" for line in data.split(b"\n")[:-1]]
+    starts, pos = [], base
+    for line in lines:
+        starts.append(pos)
+        pos += len(line)
+    starts.append(pos)
+
+    reader = csv.reader(line.decode("utf-8", errors="replace") for line in lines)
+    first = 0
+    while True:
+        try:
+            row = next(reader)
+        except StopIteration:
+            return
+        except csv.Error:
+            return    # unterminated quoted field: stop before it
+        last = reader.line_num
+        record = data[starts[first] - base:starts[last] - base]
+        if record.count(b'"') % 2:
+            return    # quoted newline whose closing half is not written yet
+        yield starts[first], starts[last] - starts[first], row
+        first = last
+
+def _pid(conn, cache: dict, key: str):
+    pid = cache.get(key)
+    if pid is None:
+        conn.execute("INSERT OR IGNORE INTO products (key) VALUES (?)", (key,))
+        pid = cache[key] = conn.execute("SELECT pid FROM products WHERE key = ?", (key,)).fetchone()[0]
+    return pid
+
+def _index_range(conn, f, start: int, end: int, column: int):
+    """Indexes complete records in [start, end); returns the offset after the last one."""
+    cache, pos = {}, start
+    while pos < end:
+        f.seek(pos)
+        data = f.read(min(_SCAN_BYTES, end - pos))
+        ranges, run = [], None
+        consumed = 0
+        for offset, length, row in records(data, pos):
+            consumed = offset + length - pos
+            if column >= len(row):
+                continue
+            pid = _pid(conn, cache, product_key(row[column]))
+            # Rows of one search batch are contiguous; store them as one range
+            if run and run[0] == pid and run[1] + run[2] == offset:
+                run[2] += length
+            else:
+                if run:
+                    ranges.append(tuple(run))
+                run = [pid, offset, length]
+        if run:
+            ranges.append(tuple(run))
+        conn.executemany("INSERT OR REPLACE INTO ranges VALUES (?, ?, ?)", ranges)
+        if not consumed:
+            break     # an incomplete record (or one larger than _SCAN_BYTES) at the end
+        pos += consumed
+    return pos
+
+def _valid_offset(meta: dict, f, header: bytes, end: int):
+    """The indexed watermark if the prefix it covers is unchanged, else None."""
+    offset = int(meta.get("indexed_bytes", 0))
+    return offset if prefix_unchanged(f, offset, header, end, meta) else None
+
+def sync(csv_path: str, product_column: str = "Product"):
+    """Brings the index up to date with `csv_path`; returns the number of indexed products."""
+    with closing(_connect(csv_path)) as conn, open(csv_path, "rb") as f:
+        header = f.readline()
+        end = os.fstat(f.fileno()).st_size
+        # Common case: nothing appended since the last sync, so no write lock
+        if _valid_offset(dict(conn.execute("SELECT k, v FROM meta")), f, header, end) == end:
+            return conn.execute("SELECT COUNT(*) FROM products").fetchone()[0]
+
+        conn.execute("BEGIN IMMEDIATE")   # one writer at a time; the others wait, then see its work
+        try:
+            offset = _valid_offset(dict(conn.execute("SELECT k, v FROM meta")), f, header, end)
+            if offset is None:
+                conn.execute("DELETE FROM ranges")
+                conn.execute("DELETE FROM products")
+                offset = len(header)
+            if offset < end:
+                names = next(csv.reader([header.decode("utf-8", errors="replace")]), [])
+                if product_column not in names:
+                    raise ValueError(f"{csv_path} has no {product_column!r} column")
+                offset = _index_range(conn, f, offset, end, names.index(product_column))
+            conn.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)",
+                             [("indexed_bytes", str(offset)), *prefix_state(f, offset, header).items()])
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return conn.execute("SELECT COUNT(*) FROM products").fetchone()[0]
+
+
+# ---------- Reading ----------
+def read_product(csv_path: str, product: str, columns=None, product_column: str = "Product"):
+    """
+    Rows of `csv_path` whose product_key matches `product`, in file order,
+    reading only that product's byte ranges.
+    """
+    sync(csv_path, product_column)
+    with closing(_connect(csv_path)) as conn:
+        ranges = conn.execute(
+            "SELECT r.start, r.length FROM ranges r JOIN products p ON p.pid = r.pid "
+            "WHERE p.key = ? ORDER BY r.start", (product_key(product),)).fetchall()
+    with open(csv_path, "rb") as f:
+        header = f.readline()
+        parts = [header]
+        for offset, length in ranges:
+            f.seek(offset)
+            parts.append(f.read(length))
+    usecols = list(dict.fromkeys(list(columns) + [product_column])) if columns else None
+    df = pd.read_csv(io.BytesIO(b"".join(parts)), usecols=usecols)
+    if len(df):
+        # Guards against a stale range after an in-place edit of the same length
+        df = df[df[product_column].map(product_key) == product_key(product)]
+    return df[list(columns)] if columns else df
+
+def rebuild(csv_path: str, product_column: str = "Product"):
+    """Drops and re-creates the index; returns the number of indexed products."""
+    path = index_path(csv_path)
+    if os.path.exists(path):
+        os.remove(path)
+    return sync(csv_path, product_column)
@@ -1,7 +1,149 @@
+import asyncio
+import codecs
 import csv
 import os
+import time
+from urllib.parse import urlsplit
+
 import requests
-from bs4 import BeautifulSoup
+
+from src.extractors import get_extractor, DEFAULT_BACKEND
+
+HEADERS = {"User-Agent": "Mozilla/5.0"}
+CONNECT_TIMEOUT = 5       # seconds to open a connection
+READ_TIMEOUT = 20         # seconds between bytes
+PAGE_TIMEOUT = 45         # hard cap per page, including parsing
+PER_DOMAIN = 2            # concurrent requests per domain
+DOMAIN_DELAY = 1.0        # seconds between request starts to the same domain
+MAX_CONCURRENCY = 16      # pages in flight overall
+CHUNK_SIZE = 64 * 1024
+EXTRACTOR_BACKEND = DEFAULT_BACKEND  # see src/extractors.py: stream | lxml | strainer
+
+
+class _DomainGate:
+    """Per-domain concurrency limit plus a minimum spacing between request starts."""
+    def __init__(self, per_domain, delay):
+        self.per_domain, self.delay = per_domain, delay
+        self.sems, self.next_at, self.locks = {}, {}, {}
+
+    def slot(self, domain):
+        if domain not in self.sems:
+            self.sems[domain] = asyncio.Semaphore(self.per_domain)
+            self.locks[domain] = asyncio.Lock()
+            self.next_at[domain] = 0.0
+        return _DomainSlot(self, domain)
+
+
+class _DomainSlot:
+    def __init__(self, gate, domain):
+        self.gate, self.domain = gate, domain
+
+    async def __aenter__(self):
+        await self.gate.sems[self.domain].acquire()
+        async with self.gate.locks[self.domain]:
+            wait = self.gate.next_at[self.domain] - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self.gate.next_at[self.domain] = time.monotonic() + self.gate.delay
+
+    async def __aexit__(self, *exc):
+        self.gate.sems[self.domain].release()
+
+
+def _session(pool_size):
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def _iter_text(resp, url, deadline):
+    """
+    Decoded body chunks as they arrive. Raises TimeoutError once `deadline`
+    (time.monotonic()) passes, so a host that keeps trickling bytes cannot
+    hold the worker thread past the page budget; a read that is already
+    blocked ends within READ_TIMEOUT.
+    """
+    decoder = codecs.getincrementaldecoder(resp.encoding or "utf-8")(errors="replace")
+    while True:
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"{url} took longer than {PAGE_TIMEOUT}s")
+        # read1 (urllib3 >= 2.2) returns whatever has arrived instead of waiting for a full chunk
+        data = resp.raw.read1(CHUNK_SIZE, decode_content=True)
+        if not data:
+            break
+        yield decoder.decode(data)
+    yield decoder.decode(b"", final=True)
+
+
+def _fetch_and_parse(session, url, extractor, deadline):
+    """
+    Downloads one page and runs the site's extractor (worker thread).
+    Streaming extractors are fed chunk by chunk as the body arrives.
+    Leaving the `with` on a timeout closes the response and its socket.
+    """
+    parser = extractor.parser() if extractor.streaming else None
+    chunks = []
+    with session.get(url, stream=True, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT)) as resp:
+        resp.raise_for_status()
+        for chunk in _iter_text(resp, url, deadline):
+            if parser:
+                parser.feed(chunk)
+            else:
+                chunks.append(chunk)
+    if parser:
+        parser.close()
+        return parser.pop_reviews()
+    return extractor.extract("".join(chunks))
+
+
+async def scrape_reviews_async(urls, out_path, per_domain=PER_DOMAIN, delay=DOMAIN_DELAY,
+                               concurrency=MAX_CONCURRENCY, backend=EXTRACTOR_BACKEND):
+    """
+    Scrapes `urls` concurrently and appends each page's reviews to
+    `out_path` as soon as that page is done. URLs on domains without a
+    registered extractor are skipped. Returns the review count.
+    """
+    session = _session(concurrency)
+    gate = _DomainGate(per_domain, delay)
+    limit = asyncio.Semaphore(concurrency)
+    written = 0
+
+    with open(out_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Review"])
+
+        async def scrape(url):
+            nonlocal written
+            extractor = get_extractor(url, backend)
+            if extractor is None:
+                print(f"⏭️ No extractor for {url}, skipping")
+                return
+            domain = urlsplit(url).hostname or url
+            async with limit, gate.slot(domain):
+                print(f"Scraping: {url}")
+                deadline = time.monotonic() + PAGE_TIMEOUT
+                try:
+                    # wait_for cannot stop the thread; the deadline inside it does
+                    reviews = await asyncio.wait_for(
+                        asyncio.to_thread(_fetch_and_parse, session, url, extractor, deadline),
+                        PAGE_TIMEOUT)
+                except Exception as e:
+                    print(f"❌ Error scraping {url}: {e!r}")
+                    return
+            # Writes happen on the event loop thread, so rows never interleave
+            writer.writerows([r] for r in reviews)
+            f.flush()
+            written += len(reviews)
+
+        try:
+            await asyncio.gather(*(scrape(u) for u in urls))
+        finally:
+            session.close()
+    return written
+
 
 def scrape_reviews(product_name):
     # Path to product's links file
@@ -13,32 +155,7 @@ def scrape_reviews(product_name):
 
     # Read all links
     with open(links_file, "r", newline="", encoding="utf-8") as f:
-        reader = csv.reader(f)
-        links = list(reader)
-
-    all_reviews = []
-
-    for row in links:
-        url = row[0]
-        print(f"Scraping: {url}")
-        try:
-            page = requests.get(url, headers={"User-Agent": "Mozilla/5.0"})
-            soup = BeautifulSoup(page.text, "html.parser")
-
-            # Example: Amazon review div (adjust later for other sites)
-            reviews = soup.find_all("span", {"data-hook": "review-body"})
-            for r in reviews:
-                text = r.get_text(strip=True)
-                if text:
-                    all_reviews.append([text])
-
-        except Exception as e:
-            print(f"❌ Error scraping {url}: {e}")
-
-    # Save reviews
-    with open(reviews_file, "w", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
-        writer.writerow(["Review"])
-        writer.writerows(all_reviews)
+        urls = [row[0] for row in csv.reader(f) if row and row[0].strip()]
 
-    print(f"✅ Saved {len(all_reviews)} reviews to {reviews_file}")
\ No newline at end of file
+    count = asyncio.run(scrape_reviews_async(urls, reviews_file))
+    print(f"✅ Saved {count} reviews to {reviews_file}")
@@ -0,0 +1,194 @@
+# src/search.py
+"""
+Shared layer under every web search fetch.py makes (DDGS text/images).
+
+    data/search_cache.sqlite    (kind, query, max_results) -> results, fetched_at
+
+- Results are cached on disk for TTL seconds, so the home screen, the
+  random screen and a re-analysis looking up the same product within
+  minutes send one query between them. The table is capped at
+  MAX_ENTRIES with least-recently-used eviction. A cached answer for
+  more results also serves requests for fewer.
+- Concurrent identical queries are coalesced: the first caller runs the
+  search, the others wait for its result (or its exception).
+- Clients are pooled: one is created per concurrent search and reused
+  afterwards, instead of a new DDGS() per query.
+- The backend is pluggable. Anything with DDGS's text()/images() works:
+
+      search.set_backend(FakeDDGS)    # factory returning a client
+      search.set_cache(None)          # no disk cache (e.g. benchmarks)
+"""
+import os, json, time, queue, sqlite3, threading
+from concurrent.futures import Future
+from contextlib import closing
+from src import metrics
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
+os.makedirs(DATA_DIR, exist_ok=True)
+
+CACHE_PATH  = os.path.join(DATA_DIR, "search_cache.sqlite")
+TTL         = 3600     # seconds a query's results are reused
+MAX_ENTRIES = 5000     # cached queries kept on disk
+
+
+def _ddgs():
+    from ddgs import DDGS   # imported on first search, not at startup
+    return DDGS()
+
+_backend = _ddgs
+_cache_path = CACHE_PATH
+_clients = queue.LifoQueue()
+_lock = threading.Lock()
+_inflight = {}   # (backend factory, kind, query, max_results) -> Future
+
+
+def set_backend(factory):
+    """Routes searches to clients made by `factory()`; returns the previous factory."""
+    global _backend
+    with _lock:
+        previous, _backend = _backend, factory
+    _drain_clients()
+    return previous
+
+def set_cache(path: str | None):
+    """Cache file to use (None disables caching); returns the previous one."""
+    global _cache_path
+    with _lock:
+        previous, _cache_path = _cache_path, path
+    return previous
+
+
+# ---------- Client pool ----------
+def _drain_clients():
+    while True:
+        try:
+            _close(_clients.get_nowait()[1])
+        except queue.Empty:
+            return
+
+def _close(client):
+    exit_ = getattr(client, "__exit__", None)
+    if exit_:
+        try:
+            exit_(None, None, None)
+        except Exception:
+            pass
+
+def _call(factory, kind: str, query: str, max_results: int):
+    """One search on a pooled `factory` client; a client that raised is dropped."""
+    try:
+        owner, client = _clients.get_nowait()
+        if owner is not factory:       # made before set_backend()
+            _close(client)
+            raise queue.Empty
+    except queue.Empty:
+        client = factory()
+    try:
+        with metrics.span(f"search.{kind}"):
+            results = list(getattr(client, kind)(query, max_results=max_results) or [])
+    except BaseException:
+        _close(client)
+        raise
+    _clients.put((factory, client))
+    return results
+
+
+# ---------- Cache ----------
+def _connect(path):
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute("CREATE TABLE IF NOT EXISTS results (kind TEXT NOT NULL, query TEXT NOT NULL, "
+                 "max_results INTEGER NOT NULL, results TEXT NOT NULL, fetched_at REAL NOT NULL, "
+                 "used REAL NOT NULL, PRIMARY KEY (kind, query, max_results))")
+    conn.execute("CREATE INDEX IF NOT EXISTS results_used ON results (used)")
+    return conn
+
+def _cached(path, key, ttl: float):
+    kind, query, max_results = key
+    now = time.time()
+    with closing(_connect(path)) as conn:
+        row = conn.execute(
+            "SELECT max_results, results FROM results WHERE kind = ? AND query = ? "
+            "AND max_results >= ? AND fetched_at >= ? ORDER BY max_results LIMIT 1",
+            (kind, query, max_results, now - ttl)).fetchone()
+        if row is None:
+            return None
+        conn.execute("UPDATE results SET used = ? WHERE kind = ? AND query = ? AND max_results = ?",
+                     (now, kind, query, row[0]))
+        conn.commit()
+    return json.loads(row[1])[:max_results]
+
+def _store(path, key, results):
+    now = time.time()
+    with closing(_connect(path)) as conn:
+        conn.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)",
+                     (*key, json.dumps(results), now, now))
+        _evict(conn)
+        conn.commit()
+
+def _evict(conn, max_entries: int | None = None):
+    """Drops the least recently used entries beyond max_entries."""
+    max_entries = MAX_ENTRIES if max_entries is None else max_entries
+    extra = conn.execute("SELECT COUNT(*) FROM results").fetchone()[0] - max_entries
+    if extra > 0:
+        conn.execute("DELETE FROM results WHERE rowid IN "
+                     "(SELECT rowid FROM results ORDER BY used LIMIT ?)", (extra,))
+
+def clear(path: str | None = None):
+    """Empties the search cache."""
+    path = path or _cache_path
+    if path and os.path.exists(path):
+        with closing(_connect(path)) as conn:
+            conn.execute("DELETE FROM results")
+            conn.commit()
+
+
+# ---------- Searching ----------
+def _search(kind: str, query: str, max_results: int, ttl: float | None):
+    key = (kind, query, int(max_results))
+    path = _cache_path
+    ttl = TTL if ttl is None else ttl
+    if path and ttl > 0:
+        try:
+            hit = _cached(path, key, ttl)
+        except sqlite3.Error:
+            hit = None
+        if hit is not None:
+            metrics.count("search.cache_hits")
+            return hit
+
+    with _lock:
+        # Searches still running on a replaced backend are not joined
+        factory = _backend
+        flight = (factory, *key)
+        future = _inflight.get(flight)
+        leader = future is None
+        if leader:
+            future = _inflight[flight] = Future()
+    if not leader:
+        metrics.count("search.coalesced")
+        return list(future.result())
+
+    try:
+        results = _call(factory, kind, query, key[2])
+        # Empty answers are usually a throttled search, so they are not kept
+        if path and results:
+            try:
+                _store(path, key, results)
+            except sqlite3.Error:
+                pass
+        future.set_result(results)
+        return list(results)
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _lock:
+            _inflight.pop(flight, None)
+
+def text(query: str, max_results: int = 20, ttl: float | None = None):
+    """Web results as DDGS.text() returns them ({"title", "href", "body"}), cached."""
+    return _search("text", query, max_results, ttl)
+
+def images(query: str, max_results: int = 3, ttl: float | None = None):
+    """Image results as DDGS.images() returns them ({"image", ...}), cached."""
+    return _search("images", query, max_results, ttl)
@@ -0,0 +1,175 @@
+# src/sentiment_backends.py
+"""
+Interchangeable polarity scorers for analyze_reviews, picked by name or
+$URA_SENTIMENT (default textblob):
+
+    textblob  TextBlob/Pattern, one document at a time (reference)
+    lexicon   the same Pattern lexicon applied to a whole batch with NumPy
+
+Both return polarities in [-1, 1]; analyze_reviews turns them into labels.
+The lexicon scorer reproduces Pattern's main rules (modifiers such as
+"very good", negation such as "not good" or "not a good", "!" boosts)
+but not its emoticon and sarcasm handling, so its labels can differ.
+Use agreement() (or benchmarks/bench_sentiment.py) to see how often.
+"""
+import os, re
+from importlib import metadata
+import numpy as np
+
+
+def _version(package):
+    try:
+        return metadata.version(package)
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+class TextBlobBackend:
+    kind = "textblob"
+
+    def __init__(self):
+        # `name` goes into the sentiment cache version
+        self.name = f"textblob-{_version('textblob')}"
+
+    def warm(self):
+        from textblob import TextBlob
+        TextBlob("warm up").sentiment
+
+    def polarities(self, texts):
+        from textblob import TextBlob
+        return [TextBlob(str(t)).sentiment.polarity for t in texts]
+
+
+# Close to Pattern's tokenizer: "isn't" -> is n ' t, "camera:great" stays whole
+_TOKEN = re.compile(r"[a-z0-9]+(?:[-:.][a-z0-9]+)*|[!']")
+
+class LexiconBackend:
+    """
+    Batch scorer over Pattern's lexicon. A batch is tokenized into one flat
+    token array; every rule is an array operation over it, and per-review
+    averages are a single weighted bincount (the doc x token matrix product).
+    """
+    kind = "lexicon"
+
+    def __init__(self):
+        self.name = f"lexicon-{_version('textblob')}-1"
+        self._vocab = None
+
+    def _load(self):
+        from textblob.en import sentiment as lexicon
+        lexicon.load()
+        words, pol, inten, mod = [], [], [], []
+        for w, entries in lexicon.items():
+            if None not in entries:
+                continue
+            p, _, i = entries[None]
+            words.append(w)
+            pol.append(p)
+            inten.append(i)
+            mod.append(any(m in entries for m in lexicon.modifiers))
+        self._vocab = {w: k for k, w in enumerate(words)}
+        self._pol = np.array(pol + [0.0])          # last slot: unknown token
+        self._int = np.array(inten + [1.0])
+        self._mod = np.array(mod + [False])
+        self._negations = set(lexicon.negations)
+
+    def warm(self):
+        if self._vocab is None:
+            self._load()
+
+    def polarities(self, texts):
+        self.warm()
+        texts = [str(t).lower() for t in texts]
+        per_doc = [_TOKEN.findall(t) for t in texts]
+        lengths = np.fromiter((len(t) for t in per_doc), dtype=np.int64, count=len(per_doc))
+        tokens = [tok for toks in per_doc for tok in toks]
+        if not tokens:
+            return [0.0] * len(texts)
+
+        # Vocabulary lookup once per distinct token
+        codes = {}
+        inverse = np.fromiter((codes.setdefault(t, len(codes)) for t in tokens),
+                              dtype=np.int64, count=len(tokens))
+        uniq = list(codes)
+        unknown = len(self._pol) - 1
+        ids = np.array([self._vocab.get(u, unknown) for u in uniq])[inverse]
+        neg = np.array([u in self._negations for u in uniq])[inverse]
+        short = np.array([len(u.strip("'")) <= 1 for u in uniq])[inverse]
+        bang = np.array([u == "!" for u in uniq])[inverse]
+
+        n = len(ids)
+        doc = np.repeat(np.arange(len(texts)), lengths)
+        known = ids != unknown
+        idx = np.arange(n)
+
+        def at(values, j, fill=False):
+            """values[j] where j is a position in the same review, else fill."""
+            ok = (j >= 0) & (j < n)
+            ok[ok] = doc[j[ok]] == doc[ok]
+            out = np.full(n, fill, dtype=np.asarray(values).dtype)
+            out[ok] = values[j[ok]]
+            return out
+
+        # "very good" / "really not good": a modifier is folded into the
+        # known word it precedes, optionally across a negation
+        mod = known & self._mod[ids]
+        mod_prev = at(mod, idx - 1)
+        mod_across_neg = ~mod_prev & at(neg, idx - 1) & at(mod, idx - 2)
+        modified = known & (mod_prev | mod_across_neg)
+        absorbed = mod & (at(known, idx + 1) | (at(neg, idx + 1) & at(known, idx + 2)))
+        mod_pos = np.where(mod_across_neg, idx - 2, idx - 1)
+        factor = np.where(modified, at(self._int[ids], mod_pos, 1.0), 1.0)
+
+        # "not good" / "not a good": a negation before the chunk, across up to
+        # two short words; it also inverts the modifier ("not very good")
+        start = np.where(modified, mod_pos, idx)
+        short_unknown = short & ~known
+        neg_before = (at(neg, start - 1)
+                      | (at(short_unknown, start - 1) & at(neg, start - 2))
+                      | (at(short_unknown, start - 1) & at(short_unknown, start - 2) & at(neg, start - 3)))
+        factor = np.where(neg_before & modified, 1.0 / factor, factor)
+        negated = known & (neg_before | (modified & mod_across_neg))
+        p = np.clip(self._pol[ids] * factor, -1.0, 1.0)
+
+        # Each "!" boosts the latest assessment before it ("good phone!")
+        keep = known & ~absorbed
+        last = np.maximum.accumulate(np.where(keep, idx, -1))
+        target = at(last, idx - 1, -1)
+        hit = bang & (target >= 0)
+        hit[hit] = doc[target[hit]] == doc[hit]
+        boosts = np.bincount(target[hit], minlength=n)
+        p = np.clip(p * 1.25 ** boosts, -1.0, 1.0)
+        p = np.where(negated, p * -0.5, p)
+
+        sums = np.bincount(doc[keep], weights=p[keep], minlength=len(texts))
+        counts = np.bincount(doc[keep], minlength=len(texts))
+        return (sums / np.maximum(counts, 1)).tolist()
+
+
+# ---------- Selection ----------
+_BACKENDS = {"textblob": TextBlobBackend, "lexicon": LexiconBackend}
+_instances = {}
+
+def get_backend(kind: str | None = None):
+    """Returns the (per-process) scorer named by `kind`, or by $URA_SENTIMENT."""
+    kind = (kind or os.environ.get("URA_SENTIMENT") or "textblob").lower()
+    if kind not in _BACKENDS:
+        raise ValueError(f"Unknown sentiment backend {kind!r}; expected one of {sorted(_BACKENDS)}")
+    if kind not in _instances:
+        _instances[kind] = _BACKENDS[kind]()
+    return _instances[kind]
+
+def agreement(texts, label, candidate: str = "lexicon", reference: str = "textblob"):
+    """
+    How often `candidate`'s labels match `reference`'s on `texts`.
+    `label` maps a polarity to a label. Returns {"n", "agree", "rate",
+    "confusion": {(reference_label, candidate_label): count}}.
+    """
+    texts = list(texts)
+    ref = [label(p) for p in get_backend(reference).polarities(texts)]
+    cand = [label(p) for p in get_backend(candidate).polarities(texts)]
+    confusion = {}
+    for pair in zip(ref, cand):
+        confusion[pair] = confusion.get(pair, 0) + 1
+    agree = sum(n for (a, b), n in confusion.items() if a == b)
+    return {"n": len(texts), "agree": agree, "rate": agree / (len(texts) or 1), "confusion": confusion}
@@ -0,0 +1,110 @@
+# src/sentiment_cache.py
+import os, hashlib, sqlite3
+from contextlib import closing
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
+os.makedirs(DATA_DIR, exist_ok=True)
+
+CACHE_PATH = os.path.join(DATA_DIR, "sentiment_cache.sqlite")
+MAX_ENTRIES = 500_000
+
+_SQL_CHUNK = 500  # stays under SQLite's bound-parameter limit
+
+# Process-wide counters; cache_stats() reports them
+_stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+def _text_key(text) -> str:
+    return hashlib.sha1(str(text).encode("utf-8")).hexdigest()
+
+def _open_cache(path: str, version: str):
+    """
+    Opens the cache DB. A stored version that differs from `version`
+    (new scorer, thresholds or TextBlob release) drops every entry.
+    """
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute("CREATE TABLE IF NOT EXISTS meta (k TEXT PRIMARY KEY, v TEXT)")
+    conn.execute("CREATE TABLE IF NOT EXISTS sentiments "
+                 "(key TEXT PRIMARY KEY, label TEXT NOT NULL, used INTEGER NOT NULL)")
+    conn.execute("CREATE INDEX IF NOT EXISTS sentiments_used ON sentiments (used)")
+    row = conn.execute("SELECT v FROM meta WHERE k = 'version'").fetchone()
+    if row is None or row[0] != version:
+        conn.execute("DELETE FROM sentiments")
+        conn.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)", (version,))
+        conn.commit()
+    return conn
+
+def _next_tick(conn) -> int:
+    return (conn.execute("SELECT MAX(used) FROM sentiments").fetchone()[0] or 0) + 1
+
+def _evict(conn, max_entries: int):
+    """Drops least-recently-used entries until the table fits `max_entries`."""
+    over = conn.execute("SELECT COUNT(*) FROM sentiments").fetchone()[0] - max_entries
+    if over > 0:
+        conn.execute("DELETE FROM sentiments WHERE key IN "
+                     "(SELECT key FROM sentiments ORDER BY used LIMIT ?)", (over,))
+        _stats["evictions"] += over
+
+def cached_sentiments(texts, score_many, version: str,
+                      path: str | None = None, max_entries: int = MAX_ENTRIES):
+    """
+    Returns one sentiment label per item of `texts`, in order. Labels are
+    looked up by sha1 of the review text; only misses are passed (once per
+    distinct text) to `score_many`, which must return a label per input.
+    """
+    texts = [str(t) for t in texts]
+    keys = [_text_key(t) for t in texts]
+    unique = dict(zip(keys, texts))
+
+    with closing(_open_cache(path or CACHE_PATH, version)) as conn:
+        found = {}
+        key_list = list(unique)
+        for i in range(0, len(key_list), _SQL_CHUNK):
+            part = key_list[i:i + _SQL_CHUNK]
+            marks = ",".join("?" * len(part))
+            found.update(conn.execute(
+                f"SELECT key, label FROM sentiments WHERE key IN ({marks})", part
+            ).fetchall())
+
+        missing = [k for k in key_list if k not in found]
+        hits = len(key_list) - len(missing)
+        _stats["hits"] += hits
+        _stats["misses"] += len(missing)
+
+        scored = dict(zip(missing, score_many([unique[k] for k in missing]))) if missing else {}
+
+        tick = _next_tick(conn)
+        if hits:
+            conn.executemany("UPDATE sentiments SET used = ? WHERE key = ?",
+                             ((tick, k) for k in found))
+        if scored:
+            conn.executemany("INSERT OR REPLACE INTO sentiments VALUES (?, ?, ?)",
+                             ((k, lbl, tick) for k, lbl in scored.items()))
+            _evict(conn, max_entries)
+        conn.commit()
+
+    found.update(scored)
+    return [found[k] for k in keys]
+
+def cache_stats(path: str | None = None) -> dict:
+    """Hit/miss/eviction counters for this process plus the on-disk entry count."""
+    stats = dict(_stats)
+    total = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = round(stats["hits"] / total, 4) if total else 0.0
+    path = path or CACHE_PATH
+    stats["entries"] = 0
+    if os.path.exists(path):
+        with closing(sqlite3.connect(path)) as conn:
+            try:
+                stats["entries"] = conn.execute("SELECT COUNT(*) FROM sentiments").fetchone()[0]
+            except sqlite3.Error:
+                pass
+    return stats
+
+def clear_cache(path: str | None = None):
+    """Removes the cache file and resets the counters."""
+    path = path or CACHE_PATH
+    for p in (path, path + "-journal"):
+        if os.path.exists(p):
+            os.remove(p)
+    for k in _stats:
+        _stats[k] = 0
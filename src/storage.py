@@ -0,0 +1,503 @@
+# src/storage.py
+"""
+Pluggable storage for the collected and analyzed review tables.
+
+    csv      data/collected_reviews.csv + data/analyzed_reviews.csv (default);
+             per-product reads go through a byte-range index (row_index.py)
+    parquet  data/parquet/{collected,analyzed}/product_key=<key>/date=<yyyy-mm-dd>/
+
+Pick one with URA_STORAGE=csv|parquet. The parquet backend keeps
+pros/cons/improvements as native list columns and prunes partitions
+on product, so a per-product read only opens that product's files.
+It needs pyarrow (optional dependency).
+
+Writes go through store.writer(table): an exclusive lock shared by threads
+and processes, held while the caller decides what is new and appends it.
+CSV batches are journaled (<table>.csv.journal) so a crash never leaves
+a torn or half-committed batch; parquet batches are staged under a
+hidden directory and moved into place.
+
+Each CSV batch is fsynced twice (journal, then table) before the caller
+commits its index; for small batches that is a large share of the write.
+URA_FSYNC=0 skips those fsyncs. A killed process is still recovered
+cleanly, since the page cache survives it; an OS crash or power cut may
+lose or tear the last batches. Use it for bulk loads that can be re-run.
+
+Migrate existing CSVs with:  python -m src.storage migrate
+"""
+import os, ast, re, io, json, uuid, shutil, hashlib, argparse
+from contextlib import contextmanager
+from datetime import datetime, timezone
+import pandas as pd
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
+os.makedirs(DATA_DIR, exist_ok=True)
+
+COLLECTED_CSV = os.path.join(DATA_DIR, "collected_reviews.csv")
+ANALYZED_CSV  = os.path.join(DATA_DIR, "analyzed_reviews.csv")
+PARQUET_DIR   = os.path.join(DATA_DIR, "parquet")
+
+COLLECTED_COLUMNS = ["Product", "Site", "URL", "Review"]
+ANALYZED_COLUMNS  = ["product", "review", "sentiment", "pros", "cons", "improvements", "verdict"]
+LIST_COLUMNS      = ["pros", "cons", "improvements"]
+
+_MAX_KEY_LEN = 64  # keeps partition directory names within filesystem limits
+FSYNC = os.environ.get("URA_FSYNC", "1").lower() not in ("0", "false", "no", "off")
+
+def product_key(name) -> str:
+    """Normalized product name used for filtering and partition directories."""
+    key = re.sub(r"[^a-z0-9]+", "_", str(name).strip().lower()).strip("_") or "_"
+    if len(key) > _MAX_KEY_LEN:
+        key = key[:_MAX_KEY_LEN - 9] + "_" + hashlib.sha1(key.encode("utf-8")).hexdigest()[:8]
+    return key
+
+def _parse_list(cell):
+    if isinstance(cell, list):
+        return cell
+    if not isinstance(cell, str) or not cell.strip():
+        return []
+    try:
+        val = ast.literal_eval(cell)
+    except (ValueError, SyntaxError):
+        return []
+    return [str(v) for v in val] if isinstance(val, (list, tuple)) else []
+
+# ---------- Locking & journal ----------
+@contextmanager
+def file_lock(path: str):
+    """Exclusive lock on `path` + ".lock", across threads and processes."""
+    with open(path + ".lock", "a+b") as f:
+        if os.name == "nt":
+            import msvcrt
+            while True:
+                try:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue   # LK_LOCK gives up after ~10 s; keep waiting
+        else:
+            import fcntl
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if os.name == "nt":
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+def _sync(f):
+    f.flush()
+    if FSYNC:
+        os.fsync(f.fileno())
+
+def _recover_csv(path: str, committed=None):
+    """
+    Resolves a journal left by a writer that died mid-batch. The batch is
+    kept (rewritten in full) if the journal is complete and committed(txn)
+    says the caller's index recorded it, else cut off. Without a predicate
+    a complete journal counts as committed. Returns {"txn", "committed"}
+    or None when there was nothing to do.
+    """
+    journal = path + ".journal"
+    try:
+        with open(journal, "rb") as f:
+            meta = json.loads(f.readline())
+            data = f.read()
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError):
+        os.remove(journal)     # died while writing the journal: the table was not touched
+        return None
+
+    complete = len(data) == meta["length"] and hashlib.sha1(data).hexdigest() == meta["sha1"]
+    keep = complete and (committed is None or bool(committed(meta["txn"])))
+    size = os.path.getsize(path) if os.path.exists(path) else 0
+    # Anything past the batch was appended without the lock; leave the file alone then
+    if size <= meta["size"] + meta["length"]:
+        with open(path, "r+b" if os.path.exists(path) else "w+b") as f:
+            f.truncate(meta["size"])
+            if keep:
+                f.seek(meta["size"])
+                f.write(data)
+            _sync(f)
+    os.remove(journal)
+    return {"txn": meta["txn"], "committed": keep}
+
+def record_txn(conn, txn: str):
+    """Marks batch `txn` as committed in a caller's SQLite index (commit with the index update)."""
+    conn.execute("CREATE TABLE IF NOT EXISTS meta (k TEXT PRIMARY KEY, v TEXT)")
+    conn.execute("INSERT OR REPLACE INTO meta VALUES ('last_txn', ?)", (txn,))
+
+def txn_committed(conn, txn: str) -> bool:
+    """Writers commit one batch at a time under the lock, so the last id is enough."""
+    try:
+        row = conn.execute("SELECT v FROM meta WHERE k = 'last_txn'").fetchone()
+    except Exception:
+        return False
+    return bool(row) and row[0] == txn
+
+class CsvWriter:
+    """
+    One locked write session on a CSV table; see CsvStore.writer.
+
+        with store.writer("collected", committed=fn) as w:
+            ...decide what is new...
+            txn = w.append(df)        # at most one batch per session
+            ...record txn in the caller's index and commit...
+
+    The batch is journaled before it is appended. Leaving the block
+    removes the journal; after an exception, or at the next session after
+    a crash, the batch is kept only if committed(txn) is true. When the
+    block raises after the batch was committed (e.g. the caller's
+    follow-up aggregate update failed) the journal is left in place, so
+    the next session reports the batch in .recovered and can catch up.
+    """
+    def __init__(self, path: str, columns, committed=None):
+        self.path = path
+        self.columns = list(columns)
+        self.committed = committed
+        self.recovered = None
+        self._lock = None
+        self._txn = None
+
+    def __enter__(self):
+        self._lock = file_lock(self.path)
+        self._lock.__enter__()
+        try:
+            self.recovered = _recover_csv(self.path, self.committed)
+        except BaseException:
+            self._lock.__exit__(None, None, None)
+            raise
+        return self
+
+    def append(self, df: pd.DataFrame):
+        """Appends `df` atomically; returns the batch's txn id (None if empty)."""
+        if df.empty:
+            return None
+        if self._txn:
+            raise RuntimeError("one batch per writer session")
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        columns = self.columns
+        if size:
+            # Follow the file's own column order (older files differ)
+            existing = list(pd.read_csv(self.path, nrows=0).columns)
+            if set(existing) == set(columns):
+                columns = existing
+        buf = io.StringIO()
+        df[columns].to_csv(buf, header=not size, index=False)
+        data = buf.getvalue().encode("utf-8")
+
+        self._txn = uuid.uuid4().hex
+        meta = {"txn": self._txn, "size": size, "length": len(data),
+                "sha1": hashlib.sha1(data).hexdigest()}
+        with open(self.path + ".journal", "wb") as f:
+            f.write(json.dumps(meta).encode("utf-8") + b"\n" + data)
+            _sync(f)
+        with open(self.path, "ab") as f:
+            f.write(data)
+            _sync(f)
+        return self._txn
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                if self._txn and os.path.exists(self.path + ".journal"):
+                    os.remove(self.path + ".journal")
+            elif not (self._txn and self.committed and self.committed(self._txn)):
+                _recover_csv(self.path, self.committed)
+        finally:
+            self._lock.__exit__(None, None, None)
+        return False
+
+# ---------- CSV ----------
+class CsvStore:
+    name = "csv"
+
+    def __init__(self, collected_path: str | None = None, analyzed_path: str | None = None):
+        self.collected_path = collected_path or COLLECTED_CSV
+        self.analyzed_path = analyzed_path or ANALYZED_CSV
+
+    @staticmethod
+    def _read(path, columns, product, product_col):
+        if not os.path.exists(path) or not os.path.getsize(path):
+            return pd.DataFrame(columns=columns or [])
+        if product:
+            # Seeks to the product's rows via the byte-range index (row_index.py)
+            from src import row_index
+            return row_index.read_product(path, product, columns, product_col)
+        usecols = list(columns) if columns else None
+        df = pd.read_csv(path, usecols=usecols)
+        return df[list(columns)] if columns else df
+
+    def writer(self, table: str, committed=None):
+        """A locked, journaled write session on "collected" or "analyzed" (see CsvWriter)."""
+        if table == "collected":
+            return CsvWriter(self.collected_path, COLLECTED_COLUMNS, committed)
+        if table == "analyzed":
+            return CsvWriter(self.analyzed_path, ANALYZED_COLUMNS, committed)
+        raise ValueError(f"Unknown table {table!r}")
+
+    def read_collected(self, product: str | None = None, columns=None) -> pd.DataFrame:
+        return self._read(self.collected_path, columns, product, "Product")
+
+    def iter_collected(self, product: str | None = None, chunksize: int = 50_000):
+        """Collected rows in bounded-size DataFrames, optionally for one product."""
+        if not os.path.exists(self.collected_path) or not os.path.getsize(self.collected_path):
+            return
+        if product:
+            df = self.read_collected(product)
+            for i in range(0, len(df), chunksize):
+                yield df.iloc[i:i + chunksize]
+            return
+        yield from pd.read_csv(self.collected_path, chunksize=chunksize)
+
+    def append_collected(self, df: pd.DataFrame):
+        with self.writer("collected") as w:
+            w.append(df)
+
+    def read_analyzed(self, product: str | None = None, columns=None) -> pd.DataFrame:
+        df = self._read(self.analyzed_path, columns, product, "product")
+        for col in LIST_COLUMNS:
+            if col in df.columns:
+                df[col] = df[col].map(_parse_list)
+        return df
+
+    def iter_analyzed(self, columns, chunksize: int = 50_000):
+        if not os.path.exists(self.analyzed_path) or not os.path.getsize(self.analyzed_path):
+            return
+        yield from pd.read_csv(self.analyzed_path, usecols=list(columns), dtype=str,
+                               keep_default_na=False, chunksize=chunksize)
+
+    def append_analyzed(self, df: pd.DataFrame):
+        # Lists are written as their repr, which read_analyzed parses back
+        with self.writer("analyzed") as w:
+            w.append(df)
+
+# ---------- Parquet ----------
+class ParquetStore:
+    name = "parquet"
+
+    def __init__(self, root: str | None = None):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError as e:
+            raise ImportError("URA_STORAGE=parquet needs pyarrow: pip install pyarrow") from e
+        self.root = root = root or PARQUET_DIR
+        self.collected_dir = os.path.join(root, "collected")
+        self.analyzed_dir = os.path.join(root, "analyzed")
+
+    @staticmethod
+    def _schema(kind):
+        import pyarrow as pa
+        if kind == "collected":
+            fields = [(c, pa.string()) for c in COLLECTED_COLUMNS]
+        else:
+            fields = [(c, pa.list_(pa.string()) if c in LIST_COLUMNS else pa.string())
+                      for c in ANALYZED_COLUMNS]
+        return pa.schema(fields + [("product_key", pa.string()), ("date", pa.string())])
+
+    def _write(self, base, df, columns, product_col, kind):
+        """Writes `df` as new files under `base` (a staging dir when called by ParquetWriter)."""
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+        if df.empty:
+            return
+        out = df[columns].copy()
+        for col in columns:
+            if col in LIST_COLUMNS:
+                out[col] = out[col].map(_parse_list)
+            else:
+                out[col] = out[col].astype(str)
+        out["product_key"] = out[product_col].map(product_key)
+        out["date"] = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+        table = pa.Table.from_pandas(out, schema=self._schema(kind), preserve_index=False)
+        ds.write_dataset(
+            table, base, format="parquet",
+            partitioning=["product_key", "date"], partitioning_flavor="hive",
+            basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+            existing_data_behavior="overwrite_or_ignore",
+        )
+
+    def _dataset(self, base, kind):
+        import pyarrow.dataset as ds
+        if not os.path.isdir(base):
+            return None
+        return ds.dataset(base, format="parquet", partitioning="hive", schema=self._schema(kind))
+
+    def _read(self, base, kind, product, columns, all_columns):
+        import pyarrow.dataset as ds
+        dataset = self._dataset(base, kind)
+        columns = list(columns or all_columns)
+        if dataset is None:
+            return pd.DataFrame(columns=columns)
+        flt = (ds.field("product_key") == product_key(product)) if product else None
+        return dataset.to_table(columns=columns, filter=flt).to_pandas()
+
+    def read_collected(self, product: str | None = None, columns=None) -> pd.DataFrame:
+        return self._read(self.collected_dir, "collected", product, columns, COLLECTED_COLUMNS)
+
+    def iter_collected(self, product: str | None = None, chunksize: int = 50_000):
+        import pyarrow.dataset as ds
+        dataset = self._dataset(self.collected_dir, "collected")
+        if dataset is None:
+            return
+        flt = (ds.field("product_key") == product_key(product)) if product else None
+        for batch in dataset.to_batches(columns=COLLECTED_COLUMNS, filter=flt, batch_size=chunksize):
+            yield batch.to_pandas()
+
+    def writer(self, table: str, committed=None):
+        """A locked write session on "collected" or "analyzed" (see ParquetWriter)."""
+        if table not in ("collected", "analyzed"):
+            raise ValueError(f"Unknown table {table!r}")
+        return ParquetWriter(self, table, committed)
+
+    def append_collected(self, df: pd.DataFrame):
+        with self.writer("collected") as w:
+            w.append(df)
+
+    def read_analyzed(self, product: str | None = None, columns=None) -> pd.DataFrame:
+        df = self._read(self.analyzed_dir, "analyzed", product, columns, ANALYZED_COLUMNS)
+        for col in LIST_COLUMNS:
+            if col in df.columns:
+                df[col] = df[col].map(lambda v: [] if v is None else list(v))
+        return df
+
+    def iter_analyzed(self, columns, chunksize: int = 50_000):
+        dataset = self._dataset(self.analyzed_dir, "analyzed")
+        if dataset is None:
+            return
+        for batch in dataset.to_batches(columns=list(columns), batch_size=chunksize):
+            yield batch.to_pandas()
+
+    def append_analyzed(self, df: pd.DataFrame):
+        with self.writer("analyzed") as w:
+            w.append(df)
+
+class ParquetWriter:
+    """
+    Locked write session on one parquet table, same contract as CsvWriter.
+    append() writes the batch under <table>/_staging-<txn>/ (pyarrow skips
+    "_" paths when reading); leaving the block moves its files into place.
+    A staging dir left by a crash is moved in if committed(txn), or if
+    there is no predicate and the batch was fully written; else deleted.
+    A committed batch whose block raised is published but leaves an empty
+    staging dir behind, reported in the next session's .recovered.
+    """
+    def __init__(self, store: ParquetStore, table: str, committed=None):
+        self.store = store
+        self.table = table
+        self.base = store.collected_dir if table == "collected" else store.analyzed_dir
+        self.committed = committed
+        self.recovered = None
+        self._lock = None
+        self._txn = None
+
+    def _staging(self, txn):
+        return os.path.join(self.base, f"_staging-{txn}")
+
+    def _publish(self, txn):
+        staging = self._staging(txn)
+        for dirpath, _, files in os.walk(staging):
+            for name in files:
+                if name.startswith("."):
+                    continue
+                src = os.path.join(dirpath, name)
+                dst = os.path.join(self.base, os.path.relpath(src, staging))
+                os.makedirs(os.path.dirname(dst), exist_ok=True)
+                os.replace(src, dst)
+        shutil.rmtree(staging, ignore_errors=True)
+
+    def _recover(self):
+        for name in sorted(os.listdir(self.base)):
+            if not name.startswith("_staging-"):
+                continue
+            txn = name[len("_staging-"):]
+            complete = os.path.exists(os.path.join(self.base, name, ".complete"))
+            if complete and (self.committed is None or self.committed(txn)):
+                self._publish(txn)
+                self.recovered = {"txn": txn, "committed": True}
+            else:
+                shutil.rmtree(os.path.join(self.base, name), ignore_errors=True)
+                self.recovered = {"txn": txn, "committed": False}
+
+    def __enter__(self):
+        os.makedirs(self.base, exist_ok=True)
+        self._lock = file_lock(self.base)
+        self._lock.__enter__()
+        try:
+            self._recover()
+        except BaseException:
+            self._lock.__exit__(None, None, None)
+            raise
+        return self
+
+    def append(self, df: pd.DataFrame):
+        if df.empty:
+            return None
+        if self._txn:
+            raise RuntimeError("one batch per writer session")
+        self._txn = txn = uuid.uuid4().hex
+        staging = self._staging(txn)
+        if self.table == "collected":
+            self.store._write(staging, df, COLLECTED_COLUMNS, "Product", "collected")
+        else:
+            self.store._write(staging, df, ANALYZED_COLUMNS, "product", "analyzed")
+        open(os.path.join(staging, ".complete"), "wb").close()
+        return txn
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if self._txn:
+                if exc_type is None or (self.committed and self.committed(self._txn)):
+                    self._publish(self._txn)
+                    if exc_type is not None:
+                        staging = self._staging(self._txn)
+                        os.makedirs(staging, exist_ok=True)
+                        open(os.path.join(staging, ".complete"), "wb").close()
+                else:
+                    shutil.rmtree(self._staging(self._txn), ignore_errors=True)
+        finally:
+            self._lock.__exit__(None, None, None)
+        return False
+
+# ---------- Selection ----------
+_BACKENDS = {"csv": CsvStore, "parquet": ParquetStore}
+
+def get_store(kind: str | None = None):
+    """Returns the backend named by `kind`, or by $URA_STORAGE (default csv)."""
+    kind = (kind or os.environ.get("URA_STORAGE") or "csv").lower()
+    if kind not in _BACKENDS:
+        raise ValueError(f"Unknown storage backend {kind!r}; expected one of {sorted(_BACKENDS)}")
+    return _BACKENDS[kind]()
+
+def migrate(src: str = "csv", dst: str = "parquet", chunksize: int = 50_000):
+    """Copies both tables from one backend to another; returns row counts."""
+    source, target = get_store(src), get_store(dst)
+    if not isinstance(source, CsvStore):
+        raise ValueError("Only csv -> parquet migration is supported")
+    counts = {"collected": 0, "analyzed": 0}
+    if os.path.exists(source.collected_path) and os.path.getsize(source.collected_path):
+        for chunk in pd.read_csv(source.collected_path, dtype=str,
+                                 keep_default_na=False, chunksize=chunksize):
+            target.append_collected(chunk)
+            counts["collected"] += len(chunk)
+    for chunk in source.iter_analyzed(ANALYZED_COLUMNS, chunksize):
+        target.append_analyzed(chunk)
+        counts["analyzed"] += len(chunk)
+    return counts
+
+def main():
+    ap = argparse.ArgumentParser(description="URA storage tools")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    m = sub.add_parser("migrate", help="copy the CSV stores into the parquet store")
+    m.add_argument("--chunksize", type=int, default=50_000)
+    args = ap.parse_args()
+    if args.cmd == "migrate":
+        counts = migrate(chunksize=args.chunksize)
+        print(f"✅ Migrated {counts['collected']} collected and {counts['analyzed']} analyzed rows to {PARQUET_DIR}")
+
+if __name__ == "__main__":
+    main()
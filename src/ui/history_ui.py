@@ -1,12 +1,15 @@
 # src/ui/history_ui.py
 import tkinter as tk
 from tkinter import scrolledtext, messagebox
-import pandas as pd
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import webbrowser
 
-from src.fetch import get_product_info
+from src.fetch import fetch_product_info, to_photo_images
+from src.analyze_reviews import product_summary
+from src.storage import get_store
+from src.ui.tasks import TaskRunner
+from src import metrics
 
 
 def open_history_ui(parent):
@@ -51,70 +54,78 @@ def open_history_ui(parent):
     chart_frame = tk.Frame(root)
     chart_frame.pack(pady=10)
 
-    # ---------------- Functions ----------------
-    def load_history():
-        # Clear old
-        review_box.delete("1.0", tk.END)
-        verdict_label.config(text="")
-        pros_label.config(text="Pros: ")
-        cons_label.config(text="Cons: ")
-        product_label.config(text="")
-        buy_button.config(state="disabled")
-        for widget in image_frame.winfo_children():
-            widget.destroy()
-        for widget in chart_frame.winfo_children():
-            widget.destroy()
-
-        try:
-            df = pd.read_csv("data/analyzed_reviews.csv")
-            if df.empty:
-                messagebox.showinfo("No Data", "History is empty!")
-                return
+    tasks = TaskRunner(root)
+    root.protocol("WM_DELETE_WINDOW", lambda: [tasks.shutdown(), root.destroy()])
 
-            # Show latest analysis
-            latest = df.iloc[-1]
-            product = latest["product"]
-            verdict = latest["verdict"]
-
-            # ---- Product info ----
-            info = get_product_info(product, max_images=3)
-
-            if info["images"]:
-                for i, img in enumerate(info["images"]):
-                    tk.Label(image_frame, image=img).grid(row=0, column=i, padx=5)
-                    image_frame.image = info["images"]
-
-            product_label.config(text=info["name"])
-            if info["buy_url"]:
-                buy_button.config(state="normal", command=lambda: webbrowser.open(info["buy_url"]))
-
-            # ---- Reviews ----
-            review_box.insert(tk.END, f"📦 Product: {product}\n\n")
-            reviews = df[df["product"] == product]["review"].tolist()
-            for r in reviews:
-                review_box.insert(tk.END, f"- {r}\n\n")
-
-            # ---- Verdict ----
-            verdict_label.config(text=f"Final Verdict: {verdict}", fg="green" if "Positive" in verdict else "red")
-
-            # ---- Pros & Cons ----
-            pros_label.config(text=f"Pros: {', '.join(eval(latest['pros'])) if latest['pros'] != '[]' else 'None'}")
-            cons_label.config(text=f"Cons: {', '.join(eval(latest['cons'])) if latest['cons'] != '[]' else 'None'}")
-
-            # ---- Sentiment chart ----
-            sentiment_counts = df["sentiment"].value_counts()
+    # ---------------- Functions ----------------
+    # Workers (run off the Tk thread)
+    def read_history(job):
+        summary = product_summary()
+        if summary is None:
+            return None, None
+        return summary, get_store().read_analyzed(summary["product"], columns=["review"])
+
+    def fetch_info(job, product):
+        return fetch_product_info(product, max_images=3)
+
+    # Callbacks (run on the Tk thread)
+    def show_history(result):
+        summary, df = result
+        if summary is None:
+            messagebox.showinfo("No Data", "History is empty!")
+            return
+
+        # Show latest analysis
+        product = summary["product"]
+        verdict = summary["verdict"]
+
+        # ---- Product info (images + buy link arrive separately) ----
+        product_label.config(text=product)
+        tasks.submit(fetch_info, product, on_done=show_info)
+
+        # ---- Reviews ----
+        review_box.insert(tk.END, f"📦 Product: {product}\n\n")
+        for r in df["review"].tolist():
+            review_box.insert(tk.END, f"- {r}\n\n")
+
+        # ---- Verdict ----
+        verdict_label.config(text=f"Final Verdict: {verdict}", fg="green" if "Positive" in verdict else "red")
+
+        # ---- Pros & Cons ----
+        pros_label.config(text=f"Pros: {', '.join(summary['pros']) if summary['pros'] else 'None'}")
+        cons_label.config(text=f"Cons: {', '.join(summary['cons']) if summary['cons'] else 'None'}")
+
+        # ---- Sentiment chart (this product only) ----
+        sentiment_counts = {k: v for k, v in summary["sentiment_counts"].items() if v}
+        with metrics.span("ui.chart"):
             fig, ax = plt.subplots(figsize=(4, 3))
-            ax.pie(sentiment_counts, labels=sentiment_counts.index, autopct='%1.1f%%', startangle=90)
+            ax.pie(sentiment_counts.values(), labels=sentiment_counts.keys(), autopct='%1.1f%%', startangle=90)
             ax.set_title("Sentiment Breakdown")
 
             chart = FigureCanvasTkAgg(fig, master=chart_frame)
             chart.get_tk_widget().pack()
             chart.draw()
 
-        except Exception as e:
-            messagebox.showerror("Error", f"Could not load history: {e}")
+    def show_info(info):
+        images = to_photo_images(info["thumbnails"])
+        if images:
+            for i, img in enumerate(images):
+                tk.Label(image_frame, image=img).grid(row=0, column=i, padx=5)
+            image_frame.image = images
+
+        product_label.config(text=info["name"])
+        if info["buy_url"]:
+            buy_button.config(state="normal", command=lambda: webbrowser.open(info["buy_url"]))
+
+    def show_error(e):
+        messagebox.showerror("Error", f"Could not load history: {e}")
+
+    def load_history():
+        clear_screen()
+        tasks.submit(read_history, on_done=show_history, on_error=show_error)
 
     def clear_screen():
+        tasks.cancel_all()
         review_box.delete("1.0", tk.END)
         verdict_label.config(text="")
         pros_label.config(text="Pros: ")
@@ -126,13 +137,19 @@ def open_history_ui(parent):
         for widget in chart_frame.winfo_children():
             widget.destroy()
 
+    def go_back_home():
+        tasks.shutdown()
+        root.destroy()
+        from src.ui.home_ui import open_home_ui  # lazy, avoids a circular import
+        open_home_ui()
+
     # ---------------- Buttons ----------------
     btn_frame = tk.Frame(root)
     btn_frame.pack(pady=10)
 
     tk.Button(btn_frame, text="Refresh", command=load_history, width=14).grid(row=0, column=0, padx=10)
     tk.Button(btn_frame, text="Clear", command=clear_screen, width=14).grid(row=0, column=1, padx=10)
-    tk.Button(btn_frame, text="Back", command=lambda: [root.destroy(), __import__('home_ui').home_ui.open_home_ui()]).grid(row=0, column=2, padx=10)
+    tk.Button(btn_frame, text="Back", command=go_back_home).grid(row=0, column=2, padx=10)
 
     load_history()
     root.mainloop()
@@ -1,18 +1,95 @@
 # src/ui/home_ui.py
+"""
+Home screen, built for a fast first frame:
+
+- Only tkinter is imported up front. The fetch/analysis stack (pandas,
+  PIL, ddgs, matplotlib, TextBlob) is imported on a worker thread after
+  the window is drawn, and each screen's module on first use.
+- Trending cards are drawn straight away from the snapshot saved by the
+  last session (data/home_snapshot/), then replaced card by card as fresh
+  info arrives. Nothing on the Tk thread waits on the network.
+"""
+import os, json, hashlib, importlib, webbrowser
 import tkinter as tk
-from src.ui.review_ui import open_review_ui
-from src.ui.history_ui import open_history_ui
-from src.ui.random_ui import open_random_ui
-from src.fetch import get_trending_products, get_product_info
-import webbrowser
-
-
-def open_home_ui():
-    root = tk.Tk()
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from src.ui.tasks import TaskRunner
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "data")
+SNAPSHOT_DIR = os.path.join(DATA_DIR, "home_snapshot")
+TRENDING_CARDS = 6
+CARD_COLUMNS = 3
+# Loaded in the background once trending is in, so the first click is quick
+_PRELOAD = ["src.analyze_reviews", "src.ui.review_ui", "src.ui.history_ui", "src.ui.random_ui"]
+
+
+# ---------- Snapshot ----------
+def load_snapshot():
+    """Cards from the last session: [{"name", "buy_url", "thumb"}] (thumb is a PNG path or None)."""
+    try:
+        with open(os.path.join(SNAPSHOT_DIR, "index.json"), "r", encoding="utf-8") as f:
+            cards = json.load(f)["cards"]
+    except (OSError, ValueError, KeyError):
+        return []
+    for c in cards:
+        c["thumb"] = os.path.join(SNAPSHOT_DIR, c["thumb"]) if c.get("thumb") else None
+    return cards
+
+def save_snapshot(infos):
+    """Writes fetch_product_info results (first thumbnail only) for the next startup."""
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    cards, keep = [], {"index.json"}
+    for info in infos:
+        thumb = None
+        if info["thumbnails"]:
+            thumb = hashlib.sha1(info["name"].encode("utf-8")).hexdigest()[:16] + ".png"
+            try:
+                info["thumbnails"][0].save(os.path.join(SNAPSHOT_DIR, thumb), "PNG")
+                keep.add(thumb)
+            except (OSError, ValueError):
+                thumb = None
+        cards.append({"name": info["name"], "buy_url": info["buy_url"], "thumb": thumb})
+    tmp = os.path.join(SNAPSHOT_DIR, "index.json.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"cards": cards}, f)
+    os.replace(tmp, os.path.join(SNAPSHOT_DIR, "index.json"))
+    for name in os.listdir(SNAPSHOT_DIR):
+        if name not in keep and name.endswith(".png"):
+            try:
+                os.remove(os.path.join(SNAPSHOT_DIR, name))
+            except OSError:
+                pass
+
+
+def _snapshot_image(path):
+    """Tk reads PNG natively, so snapshot cards need no PIL."""
+    if not path:
+        return None
+    try:
+        return tk.PhotoImage(file=path)
+    except tk.TclError:
+        return None
+
+
+# ---------- Screens ----------
+def _open_screen(name: str, parent, **kwargs):
+    """Imports src.ui.<name> on first use and opens it in place of `parent`."""
+    module = importlib.import_module(f"src.ui.{name}")
+    getattr(module, f"open_{name}")(parent, **kwargs)
+
+
+def build_home_ui(root):
+    """Lays out the home screen on `root`; trending cards fill in asynchronously."""
     root.title("🏠 URA – Universal Review Analyzer")
     root.geometry("1000x700")
     root.configure(bg="#f4f4f4")
 
+    tasks = TaskRunner(root)
+    root.protocol("WM_DELETE_WINDOW", lambda: [tasks.shutdown(), root.destroy()])
+
+    def open_screen(name, **kwargs):
+        tasks.shutdown()
+        _open_screen(name, root, **kwargs)
+
     # ---- Title ----
     tk.Label(
         root,
@@ -33,55 +110,93 @@ def open_home_ui():
 
     trending_frame = tk.Frame(root, bg="#f4f4f4")
     trending_frame.pack(pady=20)
+    cards = {}   # grid index -> card frame
 
-    trending = get_trending_products(limit=6)
-
-    def display_product_card(idx=0, row=0, col=0):
-        if idx >= len(trending):
-            return
-
-        product = trending[idx]
-        info = get_product_info(product, max_images=1)
-
+    def display_product_card(idx, name, buy_url, image):
+        if idx in cards:
+            cards.pop(idx).destroy()
         card = tk.Frame(trending_frame, bg="white", relief="groove", bd=2)
-        card.grid(row=row, column=col, padx=15, pady=15)
+        card.grid(row=idx // CARD_COLUMNS, column=idx % CARD_COLUMNS, padx=15, pady=15)
+        cards[idx] = card
 
         # Image
-        if info["images"]:
-            img_label = tk.Label(card, image=info["images"][0], bg="white")
-            img_label.image = info["images"][0]
+        if image:
+            img_label = tk.Label(card, image=image, bg="white")
+            img_label.image = image
             img_label.pack(padx=10, pady=10)
 
         # Name
-        tk.Label(card, text=info["name"], font=("Arial", 12, "bold"), bg="white").pack(pady=5)
+        tk.Label(card, text=name, font=("Arial", 12, "bold"), bg="white").pack(pady=5)
 
         # Buttons
         btn_frame = tk.Frame(card, bg="white")
         btn_frame.pack(pady=5)
 
-        if info["buy_url"]:
+        if buy_url:
             tk.Button(
                 btn_frame, text="🛒 Buy", width=10,
-                command=lambda u=info["buy_url"]: webbrowser.open(u)
+                command=lambda u=buy_url: webbrowser.open(u)
             ).grid(row=0, column=0, padx=5)
 
         tk.Button(
             btn_frame, text="🔍 Analyze", width=10,
-            command=lambda p=info["name"]: [root.destroy(), open_review_ui_with_product(p)]
+            command=lambda p=name: open_screen("review_ui", product_name=p)
         ).grid(row=0, column=1, padx=5)
 
-        # Compute next row/col
-        next_col = col + 1
-        next_row = row
-        if next_col >= 3:
-            next_col = 0
-            next_row += 1
-
-        # Schedule next card with delay (animation effect)
-        root.after(400, lambda: display_product_card(idx + 1, next_row, next_col))
-
-    # Start showing trending products one by one
-    display_product_card()
+    # Last session's cards first; a placeholder on the very first run
+    snapshot = load_snapshot()[:TRENDING_CARDS]
+    for i, c in enumerate(snapshot):
+        display_product_card(i, c["name"], c["buy_url"], _snapshot_image(c["thumb"]))
+    loading = None
+    if not snapshot:
+        loading = tk.Label(trending_frame, text="⏳ Loading trending products...",
+                           font=("Arial", 12), bg="#f4f4f4", fg="#555")
+        loading.grid(row=0, column=0, columnspan=CARD_COLUMNS)
+
+    # Worker (runs off the Tk thread; the heavy imports happen here)
+    def load_trending(job):
+        from src.fetch import get_trending_products, fetch_product_info
+        products = get_trending_products(limit=TRENDING_CARDS)
+        infos = [None] * len(products)
+        with ThreadPoolExecutor(max_workers=max(1, len(products))) as pool:
+            futures = {pool.submit(fetch_product_info, p, 1): i for i, p in enumerate(products)}
+            for f in as_completed(futures):
+                if job.cancelled:
+                    return None
+                i = futures[f]
+                try:
+                    infos[i] = f.result()
+                except Exception:
+                    infos[i] = {"name": products[i], "buy_url": None, "thumbnails": []}
+                job.progress(i, infos[i])
+        try:
+            save_snapshot(infos)
+        except OSError:
+            pass
+        for module in _PRELOAD:
+            if job.cancelled:
+                break
+            importlib.import_module(module)
+        return len(infos)
+
+    # Callbacks (run on the Tk thread)
+    def show_card(idx, info):
+        if loading is not None:
+            loading.destroy()
+        from src.fetch import to_photo_images   # already imported by the worker
+        images = to_photo_images(info["thumbnails"][:1])
+        display_product_card(idx, info["name"], info["buy_url"], images[0] if images else None)
+
+    def finish_cards(count):
+        for idx in [i for i in cards if i >= count]:
+            cards.pop(idx).destroy()
+        if loading is not None and not count:
+            loading.config(text="No trending products found.")
+
+    def trending_failed(e):
+        # Cards already on screen (snapshot or partial results) are kept
+        if loading is not None and loading.winfo_exists():
+            loading.config(text=f"⚠️ Could not load trending products: {e}", fg="red")
 
     # ---- Footer Buttons ----
     btn_frame = tk.Frame(root, bg="#f4f4f4")
@@ -101,9 +216,9 @@ def open_home_ui():
             command=command
         ).grid(row=0, column=col, padx=20)
 
-    styled_button("📦 Product Review", lambda: open_review_ui(root), 0)
-    styled_button("📜 History", lambda: open_history_ui(root), 1)
-    styled_button("🎲 Random Product", lambda: open_random_ui(root), 2)
+    styled_button("📦 Product Review", lambda: open_screen("review_ui"), 0)
+    styled_button("📜 History", lambda: open_screen("history_ui"), 1)
+    styled_button("🎲 Random Product", lambda: open_screen("random_ui"), 2)
 
     # ---- Footer ----
     tk.Label(
@@ -114,15 +229,23 @@ def open_home_ui():
         fg="#777"
     ).pack(side="bottom", pady=10)
 
+    # Start fetching only once the first frame is on screen
+    root.after_idle(lambda: tasks.submit(load_trending, on_progress=show_card,
+                                         on_done=finish_cards, on_error=trending_failed))
+    return tasks
+
+
+def open_home_ui():
+    root = tk.Tk()
+    build_home_ui(root)
     root.mainloop()
 
 
-def open_review_ui_with_product(product_name):
+def open_review_ui_with_product(product_name, parent=None):
     """
     Helper: open review UI with prefilled product name
     """
-    import src.ui.review_ui as review_ui
-    review_ui.open_review_ui(None, product_name=product_name)
+    _open_screen("review_ui", parent, product_name=product_name)
 
 
 if __name__ == "__main__":
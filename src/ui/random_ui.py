@@ -7,8 +7,11 @@ from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import webbrowser
 import random
 
-from src.fetch import get_trending_products, get_product_info, fetch_and_save_reviews
-from src.analyze_reviews import analyze_reviews
+from src.fetch import get_trending_products, fetch_product_info, to_photo_images, fetch_and_save_reviews
+from src.analyze_reviews import analyze_product, product_summary
+from src.aggregates import summarize
+from src.ui.tasks import TaskRunner
+from src import metrics
 
 
 def open_random_ui(parent):
@@ -53,72 +56,95 @@ def open_random_ui(parent):
     chart_frame = tk.Frame(root)
     chart_frame.pack(pady=10)
 
+    tasks = TaskRunner(root)
+    root.protocol("WM_DELETE_WINDOW", lambda: [tasks.shutdown(), root.destroy()])
+
     # ---------------- Functions ----------------
-    def load_random():
-        # Clear old info
+    # Workers (run off the Tk thread)
+    def pick_product(job):
+        trending = get_trending_products(limit=8)
+        return random.choice(trending) if trending else None
+
+    def fetch_info(job, product):
+        return fetch_product_info(product, max_images=3)
+
+    def fetch_and_analyze(job, product):
+        fetch_and_save_reviews(product)
+        if job.cancelled:
+            return None
+        df = analyze_product(product)
+        # One stored row per product instead of reducing df on the Tk thread
+        return df, product_summary(product) or summarize(df)
+
+    # Callbacks (run on the Tk thread)
+    def on_picked(product):
+        if not product:
+            messagebox.showinfo("No Data", "No trending products found!")
+            return
+        product_label.config(text=product)
+        review_box.insert(tk.END, "⏳ Fetching and analyzing reviews...")
+        run = metrics.start_run("random")
+
+        def done(result):
+            show_analysis(result)
+            run.finish(product=product)
+
+        def failed(e):
+            run.finish(product=product, error=repr(e))
+            show_error(e)
+
+        tasks.submit(fetch_info, product, on_done=show_info)
+        tasks.submit(fetch_and_analyze, product, on_done=done, on_error=failed)
+
+    def show_info(info):
+        images = to_photo_images(info["thumbnails"])
+        if images:
+            for i, img in enumerate(images):
+                tk.Label(image_frame, image=img).grid(row=0, column=i, padx=5)
+            image_frame.image = images
+
+        product_label.config(text=info["name"])
+        if info["buy_url"]:
+            buy_button.config(state="normal", command=lambda: webbrowser.open(info["buy_url"]))
+
+    def show_analysis(result):
+        df, summary = result if result else (None, None)
         review_box.delete("1.0", tk.END)
-        verdict_label.config(text="")
-        pros_label.config(text="Pros: ")
-        cons_label.config(text="Cons: ")
-        product_label.config(text="")
-        buy_button.config(state="disabled")
-        for widget in image_frame.winfo_children():
-            widget.destroy()
-        for widget in chart_frame.winfo_children():
-            widget.destroy()
+        if df is None or df.empty:
+            review_box.insert(tk.END, "No reviews found for this product.")
+            return
 
-        try:
-            trending = get_trending_products(limit=8)
-            if not trending:
-                messagebox.showinfo("No Data", "No trending products found!")
-                return
+        for i, row in df.iterrows():
+            review_box.insert(tk.END, f"- {row['review']}\n\n")
 
-            product = random.choice(trending)
+        verdict = summary["verdict"]
+        verdict_label.config(text=f"Final Verdict: {verdict}", fg="green" if "Positive" in verdict else "red")
 
-            # ---- Fetch product info ----
-            info = get_product_info(product, max_images=3)
+        all_pros, all_cons = list(summary["pros"]), list(summary["cons"])
+        pros_label.config(text=f"Pros: {', '.join(all_pros) if all_pros else 'None'}")
+        cons_label.config(text=f"Cons: {', '.join(all_cons) if all_cons else 'None'}")
 
-            if info["images"]:
-                for i, img in enumerate(info["images"]):
-                    tk.Label(image_frame, image=img).grid(row=0, column=i, padx=5)
-                    image_frame.image = info["images"]
-
-            product_label.config(text=info["name"])
-            if info["buy_url"]:
-                buy_button.config(state="normal", command=lambda: webbrowser.open(info["buy_url"]))
-
-            # ---- Fetch & analyze reviews ----
-            fetch_and_save_reviews(product)
-            df = analyze_reviews()
-
-            if df.empty:
-                review_box.insert(tk.END, "No reviews found for this product.")
-                return
-
-            for i, row in df.iterrows():
-                review_box.insert(tk.END, f"- {row['review']}\n\n")
-
-            verdict = df["verdict"].iloc[0]
-            verdict_label.config(text=f"Final Verdict: {verdict}", fg="green" if "Positive" in verdict else "red")
-
-            all_pros = set(sum(df["pros"], []))
-            all_cons = set(sum(df["cons"], []))
-            pros_label.config(text=f"Pros: {', '.join(all_pros) if all_pros else 'None'}")
-            cons_label.config(text=f"Cons: {', '.join(all_cons) if all_cons else 'None'}")
-
-            sentiment_counts = df["sentiment"].value_counts()
+        sentiment_counts = {k: v for k, v in summary["sentiment_counts"].items() if v}
+        with metrics.span("ui.chart"):
             fig, ax = plt.subplots(figsize=(4, 3))
-            ax.pie(sentiment_counts, labels=sentiment_counts.index, autopct='%1.1f%%', startangle=90)
+            ax.pie(sentiment_counts.values(), labels=sentiment_counts.keys(), autopct='%1.1f%%', startangle=90)
             ax.set_title("Sentiment Breakdown")
 
             chart = FigureCanvasTkAgg(fig, master=chart_frame)
             chart.get_tk_widget().pack()
             chart.draw()
 
-        except Exception as e:
-            messagebox.showerror("Error", f"Could not load random product: {e}")
+    def show_error(e):
+        review_box.delete("1.0", tk.END)
+        messagebox.showerror("Error", f"Could not load random product: {e}")
+
+    def load_random():
+        clear_screen()
+        review_box.insert(tk.END, "⏳ Picking a trending product...")
+        tasks.submit(pick_product, on_done=on_picked, on_error=show_error)
 
     def clear_screen():
+        tasks.cancel_all()
         review_box.delete("1.0", tk.END)
         verdict_label.config(text="")
         pros_label.config(text="Pros: ")
@@ -130,12 +156,18 @@ def open_random_ui(parent):
         for widget in chart_frame.winfo_children():
             widget.destroy()
 
+    def go_back_home():
+        tasks.shutdown()
+        root.destroy()
+        from src.ui.home_ui import open_home_ui  # lazy, avoids a circular import
+        open_home_ui()
+
     # ---------------- Buttons ----------------
     btn_frame = tk.Frame(root)
     btn_frame.pack(pady=10)
 
     tk.Button(btn_frame, text="Load Random", command=load_random, width=14).grid(row=0, column=0, padx=10)
     tk.Button(btn_frame, text="Clear", command=clear_screen, width=14).grid(row=0, column=1, padx=10)
-    tk.Button(btn_frame, text="Back", command=lambda: [root.destroy(), __import__('home_ui').home_ui.open_home_ui()]).grid(row=0, column=2, padx=10)
+    tk.Button(btn_frame, text="Back", command=go_back_home).grid(row=0, column=2, padx=10)
 
     root.mainloop()
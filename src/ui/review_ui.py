@@ -1,14 +1,17 @@
 # src/ui/review_ui.py
 import tkinter as tk
 from tkinter import scrolledtext, messagebox
-from src.analyze_reviews import analyze_reviews
-from src.fetch import fetch_and_save_reviews, get_product_info
+from src.analyze_reviews import analyze_product as analyze_product_reviews, product_summary
+from src.aggregates import summarize
+from src.fetch import fetch_and_save_reviews, fetch_product_info, to_photo_images
+from src.ui.tasks import TaskRunner
+from src import metrics
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import webbrowser
 
 
-def open_review_ui(parent=None):
+def open_review_ui(parent=None, product_name=None):
     if parent:
         parent.destroy()
 
@@ -64,90 +67,122 @@ def open_review_ui(parent=None):
     chart_frame = tk.Frame(root)
     chart_frame.pack(fill="both", expand=False, pady=10)
 
-    # ---------------- Functions ----------------
-    def analyze_product():
-        product = entry.get().strip()
-        if not product:
-            messagebox.showwarning("Input Error", "⚠️ Please enter a product name!")
-            return
+    tasks = TaskRunner(root)
+    root.protocol("WM_DELETE_WINDOW", lambda: [tasks.shutdown(), root.destroy()])
 
-        status_label.config(text="⏳ Fetching product info & reviews...")
-        root.update_idletasks()
-
-        # ---- Fetch product info (images + buy link) ----
-        info = get_product_info(product, max_images=3)
-
-        # Clear old product info
-        for widget in image_frame.winfo_children():
-            widget.destroy()
-        product_label.config(text="")
-        buy_button.config(state="disabled", command=None)
+    # ---------------- Functions ----------------
+    # Workers (run off the Tk thread)
+    def fetch_info(job, product):
+        return fetch_product_info(product, max_images=3)
 
-        if info["images"]:
-            for i, img in enumerate(info["images"]):
+    def fetch_and_analyze(job, product):
+        job.progress("⏳ Fetching reviews...")
+        fetch_and_save_reviews(product)
+        if job.cancelled:
+            return None
+        job.progress("⏳ Analyzing reviews...")
+        df = analyze_product_reviews(product)
+        # One stored row per product instead of reducing df on the Tk thread
+        return df, product_summary(product) or summarize(df)
+
+    # Callbacks (run on the Tk thread)
+    def show_info(info):
+        images = to_photo_images(info["thumbnails"])
+        if images:
+            for i, img in enumerate(images):
                 tk.Label(image_frame, image=img).grid(row=0, column=i, padx=5)
-                image_frame.image = info["images"]  # keep reference
+            image_frame.image = images  # keep reference
 
         product_label.config(text=info["name"])
         if info["buy_url"]:
             buy_button.config(state="normal", command=lambda: webbrowser.open(info["buy_url"]))
 
-        # ---- Fetch & analyze reviews ----
-        fetch_and_save_reviews(product)
-        df = analyze_reviews()
-
-        if df.empty:
+    def show_analysis(result):
+        df, summary = result if result else (None, None)
+        if df is None or df.empty:
+            status_label.config(text="")
             messagebox.showinfo("No Reviews", "No reviews found for this product.")
             return
 
-        # Clear old analysis
-        review_box.delete("1.0", tk.END)
-        for widget in chart_frame.winfo_children():
-            widget.destroy()
-
         # Show reviews
         for _, row in df.iterrows():
             review_box.insert(tk.END, f"- {row['review']}\n\n")
 
         # Show verdict
-        verdict = df["verdict"].iloc[0]
+        verdict = summary["verdict"]
         verdict_label.config(
             text=f"Final Verdict: {verdict}", fg="green" if "Positive" in verdict else "red"
         )
 
         # Show pros & cons
-        all_pros = set(sum(df["pros"], []))
-        all_cons = set(sum(df["cons"], []))
+        all_pros, all_cons = list(summary["pros"]), list(summary["cons"])
         pros_label.config(text=f"Pros: {', '.join(all_pros) if all_pros else 'None'}")
         cons_label.config(text=f"Cons: {', '.join(all_cons) if all_cons else 'None'}")
 
         # Show sentiment chart
-        sentiment_counts = df["sentiment"].value_counts()
-        fig, ax = plt.subplots(figsize=(4, 3))
-        ax.pie(sentiment_counts, labels=sentiment_counts.index, autopct='%1.1f%%', startangle=90)
-        ax.set_title("Sentiment Breakdown")
+        sentiment_counts = {k: v for k, v in summary["sentiment_counts"].items() if v}
+        with metrics.span("ui.chart"):
+            fig, ax = plt.subplots(figsize=(4, 3))
+            ax.pie(sentiment_counts.values(), labels=sentiment_counts.keys(), autopct='%1.1f%%', startangle=90)
+            ax.set_title("Sentiment Breakdown")
 
-        chart = FigureCanvasTkAgg(fig, master=chart_frame)
-        chart.get_tk_widget().pack()
-        chart.draw()
+            chart = FigureCanvasTkAgg(fig, master=chart_frame)
+            chart.get_tk_widget().pack()
+            chart.draw()
 
         status_label.config(text="✅ Analysis complete")
 
-    def clear_screen():
-        entry.delete(0, tk.END)
+    def show_error(e):
+        status_label.config(text="")
+        messagebox.showerror("Error", f"Could not analyze product: {e}")
+
+    def analyze_product():
+        product = entry.get().strip()
+        if not product:
+            messagebox.showwarning("Input Error", "⚠️ Please enter a product name!")
+            return
+
+        # Drop anything still running for a previous product
+        tasks.cancel_all()
+        clear_results()
+        status_label.config(text="⏳ Fetching product info & reviews...")
+
+        # One metrics run per click: fetch, analysis and chart (no-op unless enabled)
+        run = metrics.start_run("analyze")
+
+        def done(result):
+            show_analysis(result)
+            run.finish(product=product)
+
+        def failed(e):
+            run.finish(product=product, error=repr(e))
+            show_error(e)
+
+        # Product info and reviews load independently; each shows up when ready
+        tasks.submit(fetch_info, product, on_done=show_info)
+        tasks.submit(fetch_and_analyze, product, on_done=done, on_error=failed,
+                     on_progress=lambda msg: status_label.config(text=msg))
+
+    def clear_results():
         review_box.delete("1.0", tk.END)
         verdict_label.config(text="")
         pros_label.config(text="Pros: ")
         cons_label.config(text="Cons: ")
-        status_label.config(text="")
         product_label.config(text="")
-        buy_button.config(state="disabled")
+        buy_button.config(state="disabled", command=None)
         for widget in image_frame.winfo_children():
             widget.destroy()
         for widget in chart_frame.winfo_children():
             widget.destroy()
 
+    def clear_screen():
+        tasks.cancel_all()
+        entry.delete(0, tk.END)
+        clear_results()
+        status_label.config(text="")
+
     def go_back_home():
+        tasks.shutdown()
         root.destroy()
         from src.ui.home_ui import open_home_ui  # ✅ import here (lazy, no circular import)
         open_home_ui()
@@ -160,4 +195,9 @@ def open_review_ui(parent=None):
     tk.Button(btn_frame, text="Clear", command=clear_screen, width=12).grid(row=0, column=1, padx=10)
     tk.Button(btn_frame, text="⬅️ Back to Home", width=15, command=go_back_home).grid(row=0, column=2, padx=10)
 
+    # Opened from a trending card: analyze that product straight away
+    if product_name:
+        entry.insert(0, product_name)
+        root.after_idle(analyze_product)
+
     root.mainloop()
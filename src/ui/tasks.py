@@ -0,0 +1,105 @@
+# src/ui/tasks.py
+import queue, threading, traceback
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Job:
+    """
+    Handle passed to background work. The worker calls job.progress(...) to
+    hand partial results to the UI and checks job.cancelled between steps.
+    """
+    def __init__(self, runner, name):
+        self.runner = runner
+        self.name = name
+        self._cancel = threading.Event()
+        self.on_progress = None
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def progress(self, *payload):
+        if not self.cancelled:
+            self.runner._events.put((self, "progress", payload))
+
+
+class TaskRunner:
+    """
+    Runs fetch/analyze work on a thread pool and delivers results back on
+    the Tk main thread: workers push events onto a queue which root.after
+    drains every `poll_ms`. Callbacks of cancelled jobs are never invoked,
+    so Clear/Back can drop work that is still in flight.
+    """
+    def __init__(self, root, workers: int = 4, poll_ms: int = 50):
+        self.root = root
+        self.poll_ms = poll_ms
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ura-ui")
+        self._events = queue.Queue()
+        self._jobs = set()
+        self._closed = False
+        self.root.after(self.poll_ms, self._poll)
+
+    def submit(self, fn, *args, name=None, on_done=None, on_error=None, on_progress=None):
+        """
+        Runs fn(job, *args) in the pool. on_done(result), on_error(exc) and
+        on_progress(*payload) are called on the Tk thread.
+        """
+        job = Job(self, name or getattr(fn, "__name__", "job"))
+        job.on_progress = on_progress
+        self._jobs.add(job)
+
+        def run():
+            if job.cancelled:
+                return
+            try:
+                result = fn(job, *args)
+            except Exception as e:
+                self._events.put((job, "error", (e,)))
+            else:
+                self._events.put((job, "done", (result,)))
+
+        job.on_done, job.on_error = on_done, on_error
+        self._pool.submit(run)
+        return job
+
+    def cancel_all(self):
+        for job in list(self._jobs):
+            job.cancel()
+        self._jobs.clear()
+
+    def shutdown(self):
+        """Cancels everything and stops polling; call before destroying root."""
+        self.cancel_all()
+        self._closed = True
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _poll(self):
+        if self._closed:
+            return
+        try:
+            while True:
+                job, kind, payload = self._events.get_nowait()
+                if job.cancelled:
+                    continue
+                if kind == "progress":
+                    callback = job.on_progress
+                else:
+                    self._jobs.discard(job)
+                    callback = job.on_done if kind == "done" else job.on_error
+                if callback:
+                    try:
+                        callback(*payload)
+                    except Exception:
+                        traceback.print_exc()
+                if self._closed:
+                    return
+        except queue.Empty:
+            pass
+        try:
+            self.root.after(self.poll_ms, self._poll)
+        except Exception:
+            # root was destroyed by a callback
+            self._closed = True
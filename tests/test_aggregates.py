@@ -0,0 +1,57 @@
+# tests/test_aggregates.py
+import pandas as pd
+import pytest
+
+from src import aggregates
+from src.storage import CsvStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = CsvStore(str(tmp_path / "collected.csv"), str(tmp_path / "analyzed.csv"))
+    store.append_analyzed(pd.DataFrame({
+        "product": ["Pixel 9", "Pixel 9", "Galaxy S24"], "review": ["a", "b", "c"],
+        "sentiment": ["Positive", "Negative", "Positive"],
+        "pros": [["battery"], [], ["camera"]], "cons": [[], ["slow"], []],
+        "improvements": [[], ["Improve performance/speed."], []], "verdict": "Mixed"}))
+    return store
+
+
+def test_open_table_builds_from_store(store, tmp_path):
+    path = str(tmp_path / "agg.sqlite")
+    aggregates.open_table(store, path).close()
+    summary = aggregates.get("pixel 9", path)
+    assert summary["reviews"] == 2
+    assert summary["cons"] == {"slow": 1}
+    assert summary["improvements"] == {"Improve performance/speed.": 1}
+
+
+def test_failed_rebuild_keeps_table_and_raises(store, tmp_path, monkeypatch):
+    path = str(tmp_path / "agg.sqlite")
+    aggregates.rebuild(store, path)
+    real = CsvStore.iter_analyzed
+
+    def broken(self, columns, chunksize=50_000):
+        yield next(real(self, columns, chunksize=1))
+        raise OSError("disk error")
+    monkeypatch.setattr(CsvStore, "iter_analyzed", broken)
+    with pytest.raises(OSError):
+        aggregates.rebuild(store, path)
+    assert aggregates.get("Pixel 9", path)["reviews"] == 2
+    assert aggregates.get("Galaxy S24", path)["reviews"] == 1
+
+
+def test_failed_first_build_is_retried(store, tmp_path, monkeypatch):
+    path = str(tmp_path / "agg.sqlite")
+    real = CsvStore.iter_analyzed
+
+    def broken(self, *args, **kwargs):
+        raise OSError("disk error")
+        yield
+    monkeypatch.setattr(CsvStore, "iter_analyzed", broken)
+    with pytest.raises(OSError):
+        aggregates.open_table(store, path)
+
+    monkeypatch.setattr(CsvStore, "iter_analyzed", real)
+    aggregates.open_table(store, path).close()
+    assert aggregates.get("Galaxy S24", path)["reviews"] == 1
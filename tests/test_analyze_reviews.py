@@ -0,0 +1,85 @@
+# tests/test_analyze_reviews.py
+import sqlite3
+from contextlib import closing
+
+import pandas as pd
+import pytest
+
+from src import aggregates, analyze_reviews
+from src.storage import CsvStore, ParquetStore
+
+
+@pytest.fixture(params=["csv", "parquet"])
+def store(request, tmp_path):
+    if request.param == "csv":
+        return CsvStore(str(tmp_path / "collected.csv"), str(tmp_path / "analyzed.csv"))
+    pytest.importorskip("pyarrow")
+    return ParquetStore(str(tmp_path / "parquet"))
+
+
+def _analyzed(product, reviews):
+    return pd.DataFrame({"product": product, "review": reviews, "sentiment": "Positive",
+                         "pros": [["battery"]] * len(reviews), "cons": [[]] * len(reviews),
+                         "improvements": [[]] * len(reviews), "verdict": "Positive"})
+
+
+def test_failed_aggregate_update_is_caught_up(store, tmp_path, monkeypatch):
+    index, agg_path = str(tmp_path / "index.sqlite"), str(tmp_path / "agg.sqlite")
+    with closing(sqlite3.connect(index)) as conn, \
+            closing(aggregates.open_table(store, agg_path)) as agg:
+        conn.execute("CREATE TABLE analyzed_keys (key TEXT PRIMARY KEY)")
+        real = aggregates.update
+
+        def broken(*args, **kwargs):
+            raise sqlite3.OperationalError("database is locked")
+        monkeypatch.setattr(aggregates, "update", broken)
+        with pytest.raises(sqlite3.OperationalError):
+            analyze_reviews._persist(store, conn, agg, _analyzed("Pixel 9", ["a", "b"]))
+
+        # The batch is in the store; the next session must fold it in
+        monkeypatch.setattr(aggregates, "update", real)
+        analyze_reviews._persist(store, conn, agg, _analyzed("Pixel 9", ["c"]))
+    assert len(store.read_analyzed()) == 3
+    assert aggregates.get("Pixel 9", agg_path)["reviews"] == 3
+
+
+def test_incremental_read_keeps_multiline_reviews_whole(tmp_path, monkeypatch):
+    path = tmp_path / "collected.csv"
+    monkeypatch.setattr(analyze_reviews, "INPUT_PATH", str(path))
+    monkeypatch.setattr(analyze_reviews, "STATE_PATH", str(tmp_path / "state.json"))
+    path.write_bytes(b'Product,Site,URL,Review\n'
+                     b'Pixel 9,Amazon,u1,"Great phone.\nBattery lasts\n"\n'
+                     b'Pixel 9,Amazon,u2,"Half written\nreview')
+    df, state = analyze_reviews._read_new_rows()
+    assert df["Review"].tolist() == ["Great phone.\nBattery lasts\n"]
+    analyze_reviews._save_state(state)
+
+    with open(path, "ab") as f:
+        f.write(b' ends here"\n')
+    df, _ = analyze_reviews._read_new_rows()
+    assert df["Review"].tolist() == ["Half written\nreview ends here"]
+
+
+def test_failed_index_seed_is_raised_and_retried(store, tmp_path, monkeypatch):
+    monkeypatch.setattr(analyze_reviews, "INDEX_PATH", str(tmp_path / "index.sqlite"))
+    store.append_analyzed(_analyzed("Pixel 9", ["a"]))
+    real = type(store).iter_analyzed
+
+    def broken(self, *args, **kwargs):
+        raise OSError("disk error")
+        yield
+    monkeypatch.setattr(type(store), "iter_analyzed", broken)
+    with pytest.raises(OSError):
+        analyze_reviews._open_index(store)
+
+    monkeypatch.setattr(type(store), "iter_analyzed", real)
+    with closing(analyze_reviews._open_index(store)) as conn:
+        new = analyze_reviews._filter_new(conn, _analyzed("Pixel 9", ["a", "b"]))
+    assert new["review"].tolist() == ["b"]
+
+
+def test_keyword_lists_are_independent_per_row():
+    pros, _ = analyze_reviews._MATCHER.match_masks(pd.Series(["great battery", "great battery"]))
+    rows = analyze_reviews.from_masks(pros, analyze_reviews._PROS)
+    rows[0].append("extra")
+    assert rows[1] == ["great", "battery"]
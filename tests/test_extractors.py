@@ -0,0 +1,15 @@
+# tests/test_extractors.py
+from src import extractors
+from src.extractors import Selector, get_extractor
+
+
+def test_extractor_is_built_once_per_site(monkeypatch):
+    monkeypatch.setattr(extractors, "_REGISTRY", dict(extractors._REGISTRY))
+    first = get_extractor("https://www.gsmarena.com/a", "stream")
+    assert get_extractor("https://gsmarena.com/b", "stream") is first
+    assert get_extractor("https://gsmarena.com/b", "strainer") is not first
+
+    extractors.register("gsmarena.com", Selector("div", class_="review"))
+    replaced = get_extractor("https://gsmarena.com/c", "stream")
+    assert replaced is not first
+    assert replaced.extract('<div class="review">ok</div><p class="uopin">no</p>') == ["ok"]
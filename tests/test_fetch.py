@@ -0,0 +1,111 @@
+# tests/test_fetch.py
+import time
+
+import pytest
+
+from src import fetch, image_cache
+from benchmarks.standins import offline
+
+
+@pytest.fixture(autouse=True)
+def empty_image_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(image_cache, "CACHE_DIR", str(tmp_path))
+
+
+def _timed(fn, *args, **kwargs):
+    start = time.monotonic()
+    return fn(*args, **kwargs), time.monotonic() - start
+
+
+def test_product_info_complete():
+    with offline(latency=0.05):
+        info, _ = _timed(fetch.fetch_product_info, "Pixel 9", 3, deadline=5)
+    assert info["name"] == "Pixel 9"
+    assert "amazon" in info["buy_url"] or "flipkart" in info["buy_url"]
+    assert len(info["thumbnails"]) == 3
+    assert info["thumbnails"][0].size[0] <= 200
+
+
+def test_product_info_deadline_returns_partial_result():
+    # Searches answer in 50 ms, image downloads take 3 s: only the buy link makes it
+    with offline(latency=0.05, image_delay=3):
+        info, elapsed = _timed(fetch.fetch_product_info, "Pixel 9", 3, deadline=0.5)
+    assert elapsed < 1.5
+    assert info["buy_url"]
+    assert info["thumbnails"] == []
+
+
+def test_product_info_deadline_when_search_is_slow():
+    with offline(latency=2):
+        info, elapsed = _timed(fetch.fetch_product_info, "Pixel 9", 3, deadline=0.5)
+    assert elapsed < 1.5
+    assert info == {"name": "Pixel 9", "buy_url": None, "thumbnails": [], "images": []}
+
+
+def test_failed_cached_thumbnails_reuse_the_buy_search(monkeypatch):
+    searches = []
+    find_buy_url = fetch._find_buy_url
+    monkeypatch.setattr(fetch, "_find_buy_url", lambda name: searches.append(name) or find_buy_url(name))
+    # Cached image URLs that no longer load, and no cached buy link
+    image_cache.put_product("Pixel 9", ["http://127.0.0.1:9/gone.png"], None, 3)
+    with offline(latency=0.05):
+        info = fetch.fetch_product_info("Pixel 9", 3, deadline=5)
+    assert info["buy_url"] and len(info["thumbnails"]) == 3
+    assert searches == ["Pixel 9"]
+
+
+@pytest.mark.parametrize("url", ["http://host:abc/p", "http://[::1/", "  HTTP://Host:99999/X "])
+def test_normalize_url_unparseable(url):
+    assert fetch.normalize_url(url) == url.strip().lower()
+
+
+def test_normalize_url_drops_tracking():
+    assert (fetch.normalize_url("HTTPS://Example.com:443/r?id=1&utm_source=x#top")
+            == "https://example.com/r?id=1")
+
+
+@pytest.fixture
+def collected(tmp_path, monkeypatch):
+    monkeypatch.setattr(fetch, "COLLECTED_PATH", str(tmp_path / "collected.csv"))
+    monkeypatch.setattr(fetch, "COLLECTED_INDEX_PATH", str(tmp_path / "collected_index.sqlite"))
+    monkeypatch.setattr(fetch, "get_store", lambda: fetch.CsvStore())
+    return tmp_path
+
+
+def _review(i):
+    return {"url": f"https://www.amazon.in/r/{i}", "snippet": f"review {i}"}
+
+
+def test_save_reviews_seeds_index_from_store(collected):
+    assert fetch.save_reviews("Pixel 9", [_review(1), _review(2)]) == (2, 0)
+    (collected / "collected_index.sqlite").unlink()
+    assert fetch.save_reviews("Pixel 9", [_review(2), _review(3)]) == (1, 1)
+    assert fetch.rebuild_collected_index() == (1, 3)
+
+
+def test_failed_seed_is_raised_and_retried(collected, monkeypatch):
+    fetch.save_reviews("Pixel 9", [_review(1)])
+    (collected / "collected_index.sqlite").unlink()
+    store = type(fetch._store())
+    real = store.read_collected
+
+    def broken(self, *args, **kwargs):
+        raise OSError("disk error")
+    monkeypatch.setattr(store, "read_collected", broken)
+    with pytest.raises(OSError):
+        fetch.save_reviews("Pixel 9", [_review(1)])
+    with pytest.raises(OSError):
+        fetch._top_collected_products(5)
+
+    # Nothing was marked seeded, so the next open scans the store again
+    monkeypatch.setattr(store, "read_collected", real)
+    assert fetch.save_reviews("Pixel 9", [_review(1)]) == (0, 1)
+
+
+def test_product_info_images_are_the_loaded_urls():
+    with offline() as fake:
+        urls = [f"{fake.image_base}/a.png", "http://127.0.0.1:9/dead.png", f"{fake.image_base}/b.png"]
+        fetch.image_cache.put_product("Pixel 9", urls, "https://www.amazon.in/dp/x", 3)
+        info = fetch.fetch_product_info("Pixel 9", 3, deadline=5)
+    assert info["images"] == [urls[0], urls[2]]
+    assert len(info["thumbnails"]) == 2
@@ -0,0 +1,74 @@
+# tests/test_scrapper.py
+import asyncio, csv, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src import extractors, scrapper
+from src.extractors import Selector
+
+PAGE = b'<html><body><p class="uopin">Great battery</p><p class="uopin">Slow charging</p></body></html>'
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if self.path.startswith("/trickle"):
+            # One chunk per second for 30 s: never idle for READ_TIMEOUT
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(30 * 8))
+            self.end_headers()
+            for _ in range(30):
+                try:
+                    self.wfile.write(b"<p>....\n")
+                    self.wfile.flush()
+                except OSError:
+                    return
+                time.sleep(1)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(PAGE)))
+        self.end_headers()
+        self.wfile.write(PAGE)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server(monkeypatch):
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    monkeypatch.setitem(extractors._REGISTRY, "127.0.0.1", (Selector("p", class_="uopin"),))
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _read(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return [row[0] for row in csv.reader(f)][1:]
+
+
+@pytest.mark.parametrize("backend", ["stream", extractors.DEFAULT_BACKEND])
+def test_scrapes_reviews(server, tmp_path, backend):
+    out = tmp_path / "reviews.csv"
+    count = asyncio.run(scrapper.scrape_reviews_async([f"{server}/page"], out, delay=0, backend=backend))
+    assert count == 2
+    assert _read(out) == ["Great battery", "Slow charging"]
+
+
+def test_page_timeout_stops_trickling_host(server, tmp_path, monkeypatch):
+    monkeypatch.setattr(scrapper, "PAGE_TIMEOUT", 2)
+    out = tmp_path / "reviews.csv"
+    start = time.monotonic()
+    count = asyncio.run(scrapper.scrape_reviews_async(
+        [f"{server}/trickle", f"{server}/page"], out, delay=0))
+    # asyncio.run waits for the worker thread, so this is the real wall time
+    assert time.monotonic() - start < 6
+    assert count == 2
+    assert _read(out) == ["Great battery", "Slow charging"]